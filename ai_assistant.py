@@ -1,52 +1,399 @@
 # ai_assistant.py
+# AI assistant for all portal roles.
+#
+# Nothing heavy happens at import: the OpenAI SDK is imported and its client
+# built on first remote call. Answers come from a backend chosen by the
+# PLACEMENT_AI_BACKEND env var ("remote", "local" or "auto", the default:
+# remote when OPENAI_API_KEY is set, otherwise local). The local backend
+# answers from live database.py analytics, so the portals work fully offline.
 import os
-from openai import OpenAI
+import re
+import threading
 
-# ✅ Initialize OpenAI client (reads API key from environment)
-# Run this once in PowerShell: setx OPENAI_API_KEY "your_api_key"
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from ai_cache import ResponseCache, cache_key
 
-def ask_ai(prompt: str, role: str = "general") -> str:
+MODEL = "gpt-4o-mini"  # ✅ lightweight, faster model
+GENERATION_PARAMS = {"temperature": 0.7, "max_tokens": 350}
+BACKEND_ENV = "PLACEMENT_AI_BACKEND"
+
+# Repeated questions ("how to prepare for TCS?") are answered from here
+response_cache = ResponseCache()
+
+# Role-based system personalities
+ROLE_PROMPTS = {
+    "student": (
+        "You are Career-AI, a friendly and smart assistant that helps students in the college placement portal. "
+        "Assist them in understanding placement drives, resume preparation, interview readiness, and skills improvement. "
+        "If asked unrelated or personal questions, respond politely and guide them back to placement-related topics."
+    ),
+    "hod": (
+        "You are AIDEX, the HOD’s AI-driven analytics assistant. "
+        "Provide department-level insights like placement statistics, recruiter trends, skill gaps, and student readiness. "
+        "Always maintain a formal, data-driven tone and avoid personal or speculative comments."
+    ),
+    "admin": (
+        "You are AIVA, the Admin’s intelligent assistant in the Placement Portal. "
+        "Help manage user accounts, check database issues, generate CSVs, and provide quick troubleshooting or procedural help. "
+        "Be professional, concise, and solution-oriented."
+    ),
+    "general": "You are a helpful assistant for the college placement portal."
+}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Synchronous OpenAI client, created on first use."""
+    # Reads the key from the environment. Run this once in PowerShell: setx OPENAI_API_KEY "your_api_key"
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+            _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL") or None)
+    return _client
+
+
+def _context(role, department):
+    """Department data digest grounding HOD answers (None for other roles)."""
+    if role != "hod" or not department:
+        return None
+    import ai_context
+    return ai_context.department_context(department)
+
+
+def _messages(prompt, role, department=None):
+    system_message = ROLE_PROMPTS.get(role, ROLE_PROMPTS["general"])
+    context = _context(role, department)
+    if context:
+        system_message += ("\n\nCurrent department data (answer from it; do not invent numbers):\n" + context)
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _error_message(e):
+    return f"⚠️ AI Assistant error: {str(e)}"
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Process-wide gateway shared by all sessions, created on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            from ai_gateway import AIGateway
+            _gateway = AIGateway(model=MODEL, params=GENERATION_PARAMS)
+    return _gateway
+
+
+# ------------------- Backends -------------------
+class AIBackend:
+    """Answers a prompt for a role. `department` scopes analytics questions."""
+
+    name = "base"
+    cacheable = True    # whether answers may go through the response cache
+
+    def complete(self, prompt, role="general", department=None, username=None):
+        raise NotImplementedError
+
+    def stream(self, prompt, role="general", department=None, cancel=None, username=None):
+        yield self.complete(prompt, role, department, username)
+
+
+class RemoteBackend(AIBackend):
+    """OpenAI-compatible chat model, through the shared gateway unless a client is injected."""
+
+    name = "remote"
+
+    def __init__(self, client=None, gateway=None):
+        self.client = client
+        self.gateway = gateway
+
+    def complete(self, prompt, role="general", department=None, username=None):
+        if self.client is None:
+            gateway = self.gateway or get_gateway()
+            key = _request_key(prompt, role, department)
+            return gateway.complete(key, _messages(prompt, role, department), role)
+        completion = self.client.chat.completions.create(
+            model=MODEL,
+            messages=_messages(prompt, role, department),
+            **GENERATION_PARAMS,
+        )
+        return completion.choices[0].message.content.strip()
+
+    def stream(self, prompt, role="general", department=None, cancel=None, username=None):
+        if self.client is None:
+            gateway = self.gateway or get_gateway()
+            yield from gateway.stream(_messages(prompt, role, department), role, cancel)
+            return
+        stream = self.client.chat.completions.create(
+            model=MODEL,
+            messages=_messages(prompt, role, department),
+            stream=True,
+            **GENERATION_PARAMS,
+        )
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Also runs on GeneratorExit, when Streamlit abandons the generator on rerun
+            if hasattr(stream, "close"):
+                stream.close()
+
+
+class LocalBackend(AIBackend):
+    """Offline answers composed from live database.py analytics; needs no network or API key."""
+
+    name = "local"
+    cacheable = False   # answers follow the live data, which database.py already caches
+
+    # Keywords are whole words (or word sequences) of the prompt, never substrings
+    INTENTS = (
+        (("recruit", "recruiter", "recruiters", "recruiting", "company", "companies", "employer", "employers"),
+         "_recruiters"),
+        (("skill", "skills", "gap", "gaps", "improve", "train", "training"), "_skills"),
+        (("trend", "trends", "pace", "week", "weekly", "month", "monthly", "projection", "forecast"), "_trend"),
+        (("ready", "readiness", "top student", "top students", "leaderboard", "best student", "best students"),
+         "_readiness"),
+        (("resume", "resumes", "cv"), "_resume_tips"),
+        (("interview", "interviews", "prepare", "preparation", "aptitude"), "_interview_tips"),
+        (("placement", "placements", "placed", "stat", "stats", "statistics", "percent", "percentage",
+          "how many", "rate"), "_stats"),
+    )
+    # Intents that list individual students; other roles only ever see their own record
+    STAFF_ONLY = {"_readiness": "_own_readiness"}
+    STAFF_ROLES = ("hod", "admin")
+
+    def complete(self, prompt, role="general", department=None, username=None):
+        import database
+        tokens = re.findall(r"[a-z0-9&]+", (prompt or "").lower())
+        if department is None:
+            words = set(tokens)
+            department = next((d for d in database.get_departments() if d.lower() in words), None)
+        phrase = f" {' '.join(tokens)} "
+        for keywords, handler in self.INTENTS:
+            if any(f" {k} " in phrase for k in keywords):
+                if role not in self.STAFF_ROLES and handler in self.STAFF_ONLY:
+                    return getattr(self, self.STAFF_ONLY[handler])(database, username)
+                return getattr(self, handler)(database, department)
+        if department:
+            return self._stats(database, department) + " " + self._skills(database, department)
+        return ("I can help with placement statistics, recruiters, skill gaps, readiness and trends. "
+                "Mention a department (e.g. CSE) for department-specific numbers.")
+
+    @staticmethod
+    def _need_department(department, what):
+        return None if department else f"Mention a department (e.g. CSE) to see its {what}."
+
+    def _stats(self, database, department):
+        if not department:
+            lines = []
+            for dept in database.get_departments():
+                s = database.get_department_stats(dept)
+                lines.append(f"{dept}: {s['placed_count']}/{s['total_students']} placed ({s['placed_percentage']}%)")
+            return "📊 " + ("; ".join(lines) + "." if lines else "No student data yet.")
+        s = database.get_department_stats(department)
+        return (f"📊 {department}: {s['placed_count']} of {s['total_students']} students placed "
+                f"({s['placed_percentage']}%), {s['unplaced_count']} still unplaced; "
+                f"average CGPA of placed students is {s['avg_cgpa_placed']}.")
+
+    def _recruiters(self, database, department):
+        missing = self._need_department(department, "recruiters")
+        if missing:
+            return missing
+        recruiters = database.get_top_recruiters(department, top_n=5)
+        if not recruiters:
+            return f"🏢 No placements recorded for {department} yet."
+        return f"🏢 Top recruiters for {department}: " + ", ".join(
+            f"{c} ({n} placed, avg {p} LPA)" for c, n, p in recruiters) + "."
+
+    def _skills(self, database, department):
+        missing = self._need_department(department, "skill gaps")
+        if missing:
+            return missing
+        gaps = database.get_skill_gap_insights(department)
+        common = ", ".join(s for s, _ in gaps["placed_common"])
+        return (f"🧠 {gaps['recommendation'].rstrip('.')}."
+                + (f" Most common skills among placed students: {common}." if common else ""))
+
+    def _trend(self, database, department):
+        missing = self._need_department(department, "placement trend")
+        if missing:
+            return missing
+        import placement_engine
+        return "📈 " + (placement_engine.project_placement_pct(department)
+                        or f"Not enough placement history for {department} yet for a projection.")
+
+    def _readiness(self, database, department):
+        leaders = database.get_readiness_leaderboard(department, 0, 5)
+        if not leaders:
+            return "🏆 No unplaced students with a readiness score yet."
+        scope = department or "the institute"
+        return f"🏆 Most placement-ready unplaced students in {scope}: " + ", ".join(
+            f"{u} ({r}%)" for u, _, _, r, _, _ in leaders) + "."
+
+    def _own_readiness(self, database, username):
+        profile = database.get_student_profile(username) if username else None
+        if not profile:
+            return "🏆 Your readiness estimate is shown on your Student Portal dashboard after a resume analysis."
+        if profile["readiness"] is None:
+            return "🏆 Upload your resume for analysis to get a placement readiness score."
+        return f"🏆 Your placement readiness is {profile['readiness']}% (60% resume score, 40% CGPA)."
+
+    def _resume_tips(self, database, department):
+        return ("📄 Keep it to one page with Education, Skills, Projects, Experience and Certifications sections; "
+                "list concrete tools, and quantify project results.")
+
+    def _interview_tips(self, database, department):
+        return ("🎯 Practise aptitude and core DSA daily, revise your projects end to end, "
+                "and rehearse short answers on why you fit the company's role.")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Backend selected by PLACEMENT_AI_BACKEND (remote / local / auto)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            choice = os.getenv(BACKEND_ENV, "auto").strip().lower()
+            if choice == "auto":
+                choice = "remote" if os.getenv("OPENAI_API_KEY") else "local"
+            _backend = LocalBackend() if choice == "local" else RemoteBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the process-wide backend (None re-reads the environment on next use)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _request_key(prompt, role, department):
+    # The digest is part of the key, so cached answers expire with the data they were grounded on
+    params = GENERATION_PARAMS
+    if department:
+        params = dict(params, department=department, context=_context(role, department))
+    return cache_key(role, prompt, MODEL, params)
+
+
+_semantic_cache = None
+_semantic_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """Process-wide paraphrase cache, created (and NumPy imported) on first use."""
+    global _semantic_cache
+    with _semantic_lock:
+        if _semantic_cache is None:
+            from semantic_cache import SemanticCache
+            _semantic_cache = SemanticCache()
+    return _semantic_cache
+
+
+def _semantic_namespace(role, department):
+    # Paraphrases only match within a role and the same grounding digest
+    return (role, department, _context(role, department))
+
+
+def _lookup(cache, semantic, key, prompt, role, department):
+    """
+    Exact cache first, then the nearest paraphrase. Paraphrase hits are not
+    copied into the exact cache: that cache persists to disk, and an answer
+    reused for one wording should not become the stored answer for another.
+    """
+    answer = cache.get(key)
+    if answer is None and semantic is not None:
+        answer, _ = semantic.lookup(_semantic_namespace(role, department), prompt)
+    return answer
+
+
+def _store(cache, semantic, key, prompt, role, department, answer):
+    cache.put(key, answer)
+    if semantic is not None:
+        semantic.add(_semantic_namespace(role, department), prompt, answer)
+
+
+# ------------------- Public API -------------------
+def ask_ai(prompt: str, role: str = "general", client=None, cache=None, use_cache: bool = True,
+           department=None, backend=None, semantic=None, username=None) -> str:
     """
     Handles AI conversations across all roles.
     role: "student", "hod", "admin" — controls tone and context.
+    Uses get_backend() unless a backend (or a client, meaning a RemoteBackend
+    on that client) is given. `username` is the asking user; the local
+    backend answers personal questions from that user's record only.
+    Answers are looked up in the exact response
+    cache, then in the paraphrase cache. Pass a fake client and/or private
+    caches to exercise the call offline.
     """
-
-    # Role-based system personalities
-    base_prompt = {
-        "student": (
-            "You are Career-AI, a friendly and smart assistant that helps students in the college placement portal. "
-            "Assist them in understanding placement drives, resume preparation, interview readiness, and skills improvement. "
-            "If asked unrelated or personal questions, respond politely and guide them back to placement-related topics."
-        ),
-        "hod": (
-            "You are AIDEX, the HOD’s AI-driven analytics assistant. "
-            "Provide department-level insights like placement statistics, recruiter trends, skill gaps, and student readiness. "
-            "Always maintain a formal, data-driven tone and avoid personal or speculative comments."
-        ),
-        "admin": (
-            "You are AIVA, the Admin’s intelligent assistant in the Placement Portal. "
-            "Help manage user accounts, check database issues, generate CSVs, and provide quick troubleshooting or procedural help. "
-            "Be professional, concise, and solution-oriented."
-        ),
-        "general": "You are a helpful assistant for the college placement portal."
-    }
-
-    system_message = base_prompt.get(role, base_prompt["general"])
+    backend = backend or (RemoteBackend(client=client) if client is not None else get_backend())
+    cache = cache or response_cache
+    use_cache = use_cache and backend.cacheable
+    semantic = (semantic or get_semantic_cache()) if use_cache else None
+    key = _request_key(prompt, role, department)
+    if use_cache:
+        cached = _lookup(cache, semantic, key, prompt, role, department)
+        if cached is not None:
+            return cached
 
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",  # ✅ lightweight, faster model
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=350,
-        )
+        answer = backend.complete(prompt, role, department, username)
+        # Cache and return AI response (errors are never cached)
+        if use_cache:
+            _store(cache, semantic, key, prompt, role, department, answer)
+        return answer
 
-        # Extract and return AI response
-        return completion.choices[0].message.content.strip()
+    except Exception as e:
+        return _error_message(e)
 
+
+def ask_ai_stream(prompt: str, role: str = "general", client=None, cache=None, use_cache: bool = True,
+                  cancel=None, department=None, backend=None, semantic=None, username=None):
+    """
+    Streaming variant of ask_ai: yields text fragments as the backend produces them.
+    A cached answer is yielded in one piece. `cancel` is an optional
+    threading.Event; once set (e.g. the user reran the page) the upstream
+    stream is closed and nothing is cached. Errors are yielded as the same
+    message ask_ai returns.
+    """
+    backend = backend or (RemoteBackend(client=client) if client is not None else get_backend())
+    cache = cache or response_cache
+    use_cache = use_cache and backend.cacheable
+    semantic = (semantic or get_semantic_cache()) if use_cache else None
+    key = _request_key(prompt, role, department)
+    if use_cache:
+        cached = _lookup(cache, semantic, key, prompt, role, department)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    stream = backend.stream(prompt, role, department, cancel, username)
+    try:
+        for text in stream:
+            parts.append(text)
+            yield text
     except Exception as e:
-        return f"⚠️ AI Assistant error: {str(e)}"
\ No newline at end of file
+        yield _error_message(e)
+        return
+    finally:
+        stream.close()
+
+    if cancel is not None and cancel.is_set():
+        return
+    answer = "".join(parts).strip()
+    if use_cache and answer:
+        _store(cache, semantic, key, prompt, role, department, answer)
@@ -0,0 +1,160 @@
+# ai_cache.py
+# Two-tier response cache for ai_assistant.ask_ai.
+#
+# Keys are a hash of (role, normalized prompt, model, generation parameters).
+# Tier 1 is an in-process LRU (sub-millisecond hits); tier 2 is a small SQLite
+# file shared by every portal process and kept across restarts. Both tiers
+# expire entries after a TTL and evict least-recently-used entries beyond
+# their size limit.
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DB_FILE = "ai_cache.db"
+DEFAULT_TTL = 24 * 3600
+MAX_MEMORY_ENTRIES = 512
+MAX_DISK_ENTRIES = 20000
+
+
+def normalize_prompt(prompt):
+    """Case, whitespace and trailing punctuation do not change the question."""
+    text = re.sub(r"\s+", " ", (prompt or "").strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def cache_key(role, prompt, model, params):
+    blob = json.dumps([role, normalize_prompt(prompt), model, params], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_DB_FILE, ttl=DEFAULT_TTL, max_memory=MAX_MEMORY_ENTRIES,
+                 max_disk=MAX_DISK_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # key -> (expires_at, response)
+        self._conn = None
+        self._disk_count = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0,
+                      "memory_evictions": 0, "disk_evictions": 0}
+
+    # ------------------- Disk tier -------------------
+    def _db(self):
+        if self._conn is None and self.path:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ai_responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_responses_access ON ai_responses(last_access)")
+            self._conn.commit()
+            self._disk_count = self._conn.execute("SELECT COUNT(*) FROM ai_responses").fetchone()[0]
+        return self._conn
+
+    def _disk_get(self, key, now):
+        """(response, expires_at), False if the row had expired, or None."""
+        db = self._db()
+        if db is None:
+            return None
+        row = db.execute("SELECT response, expires_at FROM ai_responses WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            db.execute("DELETE FROM ai_responses WHERE key=?", (key,))
+            db.commit()
+            self._disk_count -= 1
+            return False
+        db.execute("UPDATE ai_responses SET last_access=? WHERE key=?", (now, key))
+        db.commit()
+        return row
+
+    def _disk_put(self, key, response, expires_at, now):
+        db = self._db()
+        if db is None:
+            return
+        exists = db.execute("SELECT 1 FROM ai_responses WHERE key=?", (key,)).fetchone()
+        db.execute("INSERT OR REPLACE INTO ai_responses (key, response, expires_at, last_access) "
+                   "VALUES (?, ?, ?, ?)", (key, response, expires_at, now))
+        self._disk_count += 0 if exists else 1
+        if self._disk_count > self.max_disk:
+            # Expired rows go first, then the least recently used
+            purged = db.execute("DELETE FROM ai_responses WHERE expires_at <= ?", (now,)).rowcount
+            excess = self._disk_count - purged - self.max_disk
+            if excess > 0:
+                db.execute("""
+                    DELETE FROM ai_responses WHERE key IN (
+                        SELECT key FROM ai_responses ORDER BY last_access LIMIT ?
+                    )
+                """, (excess,))
+            self._disk_count = db.execute("SELECT COUNT(*) FROM ai_responses").fetchone()[0]
+            self.stats["disk_evictions"] += purged + max(excess, 0)
+        db.commit()
+
+    # ------------------- Public API -------------------
+    def get(self, key):
+        """Cached response or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            expired = False
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                expired = True
+
+            row = self._disk_get(key, now)
+            if not row:
+                self.stats["misses"] += 1
+                if expired or row is False:
+                    self.stats["expired"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, row[1], row[0])
+            return row[0]
+
+    def put(self, key, response, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, response)
+            self._disk_put(key, response, expires_at, now)
+
+    def _remember(self, key, expires_at, response):
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM ai_responses")
+                db.commit()
+                self._disk_count = 0
+
+    def cache_stats(self):
+        with self._lock:
+            self._db()
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return dict(self.stats, memory_entries=len(self._memory), disk_entries=self._disk_count or 0,
+                        hit_rate=round(hits / lookups, 3) if lookups else 0.0)
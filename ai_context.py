@@ -0,0 +1,90 @@
+# ai_context.py
+# Compact, token-budgeted department digest for the HOD assistant.
+#
+# The digest condenses get_department_stats, get_top_recruiters and
+# get_skill_gap_insights (plus the weekly pace) into a few short lines that
+# are sent with every HOD question instead of raw tables. It is rebuilt only
+# when the underlying tables' data version changes, so repeated questions
+# reuse the same string and the prompt size stays small and constant.
+
+import os
+import threading
+
+from database import get_department_stats, get_top_recruiters, get_skill_gap_insights, get_placement_trend
+from query_cache import data_version
+
+CONTEXT_TABLES = ("users", "student_profiles", "resume_analysis", "placements", "placement_rollups")
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PLACEMENT_AI_CONTEXT_TOKENS", "200"))
+MAX_DIGESTS = 64
+
+_lock = threading.Lock()
+_digests = {}       # (department, budget) -> (data version, digest)
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _sections(department):
+    """[(label, [items...])] in priority order; later sections and items are trimmed first."""
+    stats = get_department_stats(department)
+    recruiters = get_top_recruiters(department, top_n=8)
+    gaps = get_skill_gap_insights(department, top_k=8)
+    trend = get_placement_trend(department, "weekly", 4)
+
+    sections = [
+        (f"{department} placement", [
+            f"{stats['placed_count']}/{stats['total_students']} placed ({stats['placed_percentage']}%)",
+            f"{stats['unplaced_count']} unplaced",
+            f"avg CGPA of placed {stats['avg_cgpa_placed']}",
+        ]),
+        ("Skill gaps (common among placed, rare among unplaced)", list(gaps["missing_skills"])),
+        ("Top recruiters (placed, avg LPA)", [f"{c} {n} @{p}" for c, n, p in recruiters]),
+    ]
+    if trend:
+        last = trend[-1]
+        sections.append(("Weekly pace", [
+            f"{last['rolling_avg']} new placements/week (4-week avg)",
+            f"latest week {last['period']}: {last['new_students']} new",
+        ]))
+    sections += [
+        ("Skills of placed", [f"{s} {n}" for s, n in gaps["placed_common"]]),
+        ("Skills of unplaced", [f"{s} {n}" for s, n in gaps["unplaced_common"]]),
+    ]
+    return [(label, items) for label, items in sections if items]
+
+
+def _render(sections):
+    return "\n".join(f"{label}: {'; '.join(items)}." for label, items in sections if items)
+
+
+def trim_to_budget(sections, budget):
+    """Drop items from the lowest-priority sections until the digest fits in `budget` tokens."""
+    sections = [(label, list(items)) for label, items in sections]
+    text = _render(sections)
+    while estimate_tokens(text) > budget and sections:
+        label, items = sections[-1]
+        if len(items) > 1:
+            items.pop()
+        else:
+            sections.pop()
+        text = _render(sections)
+    return text
+
+
+def department_context(department, budget=None):
+    """Digest for `department` within `budget` tokens, cached until the department data changes."""
+    budget = DEFAULT_TOKEN_BUDGET if budget is None else budget
+    version = data_version(*CONTEXT_TABLES)
+    key = (department, budget)
+    with _lock:
+        cached = _digests.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+    digest = trim_to_budget(_sections(department), budget)
+    with _lock:
+        if len(_digests) >= MAX_DIGESTS and key not in _digests:
+            _digests.pop(next(iter(_digests)))
+        _digests[key] = (version, digest)
+    return digest
@@ -0,0 +1,241 @@
+# ai_gateway.py
+# Shared asyncio gateway in front of the OpenAI-compatible chat API.
+# Imported lazily by ai_assistant.get_gateway(), so importing ai_assistant
+# does not pay for asyncio or the OpenAI SDK.
+
+import asyncio
+import bisect
+import os
+import queue
+import random
+import threading
+import time
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)     # seconds; one more bucket counts slower calls
+
+
+class AIGateway:
+    """
+    One asyncio loop (on a daemon thread) that every Streamlit session's
+    remote ask_ai call goes through. It provides:
+    - a global semaphore limiting concurrent requests,
+    - a token bucket limiting the request rate,
+    - exponential backoff with full jitter on 429 / 5xx / connection errors,
+    - coalescing: identical in-flight requests share one upstream call,
+    - per-role latency histograms.
+    Streaming requests (stream()) get the same semaphore, token bucket and
+    backoff; they are retried only until the first chunk has arrived, and are
+    never coalesced since each caller consumes its own chunks.
+    """
+
+    def __init__(self, model, params, base_url=None, api_key=None, max_concurrency=8, rate_per_sec=5.0,
+                 burst=10, max_retries=4, base_delay=0.5, max_delay=8.0, timeout=60.0, client=None):
+        self.model = model
+        self.params = dict(params)
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._client = client
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._inflight = {}                 # key -> asyncio.Future (loop thread only)
+        self._stats_lock = threading.Lock()
+        self._latency = {}                  # role -> {"buckets": [...], "count": n, "total": s}
+        self.stats = {"requests": 0, "streams": 0, "coalesced": 0, "retries": 0, "failures": 0}
+
+    # ------------------- Loop -------------------
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                                name="ai-gateway")
+                self._thread.start()
+                asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+        return self._loop
+
+    async def _setup(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket_lock = asyncio.Lock()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # Retries are ours (with jitter), not the SDK's
+            self._client = AsyncOpenAI(api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                                       base_url=self.base_url, max_retries=0, timeout=self.timeout)
+
+    async def _shutdown(self):
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self._loop.shutdown_asyncgens()
+
+    def close(self):
+        with self._start_lock:
+            if self._loop is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+                except Exception:
+                    pass
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop = None
+
+    # ------------------- Rate limiting -------------------
+    async def _take_token(self):
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_sec)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_sec)
+
+    @staticmethod
+    def _retryable(e):
+        from openai import APIConnectionError
+        status = getattr(e, "status_code", None)
+        return status == 429 or (status is not None and status >= 500) or isinstance(e, APIConnectionError)
+
+    # ------------------- Requests -------------------
+    async def _call(self, messages):
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self._take_token()
+                try:
+                    completion = await self._client.chat.completions.create(
+                        model=self.model, messages=messages, **self.params)
+                    return completion.choices[0].message.content.strip()
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._retryable(e):
+                        raise
+            # Back off outside the semaphore so waiting retries do not block other requests
+            attempt += 1
+            with self._stats_lock:
+                self.stats["retries"] += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    async def _complete(self, key, messages):
+        future = self._inflight.get(key)
+        if future is not None:
+            with self._stats_lock:
+                self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(self._call(messages))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def complete(self, key, messages, role="general"):
+        """
+        Blocking call from any thread. Returns the answer text; raises the last
+        error once retries are exhausted.
+        """
+        loop = self._ensure_loop()
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.stats["requests"] += 1
+        try:
+            return asyncio.run_coroutine_threadsafe(self._complete(key, messages), loop).result()
+        except Exception:
+            with self._stats_lock:
+                self.stats["failures"] += 1
+            raise
+        finally:
+            self._observe(role, time.perf_counter() - started)
+
+    # ------------------- Streaming -------------------
+    async def _stream(self, messages, chunks):
+        """Push ("text", str) items, then ("done", None) or ("error", exc), onto a queue.Queue."""
+        attempt = 0
+        while True:
+            started = False
+            async with self._semaphore:
+                await self._take_token()
+                try:
+                    stream = await self._client.chat.completions.create(
+                        model=self.model, messages=messages, stream=True, **self.params)
+                    try:
+                        async for chunk in stream:
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                started = True
+                                chunks.put(("text", chunk.choices[0].delta.content))
+                    finally:
+                        # Also runs when the consumer cancels this task
+                        await stream.close()
+                    chunks.put(("done", None))
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Text already shown to the user cannot be taken back, so only retry before it
+                    if started or attempt >= self.max_retries or not self._retryable(e):
+                        chunks.put(("error", e))
+                        return
+            attempt += 1
+            with self._stats_lock:
+                self.stats["retries"] += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    def stream(self, messages, role="general", cancel=None, poll_seconds=0.1):
+        """
+        Blocking generator usable from any thread: yields text fragments as they
+        arrive. Setting `cancel` (a threading.Event) or closing the generator
+        cancels the upstream request and frees its concurrency slot. Errors
+        after retries are raised to the caller.
+        """
+        loop = self._ensure_loop()
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.stats["streams"] += 1
+        chunks = queue.Queue()
+        task = asyncio.run_coroutine_threadsafe(self._stream(messages, chunks), loop)
+        try:
+            while cancel is None or not cancel.is_set():
+                try:
+                    kind, value = chunks.get(timeout=poll_seconds)
+                except queue.Empty:
+                    continue
+                if kind == "text":
+                    yield value
+                elif kind == "error":
+                    with self._stats_lock:
+                        self.stats["failures"] += 1
+                    raise value
+                else:
+                    return
+        finally:
+            task.cancel()   # no-op once the stream has finished
+            self._observe(role, time.perf_counter() - started)
+
+    # ------------------- Metrics -------------------
+    def _observe(self, role, seconds):
+        with self._stats_lock:
+            h = self._latency.setdefault(role, {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "count": 0, "total": 0.0})
+            h["buckets"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            h["count"] += 1
+            h["total"] += seconds
+
+    def latency_stats(self):
+        """Per-role histogram: {role: {"<=0.25s": n, ..., ">32s": n, "count": n, "avg_s": x}}."""
+        with self._stats_lock:
+            report = {}
+            for role, h in self._latency.items():
+                row = {f"<={b}s": n for b, n in zip(LATENCY_BUCKETS, h["buckets"])}
+                row[f">{LATENCY_BUCKETS[-1]}s"] = h["buckets"][-1]
+                row["count"] = h["count"]
+                row["avg_s"] = round(h["total"] / h["count"], 3) if h["count"] else 0.0
+                report[role] = row
+            return report
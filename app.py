@@ -1,5 +1,6 @@
 import streamlit as st
-from database import init_db, authenticate_user
+from database import authenticate_user
+import bootstrap
 import time
 
 # ---------------------- PAGE CONFIG ----------------------
@@ -11,7 +12,7 @@ st.set_page_config(
 )
 
 # ---------------------- INITIALIZE DATABASE ----------------------
-init_db()
+bootstrap.ensure_ready()  # schema + background workers; no-op after the first run in this server process
 
 # ---------------------- MODERN CSS THEME ----------------------
 st.markdown('''
@@ -0,0 +1,303 @@
+# archive.py
+# Academic-year archival of drives, applications and placements.
+#
+# Closed drives (with their applications) and placements from past academic
+# years move out of the live database into an ATTACHed archive file, so the
+# live tables only hold the current season. Historical analytics read both
+# through the unified get_*_history functions below.
+#
+# CLI: python archive.py --past          (archive every season before the current one)
+#      python archive.py --year 2024-25
+
+import argparse
+import os
+import sqlite3
+from datetime import date, datetime
+
+import database
+from eligibility import ALL_DEPARTMENTS
+from query_cache import bump
+
+ARCHIVE_DB_FILE = "placement_archive.db"
+ACADEMIC_YEAR_START_MONTH = 6   # seasons run June -> May
+
+DRIVE_COLUMNS = ["id", "company", "role", "package", "department", "open_for_all", "date", "deadline",
+                 "description", "is_active", "min_cgpa", "max_backlogs", "grad_year", "closed_on"]
+APPLICATION_COLUMNS = ["id", "username", "drive_id", "applied_on", "status", "remarks"]
+PLACEMENT_COLUMNS = ["id", "username", "company", "package", "placed_on"]
+
+
+# ------------------- Academic years -------------------
+def academic_year_of(value):
+    """'2025-02-10' -> '2024-25'; accepts ISO date/datetime strings or date objects."""
+    d = value if isinstance(value, date) else datetime.fromisoformat(str(value)[:10]).date()
+    start = d.year if d.month >= ACADEMIC_YEAR_START_MONTH else d.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+def _sql_academic_year(value):
+    """academic_year_of for SQL: NULL for missing or unparseable dates instead of an error."""
+    try:
+        return academic_year_of(value) if value else None
+    except ValueError:
+        return None
+
+
+def current_academic_year():
+    return academic_year_of(date.today())
+
+
+def academic_year_bounds(year):
+    """'2024-25' -> ('2024-06-01', '2025-06-01'), a half-open ISO range."""
+    start = int(str(year)[:4])
+    return (f"{start}-{ACADEMIC_YEAR_START_MONTH:02d}-01", f"{start + 1}-{ACADEMIC_YEAR_START_MONTH:02d}-01")
+
+
+# ------------------- Connections -------------------
+def connect(archive_file=None, create=False):
+    """
+    Connection to the live DB with the archive attached as schema `archive`.
+    Read paths attach the archive only if the file exists and never write to
+    it; create=True (archival) creates the file and its tables. SQL on this
+    connection can call academic_year_of(date).
+    """
+    path = archive_file or ARCHIVE_DB_FILE
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.create_function("academic_year_of", 1, _sql_academic_year, deterministic=True)
+    if create or os.path.exists(path):
+        conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    if create:
+        _create_archive_schema(conn.cursor())
+        conn.commit()
+    return conn
+
+
+def _create_archive_schema(c):
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS archive.drives (
+            {", ".join(DRIVE_COLUMNS)}, academic_year TEXT, PRIMARY KEY (id)
+        )
+    """)
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS archive.applications (
+            {", ".join(APPLICATION_COLUMNS)}, academic_year TEXT, PRIMARY KEY (id)
+        )
+    """)
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS archive.placements (
+            {", ".join(PLACEMENT_COLUMNS)}, academic_year TEXT, PRIMARY KEY (id)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS archive.drive_departments (
+            drive_id INTEGER NOT NULL, department TEXT NOT NULL, PRIMARY KEY (department, drive_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS archive.idx_drives_year ON drives(academic_year)")
+    c.execute("CREATE INDEX IF NOT EXISTS archive.idx_applications_year ON applications(academic_year, drive_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS archive.idx_applications_user ON applications(username)")
+    c.execute("CREATE INDEX IF NOT EXISTS archive.idx_placements_year ON placements(academic_year, username)")
+
+
+def _has_archive(conn):
+    """Whether an archive with the full schema is attached to conn."""
+    try:
+        c = conn.execute("""
+            SELECT COUNT(*) FROM archive.sqlite_master
+            WHERE type = 'table' AND name IN ('drives', 'applications', 'placements', 'drive_departments')
+        """)
+    except sqlite3.OperationalError:
+        return False    # not attached
+    return c.fetchone()[0] == 4
+
+
+# ------------------- Archival -------------------
+def archive_academic_year(year, archive_file=None):
+    """
+    Move one academic year's closed drives (with their applications and
+    department targeting) and its placements into the archive, atomically.
+    Returns a dict of moved row counts.
+    """
+    year_start, year_end = academic_year_bounds(year)
+    conn = connect(archive_file, create=True)
+    conn.isolation_level = None
+    c = conn.cursor()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS _archive_drives (id INTEGER PRIMARY KEY)")
+        c.execute("DELETE FROM _archive_drives")
+        c.execute("""
+            INSERT INTO _archive_drives (id)
+            SELECT id FROM main.drives WHERE is_active = 0 AND date >= ? AND date < ?
+        """, (year_start, year_end))
+
+        drive_cols = ", ".join(DRIVE_COLUMNS)
+        c.execute(f"""
+            INSERT OR REPLACE INTO archive.drives ({drive_cols}, academic_year)
+            SELECT {drive_cols}, ? FROM main.drives WHERE id IN (SELECT id FROM _archive_drives)
+        """, (year,))
+        drives_moved = c.rowcount
+
+        app_cols = ", ".join(APPLICATION_COLUMNS)
+        c.execute(f"""
+            INSERT OR REPLACE INTO archive.applications ({app_cols}, academic_year)
+            SELECT {app_cols}, ? FROM main.applications WHERE drive_id IN (SELECT id FROM _archive_drives)
+        """, (year,))
+        applications_moved = c.rowcount
+
+        c.execute("""
+            INSERT OR IGNORE INTO archive.drive_departments (drive_id, department)
+            SELECT drive_id, department FROM main.drive_departments
+            WHERE drive_id IN (SELECT id FROM _archive_drives)
+        """)
+
+        placement_cols = ", ".join(PLACEMENT_COLUMNS)
+        c.execute(f"""
+            INSERT OR REPLACE INTO archive.placements ({placement_cols}, academic_year)
+            SELECT {placement_cols}, ? FROM main.placements WHERE placed_on >= ? AND placed_on < ?
+        """, (year, year_start, year_end))
+        placements_moved = c.rowcount
+
+        c.execute("DELETE FROM main.applications WHERE drive_id IN (SELECT id FROM _archive_drives)")
+        c.execute("DELETE FROM main.drive_departments WHERE drive_id IN (SELECT id FROM _archive_drives)")
+        c.execute("DELETE FROM main.drives WHERE id IN (SELECT id FROM _archive_drives)")
+        c.execute("DELETE FROM main.placements WHERE placed_on >= ? AND placed_on < ?", (year_start, year_end))
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    bump("drives", "drive_departments", "applications", "placements")
+    return {"drives": drives_moved, "applications": applications_moved, "placements": placements_moved}
+
+
+def archive_past_seasons(archive_file=None):
+    """Archive every academic year older than the current one. Returns {year: counts}."""
+    current_start, _ = academic_year_bounds(current_academic_year())
+    conn = sqlite3.connect(database.DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT date FROM drives WHERE is_active = 0 AND date < ?
+        UNION SELECT placed_on FROM placements WHERE placed_on < ?
+    """, (current_start, current_start))
+    years = sorted({academic_year_of(r[0]) for r in c.fetchall() if r[0]})
+    conn.close()
+    return {year: archive_academic_year(year, archive_file) for year in years}
+
+
+# ------------------- Unified historical reads -------------------
+def get_archived_years(archive_file=None):
+    """[(academic_year, archived drives)], newest first; [] before anything was archived."""
+    if not os.path.exists(archive_file or ARCHIVE_DB_FILE):
+        return []
+    conn = connect(archive_file)
+    rows = []
+    if _has_archive(conn):
+        c = conn.cursor()
+        c.execute("""
+            SELECT academic_year, COUNT(*) FROM archive.drives GROUP BY academic_year
+            ORDER BY academic_year DESC
+        """)
+        rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def get_placement_history(department=None, academic_years=None, archive_file=None):
+    """
+    Placements across live and archived seasons:
+    rows of (academic_year, username, department, company, package, placed_on).
+    Live rows are labelled with the academic year of their placed_on date.
+    """
+    filters, params = [], []
+    if department:
+        filters.append("u.department = ?")
+        params.append(department)
+    if academic_years:
+        filters.append(f"p.academic_year IN ({','.join('?' * len(academic_years))})")
+        params.extend(academic_years)
+    where = ("WHERE " + " AND ".join(filters)) if filters else ""
+
+    conn = connect(archive_file)
+    archived = ("UNION ALL SELECT academic_year, username, company, package, placed_on FROM archive.placements"
+                if _has_archive(conn) else "")
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT p.academic_year, p.username, u.department, p.company, p.package, p.placed_on
+        FROM (
+            SELECT academic_year_of(placed_on) AS academic_year, username, company, package, placed_on
+            FROM main.placements
+            {archived}
+        ) p
+        LEFT JOIN main.users u ON u.username = p.username
+        {where}
+        ORDER BY p.placed_on
+    """, params)
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def get_drive_history(department=None, academic_years=None, archive_file=None):
+    """
+    Drives across live and archived seasons with applicant totals:
+    rows of (academic_year, id, company, role, package, department, date, applicants).
+    Live rows are labelled with the academic year of their drive date.
+    """
+    filters, params = [], []
+    if department:
+        filters.append("EXISTS (SELECT 1 FROM dd WHERE dd.drive_id = d.id AND dd.department IN (?, ?))")
+        params.extend([department, ALL_DEPARTMENTS])
+    if academic_years:
+        filters.append(f"d.academic_year IN ({','.join('?' * len(academic_years))})")
+        params.extend(academic_years)
+    where = ("WHERE " + " AND ".join(filters)) if filters else ""
+
+    conn = connect(archive_file)
+    has_archive = _has_archive(conn)
+
+    def archived(select):
+        return f"UNION ALL {select}" if has_archive else ""
+
+    c = conn.cursor()
+    c.execute(f"""
+        WITH d AS (
+            SELECT academic_year_of(date) AS academic_year, id, company, role, package, department, date
+            FROM main.drives
+            {archived("SELECT academic_year, id, company, role, package, department, date FROM archive.drives")}
+        ),
+        a AS (
+            SELECT drive_id, COUNT(*) AS n FROM main.applications GROUP BY drive_id
+            {archived("SELECT drive_id, COUNT(*) FROM archive.applications GROUP BY drive_id")}
+        ),
+        dd AS (
+            SELECT drive_id, department FROM main.drive_departments
+            {archived("SELECT drive_id, department FROM archive.drive_departments")}
+        )
+        SELECT d.academic_year, d.id, d.company, d.role, d.package, d.department, d.date,
+               COALESCE((SELECT SUM(n) FROM a WHERE a.drive_id = d.id), 0)
+        FROM d
+        {where}
+        ORDER BY d.date
+    """, params)
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+# ------------------- CLI -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive past placement seasons.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--past", action="store_true", help="archive every season before the current one")
+    group.add_argument("--year", help="archive a single academic year, e.g. 2024-25")
+    args = parser.parse_args()
+
+    database.init_db()
+    if args.past:
+        for year, moved in archive_past_seasons().items():
+            print(f"{year}: {moved}")
+    else:
+        print(f"{args.year}: {archive_academic_year(args.year)}")
@@ -0,0 +1,196 @@
+# batch_reports.py
+# Month-end batch of department PDF reports plus an institute rollup.
+#
+# The live database is copied once (SQLite backup API) into a snapshot file
+# that every worker process reads, so all reports describe the same instant.
+# Departments fan out across a process pool; a department whose data
+# fingerprint matches the previous manifest keeps its existing PDF.
+#
+# CLI: python batch_reports.py --out reports/2025-03 [--workers 4] [--force]
+
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import database
+import placement_engine
+import query_cache
+
+MANIFEST_NAME = "manifest.json"
+INSTITUTE_REPORT_NAME = "Institute_Placement_Report.pdf"
+REPORT_VERSION = 1      # bump when the report layout changes to invalidate cached PDFs
+
+
+# ------------------- Snapshot -------------------
+def snapshot_database(dest_path):
+    """Consistent point-in-time copy of the live database."""
+    src = sqlite3.connect(database.DB_FILE)
+    dst = sqlite3.connect(dest_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return dest_path
+
+
+def _use_snapshot(snapshot_path):
+    # Process-pool initializer, run only in the spawned workers (never in the
+    # caller's process): every database.py read in this worker hits the snapshot
+    database.DB_FILE = snapshot_path
+    query_cache.clear()
+
+
+# ------------------- Workers -------------------
+def _report_filename(department, part=1):
+    safe = "".join(ch if ch.isalnum() else "_" for ch in department)
+    return f"{safe}_Placement_Report.pdf" if part == 1 else f"{safe}_Placement_Report_part{part}.pdf"
+
+
+def _render_department(department, out_dir):
+    started = time.perf_counter()
+    evaluation = placement_engine.evaluate_department(department)
+    parts, err = placement_engine.iter_department_pdf_parts(department, evaluation)
+    if err:
+        return {"department": department, "error": err}
+
+    files = []
+    for part, report in enumerate(parts, start=1):
+        filename = _report_filename(department, part)
+        with report, open(os.path.join(out_dir, filename), "wb") as f:
+            while True:
+                chunk = report.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+        files.append(filename)
+    # Remove leftover parts from an earlier, larger run of this department
+    part = len(files) + 1
+    while os.path.exists(os.path.join(out_dir, _report_filename(department, part))):
+        os.remove(os.path.join(out_dir, _report_filename(department, part)))
+        part += 1
+    return {
+        "department": department,
+        "file": files[0],
+        "files": files,
+        "stats": evaluation["detailed"]["stats"],
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+# ------------------- Institute rollup -------------------
+def _write_institute_report(out_dir, departments):
+    from fpdf import FPDF
+
+    totals = {"total_students": 0, "placed_count": 0, "unplaced_count": 0}
+    rows = []
+    for name in sorted(departments):
+        stats = departments[name]["stats"]
+        for k in totals:
+            totals[k] += stats[k]
+        rows.append((name, stats["total_students"], stats["placed_count"], stats["unplaced_count"],
+                     f"{stats['placed_percentage']}%", stats["avg_cgpa_placed"]))
+    pct = round(totals["placed_count"] / totals["total_students"] * 100, 2) if totals["total_students"] else 0.0
+    rows.append(("Institute", totals["total_students"], totals["placed_count"], totals["unplaced_count"], f"{pct}%", "-"))
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Institute Placement Report", ln=True, align="C")
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, f"Generated on {datetime.now().strftime('%d %b %Y, %I:%M %p')}", ln=True, align="C")
+    placement_engine._section(pdf, "Department Summary")
+    placement_engine._table(pdf, ["Department", "Students", "Placed", "Unplaced", "Placement %", "Avg CGPA"],
+                            [35, 28, 25, 28, 32, 30], rows)
+    pdf.output(os.path.join(out_dir, INSTITUTE_REPORT_NAME), "F")
+    return {"file": INSTITUTE_REPORT_NAME, "placed_percentage": pct, **totals}
+
+
+# ------------------- Batch -------------------
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def run_batch(out_dir, departments=None, workers=None, force=False):
+    """
+    Generate every department report (reusing unchanged ones) and the institute
+    rollup into out_dir, then write manifest.json. Returns the manifest dict.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = _load_manifest(out_dir).get("departments", {})
+    started = time.perf_counter()
+
+    fd, snapshot_path = tempfile.mkstemp(suffix=".db", prefix="placement_snapshot_")
+    os.close(fd)
+    try:
+        snapshot_database(snapshot_path)
+        # Read the snapshot by path: this may run inside the portal process, whose
+        # other sessions and background threads must keep writing to the live file
+        departments = departments or database.get_departments(snapshot_path)
+        fingerprints = {d: f"{REPORT_VERSION}:{database.department_fingerprint(d, snapshot_path)}"
+                        for d in departments}
+
+        results, todo = {}, []
+        for dept in departments:
+            prev = previous.get(dept, {})
+            prev_files = prev.get("files") or ([prev["file"]] if prev.get("file") else [])
+            if (not force and prev_files and prev.get("fingerprint") == fingerprints[dept]
+                    and all(os.path.exists(os.path.join(out_dir, name)) for name in prev_files)):
+                results[dept] = dict(prev, cached=True, seconds=0.0)
+            else:
+                todo.append(dept)
+
+        if todo:
+            # spawn, not fork: the portal process is multi-threaded
+            with ProcessPoolExecutor(max_workers=workers or min(len(todo), os.cpu_count() or 1),
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_use_snapshot, initargs=(snapshot_path,)) as pool:
+                futures = {pool.submit(_render_department, dept, out_dir): dept for dept in todo}
+                for future in as_completed(futures):
+                    dept = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"department": dept, "error": str(e)}
+                    result["cached"] = False
+                    if "error" not in result:
+                        result["fingerprint"] = fingerprints[dept]
+                    results[dept] = result
+    finally:
+        os.remove(snapshot_path)
+
+    ok = {d: r for d, r in results.items() if "error" not in r}
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(time.perf_counter() - started, 2),
+        "departments": results,
+        "institute": _write_institute_report(out_dir, ok) if ok else None,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# ------------------- CLI -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate all department placement reports.")
+    parser.add_argument("--out", default=os.path.join("reports", datetime.now().strftime("%Y-%m")))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="regenerate even unchanged reports")
+    args = parser.parse_args()
+
+    result = run_batch(args.out, workers=args.workers, force=args.force)
+    for dept, r in sorted(result["departments"].items()):
+        status = r.get("error") or ("cached" if r["cached"] else f"{r['seconds']}s")
+        print(f"{dept:>10}: {status}")
+    print(f"Done in {result['seconds']}s -> {args.out}")
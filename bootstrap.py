@@ -0,0 +1,60 @@
+# bootstrap.py
+# One-time, process-wide startup shared by app.py and every page.
+#
+# Streamlit re-executes a page script on every interaction, so schema DDL at
+# module level turns into a write transaction (and a database lock) per
+# rerun. ensure_ready() instead runs database.init_db() at most once per
+# server process and database file, and only when the file's PRAGMA
+# user_version is older than database.SCHEMA_VERSION. It also starts the
+# background workers (drive_scheduler, email_dispatcher). After the first
+# call it is a set lookup, so pages can call it unconditionally.
+
+import os
+import sqlite3
+import threading
+import time
+
+import database
+
+_lock = threading.Lock()
+_ready = set()          # absolute paths of database files already checked in this process
+_workers_started = False
+
+
+def _schema_version(db_file):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _start_workers():
+    global _workers_started
+    if _workers_started:
+        return
+    import drive_scheduler
+    import email_dispatcher
+    drive_scheduler.start()
+    email_dispatcher.start()
+    _workers_started = True
+
+
+def ensure_ready(start_workers=True):
+    """Bring database.DB_FILE up to SCHEMA_VERSION once and start background workers."""
+    path = os.path.abspath(database.DB_FILE)
+    if path in _ready and (_workers_started or not start_workers):
+        return
+    with _lock:
+        if path not in _ready:
+            started = time.perf_counter()
+            found = _schema_version(database.DB_FILE)
+            if found < database.SCHEMA_VERSION:
+                database.init_db()
+                action = f"migrated v{found} -> v{database.SCHEMA_VERSION}"
+            else:
+                action = f"schema v{found} up to date"
+            _ready.add(path)
+            print(f"Bootstrap: {database.DB_FILE} {action} in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if start_workers:
+            _start_workers()
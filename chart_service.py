@@ -0,0 +1,106 @@
+# chart_service.py
+# Cached dashboard chart rendering.
+#
+# Charts are rendered once per data snapshot and the encoded PNG/SVG bytes are
+# kept in a byte-bounded LRU keyed by a hash of the chart inputs. matplotlib is
+# only imported (with the non-interactive Agg backend) on a cache miss, and
+# every figure is closed as soon as it has been encoded.
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+MAX_CACHE_BYTES = 8 * 1024 * 1024
+
+_lock = threading.Lock()
+_cache = OrderedDict()      # key -> bytes
+_cache_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+# ------------------- Cache -------------------
+def _key(kind, payload, fmt):
+    blob = json.dumps([kind, payload, fmt], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _get(key):
+    with _lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+        else:
+            _stats["misses"] += 1
+        return data
+
+
+def _put(key, data):
+    global _cache_bytes
+    with _lock:
+        if key in _cache:
+            return
+        _cache[key] = data
+        _cache_bytes += len(data)
+        while _cache_bytes > MAX_CACHE_BYTES and len(_cache) > 1:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+            _stats["evictions"] += 1
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_cache), bytes=_cache_bytes)
+
+
+# ------------------- Rendering -------------------
+def _render(draw, fmt, figsize):
+    """Run draw(ax) on a fresh figure and return the encoded bytes; the figure is always closed."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        draw(ax)
+        buf = BytesIO()
+        fig.savefig(buf, format=fmt, bbox_inches="tight", dpi=100)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def cached_chart(kind, payload, draw, fmt="png", figsize=(4, 4)):
+    """Return chart bytes for `payload`, rendering with draw(ax) only on a cache miss."""
+    key = _key(kind, payload, fmt)
+    data = _get(key)
+    if data is None:
+        data = _render(draw, fmt, figsize)
+        _put(key, data)
+    return data
+
+
+def pie_chart(values, labels, colors=None, fmt="png", figsize=(4, 4)):
+    """Cached pie chart with percentage labels."""
+    values, labels, colors = list(values), list(labels), list(colors) if colors else None
+
+    def draw(ax):
+        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90, colors=colors)
+        ax.axis("equal")
+
+    return cached_chart("pie", {"values": values, "labels": labels, "colors": colors}, draw, fmt, figsize)
+
+
+def bar_chart(values, labels, title="", color="#0072ff", fmt="png", figsize=(6, 3)):
+    """Cached horizontal bar chart (largest value on top)."""
+    values, labels = list(values), list(labels)
+
+    def draw(ax):
+        ax.barh(labels[::-1], values[::-1], color=color)
+        if title:
+            ax.set_title(title)
+
+    return cached_chart("bar", {"values": values, "labels": labels, "title": title, "color": color},
+                        draw, fmt, figsize)
@@ -1,11 +1,22 @@
 import sqlite3
 import csv
+import hashlib
 import random
 import string
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import Counter
+from eligibility import drive_filter_sql, ALL_DEPARTMENTS
+from resume_dedup import minhash, lsh_bands, cluster, similarity
+import query_cache
+from query_cache import cached_query, bump
 
 DB_FILE = "placement_portal.db"
+# Cached reads are keyed per database file (tests and batch snapshots swap it)
+query_cache.set_scope(lambda: DB_FILE)
+
+# Recorded in PRAGMA user_version by init_db(); bump it whenever init_db or
+# _migrate changes so existing databases are upgraded once by bootstrap.py
+SCHEMA_VERSION = 1
 
 # =======================================================================
 #                         DATABASE INITIALIZATION
@@ -37,6 +48,16 @@ def init_db():
         )
     ''')
 
+    # LSH buckets of resume MinHash signatures (near-duplicate detection)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS resume_lsh (
+            band INTEGER,
+            bucket INTEGER,
+            analysis_id INTEGER,
+            PRIMARY KEY (band, bucket, analysis_id)
+        ) WITHOUT ROWID
+    ''')
+
     # Student Profiles
     c.execute('''
         CREATE TABLE IF NOT EXISTS student_profiles (
@@ -60,6 +81,98 @@ def init_db():
         )
     ''')
 
+    # Placement drives (created by Admin/TPO)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS drives (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT,
+            role TEXT,
+            package REAL,
+            department TEXT,
+            open_for_all INTEGER DEFAULT 0,
+            date TEXT,
+            deadline TEXT,
+            description TEXT,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+
+    # Student applications to drives
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            drive_id INTEGER,
+            applied_on TEXT,
+            status TEXT DEFAULT 'Applied',
+            remarks TEXT
+        )
+    ''')
+
+    # Drive -> department targeting ('ALL' for open drives). The primary key
+    # (department, drive_id) is a clustered covering index for the student lookup.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS drive_departments (
+            drive_id INTEGER NOT NULL,
+            department TEXT NOT NULL,
+            PRIMARY KEY (department, drive_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_drive_departments_drive ON drive_departments(drive_id)")
+
+    # Incremental placement rollups per department and company
+    for table in ("placement_daily", "placement_weekly"):
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                department TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                company TEXT NOT NULL,
+                offers INTEGER DEFAULT 0,
+                new_students INTEGER DEFAULT 0,
+                package_total REAL DEFAULT 0,
+                PRIMARY KEY (department, bucket, company)
+            ) WITHOUT ROWID
+        ''')
+
+    # Durable email outbox drained by email_dispatcher.py
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            body TEXT,
+            dedupe_key TEXT UNIQUE,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at TEXT,
+            claimed_by TEXT,
+            claimed_at TEXT,
+            last_error TEXT,
+            created_at TEXT,
+            sent_at TEXT
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_status ON email_outbox(status, next_attempt_at)")
+
+    # In-portal notification feed; event identifies the drive change so a
+    # repeated fan-out for the same change does not notify anyone twice
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            drive_id INTEGER,
+            event TEXT,
+            title TEXT,
+            body TEXT,
+            created_at TEXT,
+            read_at TEXT
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(username, id)")
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_user_event ON notifications(username, event)")
+
+    _migrate(c)
+
     # Default admin
     c.execute("SELECT * FROM users WHERE username='admin'")
     if not c.fetchone():
@@ -67,10 +180,115 @@ def init_db():
                   ('admin', 'admin123', 'Admin', 'Administration'))
         print("✅ Default Admin user created: admin / admin123")
 
+    c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
 
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d", "%d.%m.%Y", "%d %b %Y", "%d %B %Y")
+
+
+def normalize_date(value):
+    """Return a date string as ISO 'YYYY-MM-DD'; unparseable values are returned unchanged."""
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text).date().isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+
+def _add_column(c, table, column, decl):
+    """Add a column to an existing table if it is not there yet."""
+    c.execute(f"PRAGMA table_info({table})")
+    if column not in [r[1] for r in c.fetchall()]:
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _migrate(c):
+    """In-place schema upgrades for databases created by older versions."""
+    # Structured eligibility criteria
+    _add_column(c, "drives", "min_cgpa", "REAL")
+    _add_column(c, "drives", "max_backlogs", "INTEGER")
+    _add_column(c, "drives", "grad_year", "INTEGER")
+    _add_column(c, "student_profiles", "backlogs", "INTEGER DEFAULT 0")
+    _add_column(c, "student_profiles", "grad_year", "INTEGER")
+
+    # Drive lifecycle: ISO deadlines + an index so the expiry sweep is a range scan
+    _add_column(c, "drives", "closed_on", "TEXT")
+    for col in ("date", "deadline"):
+        c.execute(f"""
+            SELECT id, {col} FROM drives
+            WHERE {col} IS NOT NULL AND {col} NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+        """)
+        for drive_id, value in c.fetchall():
+            c.execute(f"UPDATE drives SET {col}=? WHERE id=?", (normalize_date(value), drive_id))
+    c.execute("CREATE INDEX IF NOT EXISTS idx_drives_active_deadline ON drives(is_active, deadline)")
+
+    # Applicant pipeline lookups
+    c.execute("CREATE INDEX IF NOT EXISTS idx_applications_drive_status ON applications(drive_id, status)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_applications_user_drive ON applications(username, drive_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_resume_analysis_user ON resume_analysis(username, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_placements_placed_on ON placements(placed_on)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_role_department ON users(role, department)")
+
+    # Persisted readiness for indexed top-N leaderboards
+    _add_column(c, "student_profiles", "department", "TEXT")
+    _add_column(c, "student_profiles", "readiness", "REAL")
+    c.execute("""
+        UPDATE student_profiles
+        SET department = (SELECT u.department FROM users u WHERE u.username = student_profiles.username)
+        WHERE department IS NULL
+    """)
+    c.execute(f"""
+        UPDATE student_profiles SET readiness = {_READINESS_SQL}
+        WHERE readiness IS NULL
+          AND EXISTS (SELECT 1 FROM resume_analysis ra WHERE ra.username = student_profiles.username)
+    """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_student_profiles_readiness
+        ON student_profiles(department, placed, readiness DESC)
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_student_profiles_cgpa ON student_profiles(cgpa, username)")
+
+    # MinHash signature of the resume text (NULL for analyses saved before it existed)
+    _add_column(c, "resume_analysis", "minhash", "BLOB")
+
+    # Contact address for notifications
+    _add_column(c, "users", "email", "TEXT")
+
+    # Backfill rollups once from placements recorded before they existed
+    c.execute("SELECT EXISTS (SELECT 1 FROM placement_daily)")
+    if not c.fetchone()[0]:
+        for table, bucket_sql in (("placement_daily", "date(p.placed_on)"),
+                                  ("placement_weekly", "date(p.placed_on, '-6 days', 'weekday 1')")):
+            c.execute(f"""
+                INSERT INTO {table} (department, bucket, company, offers, new_students, package_total)
+                SELECT COALESCE(u.department, 'UNKNOWN'), {bucket_sql}, p.company, COUNT(*),
+                       SUM(p.id = (SELECT MIN(p2.id) FROM placements p2 WHERE p2.username = p.username)),
+                       TOTAL(p.package)
+                FROM placements p
+                LEFT JOIN users u ON u.username = p.username
+                WHERE p.placed_on IS NOT NULL
+                GROUP BY 1, 2, 3
+            """)
+
+    # Backfill department targeting for drives created before drive_departments existed
+    c.execute("""
+        INSERT OR IGNORE INTO drive_departments (drive_id, department)
+        SELECT d.id,
+               CASE WHEN d.open_for_all=1 OR d.department IS NULL OR d.department IN ('', 'ALL')
+                    THEN 'ALL' ELSE d.department END
+        FROM drives d
+        WHERE NOT EXISTS (SELECT 1 FROM drive_departments dd WHERE dd.drive_id = d.id)
+    """)
+
+
 # =======================================================================
 #                         AUTHENTICATION
 # =======================================================================
@@ -118,6 +336,7 @@ def add_auto_user(role, department=None):
               (username, password, role, department))
     conn.commit()
     conn.close()
+    bump("users", keys=[username])
     return (username, password), f"✅ {role} account created successfully."
 
 
@@ -134,6 +353,51 @@ def get_all_users():
     return data
 
 
+@cached_query("users")
+def get_role_counts():
+    """Number of accounts per role, e.g. {'Student': 120, 'HOD': 6, 'Admin': 1}."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("SELECT role, COUNT(*) FROM users GROUP BY role")
+    counts = dict(c.fetchall())
+    conn.close()
+    return counts
+
+
+def set_user_department(username, department):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("UPDATE users SET department=? WHERE username=?", (department, username))
+    _sync_profile_derived(c, username)
+    conn.commit()
+    conn.close()
+    bump("users", "student_profiles", keys=[username])
+
+
+def set_user_email(username, email):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("UPDATE users SET email=? WHERE username=?", ((email or "").strip() or None, username))
+    conn.commit()
+    conn.close()
+    bump("users", keys=[username])
+
+
+def get_user_emails(usernames):
+    """Map username -> email for the given users that have one."""
+    usernames = list(usernames)
+    result = {}
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    for start in range(0, len(usernames), 500):
+        chunk = usernames[start:start + 500]
+        c.execute(f"SELECT username, email FROM users WHERE email IS NOT NULL AND username IN ({','.join('?' * len(chunk))})",
+                  chunk)
+        result.update(c.fetchall())
+    conn.close()
+    return result
+
+
 def export_users_to_csv(filename="all_users_export.csv"):
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
@@ -153,13 +417,21 @@ def export_users_to_csv(filename="all_users_export.csv"):
 #                         RESUME ANALYSIS
 # =======================================================================
 
-def save_resume_analysis(username, score, feedback, skills):
+def save_resume_analysis(username, score, feedback, skills, text=None):
+    """Store an analysis; with the extracted resume text, also its MinHash signature and LSH buckets."""
+    signature = minhash(text) if text else None
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
-    c.execute("INSERT INTO resume_analysis (username, score, feedback, skills) VALUES (?, ?, ?, ?)",
-              (username, score, feedback, ",".join(skills)))
+    c.execute("INSERT INTO resume_analysis (username, score, feedback, skills, minhash) VALUES (?, ?, ?, ?, ?)",
+              (username, score, feedback, ",".join(skills), signature))
+    analysis_id = c.lastrowid
+    c.executemany("INSERT OR IGNORE INTO resume_lsh (band, bucket, analysis_id) VALUES (?, ?, ?)",
+                  [(band, bucket, analysis_id) for band, bucket in lsh_bands(signature)])
+    _sync_profile_derived(c, username)
     conn.commit()
     conn.close()
+    bump("resume_analysis")
+    bump("student_profiles", keys=[username])
 
 
 def get_resume_analysis(username):
@@ -174,11 +446,48 @@ def get_resume_analysis(username):
     return None
 
 
+def get_duplicate_resume_clusters(threshold=0.8):
+    """
+    Groups of students whose latest resumes are near-duplicates.
+    Candidates come from shared LSH buckets (one GROUP BY, no pairwise scan)
+    and are confirmed by estimated Jaccard similarity >= threshold.
+    Returns [{"usernames": [...], "similarity": lowest estimate against the
+    cluster's representative}], largest first.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    latest = "SELECT MAX(id) FROM resume_analysis GROUP BY username"
+    c.execute(f"""
+        SELECT GROUP_CONCAT(analysis_id) FROM resume_lsh
+        WHERE analysis_id IN ({latest})
+        GROUP BY band, bucket
+        HAVING COUNT(*) > 1
+    """)
+    groups = [[int(x) for x in r[0].split(",")] for r in c.fetchall()]
+    ids = sorted({i for g in groups for i in g})
+    info = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        c.execute(f"SELECT id, username, minhash FROM resume_analysis WHERE id IN ({','.join('?' * len(chunk))})",
+                  chunk)
+        info.update({r[0]: (r[1], r[2]) for r in c.fetchall()})
+    conn.close()
+
+    report = []
+    for members in cluster(groups, {i: v[1] for i, v in info.items()}, threshold):
+        first = info[members[0]][1]     # the representative
+        report.append({
+            "usernames": sorted(info[i][0] for i in members),
+            "similarity": round(min(similarity(first, info[i][1]) for i in members[1:]), 2),
+        })
+    return report
+
+
 # =======================================================================
 #                         STUDENT PROFILES
 # =======================================================================
 
-def upsert_student_profile(username, reg_no=None, cgpa=None):
+def upsert_student_profile(username, reg_no=None, cgpa=None, backlogs=None, grad_year=None):
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
     c.execute("SELECT id FROM student_profiles WHERE username=?", (username,))
@@ -187,17 +496,861 @@ def upsert_student_profile(username, reg_no=None, cgpa=None):
             c.execute("UPDATE student_profiles SET reg_no=? WHERE username=?", (reg_no, username))
         if cgpa is not None:
             c.execute("UPDATE student_profiles SET cgpa=? WHERE username=?", (cgpa, username))
+        if backlogs is not None:
+            c.execute("UPDATE student_profiles SET backlogs=? WHERE username=?", (backlogs, username))
+        if grad_year is not None:
+            c.execute("UPDATE student_profiles SET grad_year=? WHERE username=?", (grad_year, username))
+    else:
+        c.execute("INSERT INTO student_profiles (username, reg_no, cgpa, backlogs, grad_year) VALUES (?, ?, ?, ?, ?)",
+                  (username, reg_no, cgpa, backlogs or 0, grad_year))
+    _sync_profile_derived(c, username)
+    conn.commit()
+    conn.close()
+    bump("student_profiles", keys=[username])
+
+
+def compute_readiness(score, cgpa):
+    """Placement readiness (0-100): 60% resume score, 40% CGPA scaled to 100."""
+    if score is None:
+        return None
+    return round(score * 0.6 + (cgpa or 0) * 10 * 0.4, 2)
+
+
+# Same formula as compute_readiness, evaluated in SQL against the latest analysis
+_READINESS_SQL = """
+    ROUND((SELECT ra.score FROM resume_analysis ra WHERE ra.username = student_profiles.username
+           ORDER BY ra.id DESC LIMIT 1) * 0.6 + COALESCE(student_profiles.cgpa, 0) * 10 * 0.4, 2)
+"""
+
+
+def _sync_profile_derived(c, username):
+    """Refresh the denormalized department and persisted readiness of one profile; caller commits."""
+    c.execute(f"""
+        UPDATE student_profiles
+        SET department = (SELECT u.department FROM users u WHERE u.username = student_profiles.username),
+            readiness = {_READINESS_SQL}
+        WHERE username = ?
+    """, (username,))
+
+
+def _record_placement(c, username, company, package, placed_on):
+    """Placement write shared by record_placement and application selection; caller commits."""
+    c.execute("INSERT INTO placements (username, company, package, placed_on) VALUES (?, ?, ?, ?)",
+              (username, company, package, placed_on))
+    c.execute("SELECT placed FROM student_profiles WHERE username=?", (username,))
+    row = c.fetchone()
+    first_offer = not (row and row[0])
+    if row:
+        c.execute("UPDATE student_profiles SET placed=1, package=MAX(COALESCE(package, 0), ?) WHERE username=?",
+                  (package, username))
     else:
-        c.execute("INSERT INTO student_profiles (username, reg_no, cgpa) VALUES (?, ?, ?)",
-                  (username, reg_no, cgpa))
+        c.execute("INSERT INTO student_profiles (username, placed, package) VALUES (?, 1, ?)", (username, package))
+        _sync_profile_derived(c, username)
+
+    # Incremental daily/weekly rollups (one UPSERT each, no history rescan)
+    c.execute("SELECT department FROM users WHERE username=?", (username,))
+    dept_row = c.fetchone()
+    department = (dept_row[0] if dept_row else None) or "UNKNOWN"
+    day = datetime.fromisoformat(str(placed_on)[:10]).date()
+    week_start = day - timedelta(days=day.weekday())
+    for table, bucket in (("placement_daily", day.isoformat()), ("placement_weekly", week_start.isoformat())):
+        c.execute(f"""
+            INSERT INTO {table} (department, bucket, company, offers, new_students, package_total)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT (department, bucket, company) DO UPDATE SET
+                offers = offers + 1,
+                new_students = new_students + excluded.new_students,
+                package_total = package_total + excluded.package_total
+        """, (department, bucket, company, 1 if first_offer else 0, package or 0))
+
+
+def record_placement(username, company, package, placed_on=None):
+    """Record an offer: marks the student placed, appends to placements and updates the rollups."""
+    placed_on = placed_on or datetime.utcnow().isoformat()
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    _record_placement(c, username, company, package, placed_on)
+    conn.commit()
+    conn.close()
+    bump("placements", "placement_rollups")
+    bump("student_profiles", keys=[username])
+
+
+def get_student_profile(username):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT u.department, sp.reg_no, sp.cgpa, sp.backlogs, sp.grad_year, sp.placed, sp.package, u.email,
+               sp.readiness
+        FROM users u
+        LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE u.username=?
+    """, (username,))
+    row = c.fetchone()
+    conn.close()
+    if not row:
+        return None
+    return {
+        "department": row[0],
+        "reg_no": row[1],
+        "cgpa": row[2],
+        "backlogs": row[3] or 0,
+        "grad_year": row[4],
+        "placed": row[5] or 0,
+        "package": row[6] or 0,
+        "email": row[7],
+        "readiness": row[8],
+    }
+
+
+# =======================================================================
+#                         PLACEMENT DRIVES & ELIGIBILITY
+# =======================================================================
+
+def get_eligible_drives(department, cgpa, backlogs=0, grad_year=None):
+    """Active drives a student with the given profile qualifies for."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    # Two index seeks on drive_departments (own department + 'ALL'), then rowid lookups on drives
+    c.execute(f"""
+        SELECT d.id, d.company, d.role, d.package, d.department, d.open_for_all, d.date, d.deadline,
+               d.description, d.min_cgpa, d.max_backlogs, d.grad_year
+        FROM drive_departments dd
+        JOIN drives d ON d.id = dd.drive_id
+        WHERE dd.department IN (?, '{ALL_DEPARTMENTS}') AND {drive_filter_sql("d")}
+        ORDER BY d.date ASC
+    """, (department, cgpa, backlogs or 0, grad_year))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def add_drive(company, role, package, departments, date, deadline, description="",
+              min_cgpa=None, max_backlogs=None, grad_year=None):
+    """
+    Create an active drive targeted at one or more departments.
+    An empty department list (or one containing 'ALL') opens the drive to everyone.
+    Returns the new drive id.
+    """
+    departments = [d for d in (departments or []) if d]
+    open_for_all = not departments or ALL_DEPARTMENTS in departments
+    targets = [ALL_DEPARTMENTS] if open_for_all else sorted(set(departments))
+
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO drives (company, role, package, department, open_for_all, date, deadline, description, is_active,
+                            min_cgpa, max_backlogs, grad_year)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+    """, (company, role, package, ",".join(targets), 1 if open_for_all else 0, str(date), str(deadline),
+          description, min_cgpa, max_backlogs, grad_year))
+    drive_id = c.lastrowid
+    c.executemany("INSERT INTO drive_departments (drive_id, department) VALUES (?, ?)",
+                  [(drive_id, d) for d in targets])
+    conn.commit()
+    conn.close()
+    bump("drives", "drive_departments")
+    return drive_id
+
+
+def close_drive(drive_id):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("UPDATE drives SET is_active=0, closed_on=? WHERE id=?", (datetime.utcnow().isoformat(), drive_id))
+    conn.commit()
+    conn.close()
+    bump("drives")
+
+
+def close_expired_drives(today=None):
+    """
+    Close every active drive whose deadline has passed, in one batched UPDATE.
+    Returns the ids of the drives that were closed.
+    """
+    today = (today or datetime.now().date()).isoformat()
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    c = conn.cursor()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        # Both statements are range scans on idx_drives_active_deadline
+        c.execute("SELECT id FROM drives WHERE is_active=1 AND deadline < ?", (today,))
+        closed_ids = [r[0] for r in c.fetchall()]
+        if closed_ids:
+            c.execute("UPDATE drives SET is_active=0, closed_on=? WHERE is_active=1 AND deadline < ?",
+                      (datetime.utcnow().isoformat(), today))
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    if closed_ids:
+        bump("drives")
+    return closed_ids
+
+
+def get_drive_applicants_usernames(drive_ids):
+    """Map drive_id -> list of applicant usernames for the given drives."""
+    result = {d: [] for d in drive_ids}
+    if not drive_ids:
+        return result
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    q_marks = ",".join("?" * len(drive_ids))
+    c.execute(f"SELECT drive_id, username FROM applications WHERE drive_id IN ({q_marks})", tuple(drive_ids))
+    for drive_id, uname in c.fetchall():
+        result[drive_id].append(uname)
+    conn.close()
+    return result
+
+
+def get_drive_summaries(drive_ids):
+    """Map drive_id -> (company, role) for the given drives."""
+    if not drive_ids:
+        return {}
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    q_marks = ",".join("?" * len(drive_ids))
+    c.execute(f"SELECT id, company, role FROM drives WHERE id IN ({q_marks})", tuple(drive_ids))
+    result = {r[0]: (r[1], r[2]) for r in c.fetchall()}
+    conn.close()
+    return result
+
+
+def update_drive(drive_id, deadline=None, description=None, today=None):
+    """
+    Change a drive's deadline and/or description. Extending the deadline of a
+    closed drive to today or later reopens it, so students can see (and be
+    told about) the extension. Returns whether the drive is active afterwards,
+    or None if it does not exist.
+    """
+    today = (today or datetime.now().date()).isoformat()
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("SELECT deadline, is_active FROM drives WHERE id=?", (drive_id,))
+    row = c.fetchone()
+    if row is None:
+        conn.close()
+        return None
+    old_deadline, is_active = row
+    new_deadline = normalize_date(deadline) if deadline is not None else old_deadline
+    reopen = not is_active and new_deadline >= today and new_deadline > (old_deadline or "")
+    c.execute("""
+        UPDATE drives SET deadline=?, description=COALESCE(?, description),
+                          is_active=?, closed_on=CASE WHEN ? THEN NULL ELSE closed_on END
+        WHERE id=?
+    """, (new_deadline, description, 1 if reopen else is_active, reopen, drive_id))
+    conn.commit()
+    conn.close()
+    bump("drives")
+    return bool(reopen or is_active)
+
+
+def drive_fingerprint(drive_id):
+    """
+    Fingerprint of what students are told about a drive: role, package, dates,
+    description, eligibility bounds and targeted departments. Changes with
+    every edit that changes any of them; None if the drive does not exist.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT company, role, package, date, deadline, description, min_cgpa, max_backlogs, grad_year,
+               (SELECT GROUP_CONCAT(department) FROM
+                   (SELECT department FROM drive_departments WHERE drive_id = d.id ORDER BY department))
+        FROM drives d WHERE id = ?
+    """, (drive_id,))
+    row = c.fetchone()
+    conn.close()
+    return hashlib.sha1(repr(row).encode()).hexdigest()[:12] if row else None
+
+
+def get_drive_recipients(drive_id):
+    """
+    Students eligible for an active drive who have not applied yet, as
+    [(username, department, email)], in one set-based query: department
+    targeting via drive_departments, the drive's CGPA/backlog/batch bounds
+    (same semantics as EligibilityRule.to_sql) and an anti-join on applications.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT u.username, u.department, u.email
+        FROM drives d
+        JOIN drive_departments dd ON dd.drive_id = d.id
+        JOIN users u ON u.role = 'Student'
+                    AND (dd.department = '{ALL_DEPARTMENTS}' OR u.department = dd.department)
+        LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE d.id = ? AND d.is_active = 1
+          AND (d.min_cgpa IS NULL OR sp.cgpa >= d.min_cgpa)
+          AND (d.max_backlogs IS NULL OR COALESCE(sp.backlogs, 0) <= d.max_backlogs)
+          AND (d.grad_year IS NULL OR sp.grad_year = d.grad_year)
+          AND NOT EXISTS (SELECT 1 FROM applications a WHERE a.username = u.username AND a.drive_id = d.id)
+    """, (drive_id,))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def delete_drive(drive_id):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("DELETE FROM drive_departments WHERE drive_id=?", (drive_id,))
+    c.execute("DELETE FROM drives WHERE id=?", (drive_id,))
+    conn.commit()
+    conn.close()
+    bump("drives", "drive_departments")
+
+
+def count_eligible_students(rule):
+    """Number of students matching an EligibilityRule, evaluated in SQL."""
+    where, params = rule.to_sql("u", "sp")
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT COUNT(*) FROM users u
+        LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE {where}
+    """, params)
+    count = c.fetchone()[0] or 0
+    conn.close()
+    return count
+
+
+def load_student_snapshot():
+    """
+    Load every student's eligibility attributes into NumPy arrays so that
+    EligibilityRule.mask can count eligible students without touching SQLite.
+    """
+    import numpy as np
+
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT u.username, u.department, sp.cgpa, sp.backlogs, sp.grad_year
+        FROM users u
+        LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE u.role = 'Student'
+    """)
+    rows = c.fetchall()
+    conn.close()
+
+    return {
+        "username": np.array([r[0] for r in rows], dtype=object),
+        "department": np.array([r[1] for r in rows], dtype=object),
+        "cgpa": np.array([r[2] if r[2] is not None else np.nan for r in rows], dtype=np.float32),
+        "backlogs": np.array([r[3] or 0 for r in rows], dtype=np.int16),
+        "grad_year": np.array([r[4] or 0 for r in rows], dtype=np.int16),
+    }
+
+
+# =======================================================================
+#                         APPLICANT PIPELINE
+# =======================================================================
+
+APPLICATION_STATUSES = ["Applied", "Shortlisted", "Selected", "Rejected"]
+
+# Latest resume score of the applicant; an index seek on idx_resume_analysis_user per row
+_LATEST_SCORE_SQL = "(SELECT ra.score FROM resume_analysis ra WHERE ra.username = a.username ORDER BY ra.id DESC LIMIT 1)"
+
+
+def get_application(username, drive_id):
+    """(application_id, status) of a student's application to a drive, or None."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("SELECT id, status FROM applications WHERE username=? AND drive_id=?", (username, drive_id))
+    row = c.fetchone()
+    conn.close()
+    return row
+
+
+def apply_to_drive(username, drive_id):
+    """
+    Apply a student to a drive, checked against their saved profile: the drive
+    must be active, target their department (or ALL) and pass drive_filter_sql.
+    Applying again (e.g. a double submit) inserts nothing and returns the
+    existing application. Returns the application id, or None if the student
+    is not eligible.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT u.department, sp.cgpa, COALESCE(sp.backlogs, 0), sp.grad_year
+        FROM users u LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE u.username=?
+    """, (username,))
+    profile = c.fetchone()
+    app_id = None
+    if profile is not None:
+        department, cgpa, backlogs, grad_year = profile
+        c.execute(f"""
+            INSERT INTO applications (username, drive_id, applied_on, status)
+            SELECT ?, d.id, ?, 'Applied'
+            FROM drives d
+            WHERE d.id = ? AND {drive_filter_sql("d")}
+              AND EXISTS (SELECT 1 FROM drive_departments dd
+                          WHERE dd.drive_id = d.id AND dd.department IN (?, '{ALL_DEPARTMENTS}'))
+              AND NOT EXISTS (SELECT 1 FROM applications a WHERE a.username = ? AND a.drive_id = d.id)
+        """, (username, datetime.utcnow().isoformat(), drive_id, cgpa, backlogs, grad_year, department, username))
+        if c.rowcount:
+            app_id = c.lastrowid
+        else:
+            c.execute("SELECT id FROM applications WHERE username=? AND drive_id=?", (username, drive_id))
+            existing = c.fetchone()
+            if existing:
+                conn.close()
+                return existing[0]
+    conn.commit()
+    conn.close()
+    if app_id is not None:
+        bump("applications")
+    return app_id
+
+
+def get_student_applications(username):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT a.id, d.company, d.role, d.package, d.date, a.applied_on, a.status, d.deadline
+        FROM applications a
+        JOIN drives d ON a.drive_id = d.id
+        WHERE a.username = ?
+        ORDER BY a.applied_on DESC
+    """, (username,))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+@cached_query("applications")
+def get_application_status_counts(drive_id):
+    """Per-status applicant counts for a drive from a single GROUP BY."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("SELECT status, COUNT(*) FROM applications WHERE drive_id=? GROUP BY status", (drive_id,))
+    counts = {status: 0 for status in APPLICATION_STATUSES}
+    for status, n in c.fetchall():
+        counts[status or "Applied"] = counts.get(status or "Applied", 0) + n
+    conn.close()
+    return counts
+
+
+def get_drive_applicants(drive_id, status=None, page=0, page_size=50):
+    """
+    One page of a drive's applicants joined with CGPA and latest resume score,
+    best score first. Returns (rows, total_matching).
+    """
+    where = "a.drive_id = ?"
+    params = [drive_id]
+    if status:
+        where += " AND a.status = ?"
+        params.append(status)
+
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"SELECT COUNT(*) FROM applications a WHERE {where}", params)
+    total = c.fetchone()[0] or 0
+    c.execute(f"""
+        SELECT a.id, a.username, u.department, sp.cgpa, {_LATEST_SCORE_SQL} AS score, a.status, a.applied_on
+        FROM applications a
+        LEFT JOIN users u ON u.username = a.username
+        LEFT JOIN student_profiles sp ON sp.username = a.username
+        WHERE {where}
+        ORDER BY score IS NULL, score DESC, sp.cgpa DESC, a.id
+        LIMIT ? OFFSET ?
+    """, params + [page_size, page * page_size])
+    rows = c.fetchall()
+    conn.close()
+    return rows, total
+
+
+def update_application_status(application_ids, status, remarks=None):
+    """Move the given applications to `status` in a single transaction."""
+    if status not in APPLICATION_STATUSES:
+        raise ValueError(f"Unknown application status: {status}")
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    newly_selected = []
+    if status == "Selected" and application_ids:
+        # Selecting an applicant records the placement for that drive's company/package
+        q_marks = ",".join("?" * len(application_ids))
+        c.execute(f"""
+            SELECT a.username, d.company, d.package FROM applications a
+            JOIN drives d ON d.id = a.drive_id
+            WHERE a.id IN ({q_marks}) AND a.status != 'Selected'
+        """, tuple(application_ids))
+        newly_selected = c.fetchall()
+    c.executemany("UPDATE applications SET status=?, remarks=COALESCE(?, remarks) WHERE id=?",
+                  [(status, remarks, app_id) for app_id in application_ids])
+    updated = conn.total_changes
+    placed_on = datetime.utcnow().isoformat()
+    for uname, company, package in newly_selected:
+        _record_placement(c, uname, company, package, placed_on)
+    conn.commit()
+    conn.close()
+    bump("applications")
+    if newly_selected:
+        bump("placements", "placement_rollups")
+        bump("student_profiles", keys=[uname for uname, _, _ in newly_selected])
+    return updated
+
+
+def shortlist_top_applicants(drive_id, top_n, reject_rest=True):
+    """
+    Shortlist the top_n pending applicants (Applied/Shortlisted) by latest
+    resume score, and optionally reject the remaining pending ones, atomically.
+    Returns (shortlisted, rejected) counts.
+    """
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    c = conn.cursor()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS _top_applicants (id INTEGER PRIMARY KEY)")
+        c.execute("DELETE FROM _top_applicants")
+        c.execute(f"""
+            INSERT INTO _top_applicants (id)
+            SELECT a.id FROM applications a
+            LEFT JOIN student_profiles sp ON sp.username = a.username
+            WHERE a.drive_id = ? AND a.status IN ('Applied', 'Shortlisted')
+            ORDER BY {_LATEST_SCORE_SQL} IS NULL, {_LATEST_SCORE_SQL} DESC, sp.cgpa DESC, a.id
+            LIMIT ?
+        """, (drive_id, int(top_n)))
+        c.execute("""
+            UPDATE applications SET status='Shortlisted'
+            WHERE drive_id = ? AND id IN (SELECT id FROM _top_applicants)
+        """, (drive_id,))
+        shortlisted = c.rowcount
+        rejected = 0
+        if reject_rest:
+            c.execute("""
+                UPDATE applications SET status='Rejected'
+                WHERE drive_id = ? AND status IN ('Applied', 'Shortlisted')
+                  AND id NOT IN (SELECT id FROM _top_applicants)
+            """, (drive_id,))
+            rejected = c.rowcount
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    bump("applications")
+    return shortlisted, rejected
+
+
+# =======================================================================
+#                         EMAIL OUTBOX
+# =======================================================================
+
+def _utc_now(offset_seconds=0):
+    return (datetime.utcnow() + timedelta(seconds=offset_seconds)).isoformat(sep=" ", timespec="seconds")
+
+
+def enqueue_emails(messages):
+    """
+    Queue (recipient, subject, body[, dedupe_key]) tuples for email_dispatcher.
+    A message whose dedupe_key is already queued is skipped. Returns the number queued.
+    """
+    now = _utc_now()
+    rows = [(m[0], m[1], m[2], m[3] if len(m) > 3 else None, now, now) for m in messages if m[0]]
+    if not rows:
+        return 0
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    c = conn.cursor()
+    before = conn.total_changes
+    c.executemany("""
+        INSERT OR IGNORE INTO email_outbox (recipient, subject, body, dedupe_key, next_attempt_at, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    queued = conn.total_changes - before
+    conn.commit()
+    conn.close()
+    return queued
+
+
+def claim_email_batch(worker_id, limit=100, stale_after_seconds=600):
+    """
+    Atomically claim up to `limit` due messages for worker_id.
+    Claims older than stale_after_seconds (a worker that died mid-send) are
+    released first. Returns [(id, recipient, subject, body, attempts)].
+    """
+    conn = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None)
+    c = conn.cursor()
+    now = _utc_now()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("""
+            UPDATE email_outbox SET status='pending', claimed_by=NULL, claimed_at=NULL
+            WHERE status='sending' AND claimed_at < ?
+        """, (_utc_now(-stale_after_seconds),))
+        c.execute("""
+            SELECT id FROM email_outbox
+            WHERE status='pending' AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, id
+            LIMIT ?
+        """, (now, limit))
+        ids = [r[0] for r in c.fetchall()]
+        rows = []
+        if ids:
+            q_marks = ",".join("?" * len(ids))
+            c.execute(f"UPDATE email_outbox SET status='sending', claimed_by=?, claimed_at=? WHERE id IN ({q_marks})",
+                      (worker_id, now, *ids))
+            c.execute(f"SELECT id, recipient, subject, body, attempts FROM email_outbox WHERE id IN ({q_marks}) ORDER BY id",
+                      ids)
+            rows = c.fetchall()
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return rows
+
+
+def record_email_results(worker_id, sent_ids, failures, max_attempts=5, retry_base_seconds=60):
+    """
+    Record a dispatch round: sent_ids are delivered; failures is [(id, error)].
+    Failed messages are retried with exponential backoff until max_attempts,
+    then marked 'failed'. Only rows still claimed by worker_id are touched.
+    """
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    c = conn.cursor()
+    now = _utc_now()
+    c.executemany("""
+        UPDATE email_outbox SET status='sent', sent_at=?, attempts=attempts+1, claimed_by=NULL, last_error=NULL
+        WHERE id=? AND claimed_by=?
+    """, [(now, i, worker_id) for i in sent_ids])
+    if failures:
+        ids = [i for i, _ in failures]
+        q_marks = ",".join("?" * len(ids))
+        c.execute(f"SELECT id, attempts FROM email_outbox WHERE id IN ({q_marks})", ids)
+        attempts = dict(c.fetchall())
+        updates = []
+        for message_id, error in failures:
+            tried = attempts.get(message_id, 0) + 1
+            status = "failed" if tried >= max_attempts else "pending"
+            retry_at = _utc_now(retry_base_seconds * 2 ** (tried - 1))
+            updates.append((status, tried, retry_at, str(error)[:500], message_id, worker_id))
+        c.executemany("""
+            UPDATE email_outbox SET status=?, attempts=?, next_attempt_at=?, last_error=?, claimed_by=NULL
+            WHERE id=? AND claimed_by=?
+        """, updates)
+    conn.commit()
+    conn.close()
+
+
+def get_outbox_counts():
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+    counts = dict(c.fetchall())
+    conn.close()
+    return counts
+
+
+# =======================================================================
+#                         NOTIFICATIONS
+# =======================================================================
+
+def add_notifications(rows):
+    """
+    Insert (username, drive_id, event, title, body) feed entries in one
+    transaction; entries whose (username, event) already exists are skipped.
+    Returns the number added.
+    """
+    now = _utc_now()
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    c = conn.cursor()
+    before = conn.total_changes
+    c.executemany("""
+        INSERT OR IGNORE INTO notifications (username, drive_id, event, title, body, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(*row, now) for row in rows])
+    added = conn.total_changes - before
+    conn.commit()
+    conn.close()
+    bump("notifications")
+    return added
+
+
+def get_notifications(username, limit=20):
+    """Newest feed entries for a student: [(id, drive_id, title, body, created_at, read_at)]."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT id, drive_id, title, body, created_at, read_at
+        FROM notifications
+        WHERE username=?
+        ORDER BY id DESC
+        LIMIT ?
+    """, (username, limit))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def mark_notifications_read(username):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("UPDATE notifications SET read_at=? WHERE username=? AND read_at IS NULL", (_utc_now(), username))
     conn.commit()
     conn.close()
+    bump("notifications")
 
 
 # =======================================================================
 #                         ANALYTICS & REPORTS
 # =======================================================================
 
+def iter_department_students(department, page_size=500):
+    """
+    Stream (username, cgpa, placed, package, latest resume score) for a department,
+    ordered by username, fetching page_size rows at a time from one cursor.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        c = conn.cursor()
+        c.execute("""
+            SELECT u.username, sp.cgpa, COALESCE(sp.placed, 0), sp.package,
+                   (SELECT ra.score FROM resume_analysis ra WHERE ra.username = u.username
+                    ORDER BY ra.id DESC LIMIT 1)
+            FROM users u
+            LEFT JOIN student_profiles sp ON u.username = sp.username
+            WHERE u.role = 'Student' AND u.department = ?
+            ORDER BY u.username
+        """, (department,))
+        while True:
+            batch = c.fetchmany(page_size)
+            if not batch:
+                break
+            yield from batch
+    finally:
+        conn.close()
+
+
+def get_departments(db_file=None):
+    """Departments that have at least one student account (db_file defaults to DB_FILE)."""
+    conn = sqlite3.connect(db_file or DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT DISTINCT department FROM users
+        WHERE role='Student' AND department IS NOT NULL AND department != ''
+        ORDER BY department
+    """)
+    rows = [r[0] for r in c.fetchall()]
+    conn.close()
+    return rows
+
+
+def department_fingerprint(department, db_file=None):
+    """
+    Cheap content fingerprint of everything a department report is built from.
+    Changes whenever a student, profile, resume analysis or placement of the
+    department is added or modified. db_file defaults to DB_FILE.
+    """
+    conn = sqlite3.connect(db_file or DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT COUNT(*), TOTAL(u.id), TOTAL(sp.cgpa), TOTAL(sp.placed), TOTAL(sp.package)
+        FROM users u LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE u.role = 'Student' AND u.department = ?
+    """, (department,))
+    parts = list(c.fetchone())
+    c.execute("""
+        SELECT COUNT(*), MAX(ra.id) FROM resume_analysis ra
+        JOIN users u ON u.username = ra.username WHERE u.department = ?
+    """, (department,))
+    parts.extend(c.fetchone())
+    c.execute("""
+        SELECT COUNT(*), MAX(p.id), TOTAL(p.package) FROM placements p
+        JOIN users u ON u.username = p.username WHERE u.department = ?
+    """, (department,))
+    parts.extend(c.fetchone())
+    conn.close()
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def get_department_skill_rows(department):
+    """(username, cgpa, placed, latest resume score, latest skills csv) for every student in a department."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("""
+        SELECT u.username, sp.cgpa, COALESCE(sp.placed, 0), ra.score, ra.skills
+        FROM users u
+        LEFT JOIN student_profiles sp ON sp.username = u.username
+        LEFT JOIN resume_analysis ra ON ra.id = (
+            SELECT MAX(r2.id) FROM resume_analysis r2 WHERE r2.username = u.username
+        )
+        WHERE u.role = 'Student' AND u.department = ?
+    """, (department,))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+def get_department_drive_cutoffs(department):
+    """(drive_id, company, role, min_cgpa) for active drives open to a department."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT d.id, d.company, d.role, d.min_cgpa
+        FROM drive_departments dd
+        JOIN drives d ON d.id = dd.drive_id
+        WHERE dd.department IN (?, '{ALL_DEPARTMENTS}') AND d.is_active = 1
+        ORDER BY d.company
+    """, (department,))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+STUDENT_SORT_COLUMNS = {
+    "cgpa": "sp.cgpa",
+    "score": "score",
+    "package": "sp.package",
+    "username": "u.username",
+}
+
+
+@cached_query("users", "student_profiles", "resume_analysis")
+def get_department_students_page(department, placed=None, sort_by="cgpa", descending=True, page=0, page_size=25):
+    """
+    One sorted page of a department's students:
+    rows of (username, cgpa, placed, package, latest resume score), plus the total matching count.
+    placed=True/False restricts to placed/unplaced students; None returns both.
+    """
+    order_col = STUDENT_SORT_COLUMNS.get(sort_by, "sp.cgpa")
+    direction = "DESC" if descending else "ASC"
+    where = "u.role = 'Student' AND u.department = ?"
+    if placed is True:
+        where += " AND sp.placed = 1"
+    elif placed is False:
+        where += " AND COALESCE(sp.placed, 0) = 0"
+
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT COUNT(*) FROM users u
+        LEFT JOIN student_profiles sp ON u.username = sp.username
+        WHERE {where}
+    """, (department,))
+    total = c.fetchone()[0] or 0
+    c.execute(f"""
+        SELECT u.username, sp.cgpa, COALESCE(sp.placed, 0), sp.package,
+               (SELECT ra.score FROM resume_analysis ra WHERE ra.username = u.username
+                ORDER BY ra.id DESC LIMIT 1) AS score
+        FROM users u
+        LEFT JOIN student_profiles sp ON u.username = sp.username
+        WHERE {where}
+        ORDER BY {order_col} IS NULL, {order_col} {direction}, u.username
+        LIMIT ? OFFSET ?
+    """, (department, page_size, page * page_size))
+    rows = c.fetchall()
+    conn.close()
+    return rows, total
+
+
+@cached_query("users", "student_profiles")
 def get_department_stats(department):
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
@@ -232,6 +1385,7 @@ def get_department_stats(department):
     }
 
 
+@cached_query("users", "placements")
 def get_top_recruiters(department, top_n=5):
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
@@ -249,6 +1403,7 @@ def get_top_recruiters(department, top_n=5):
     return [(r[0], int(r[1]), round(r[2] or 0, 2)) for r in rows]
 
 
+@cached_query("users", "student_profiles", "resume_analysis")
 def get_skill_gap_insights(department, top_k=5):
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
@@ -299,3 +1454,77 @@ def get_skill_gap_insights(department, top_k=5):
         "missing_skills": missing,
         "recommendation": recommendation
     }
+
+
+@cached_query("placement_rollups", "users", "student_profiles")
+def get_placement_trend(department, granularity="weekly", window=4):
+    """
+    Placement time series for a department from the rollup tables:
+    one dict per day/week with offers, newly placed students, avg package,
+    a rolling average of new placements over `window` periods and the
+    cumulative placement percentage.
+    """
+    table = {"daily": "placement_daily", "weekly": "placement_weekly"}.get(granularity)
+    if table is None:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT bucket, SUM(offers), SUM(new_students), TOTAL(package_total)
+        FROM {table}
+        WHERE department = ?
+        GROUP BY bucket
+        ORDER BY bucket
+    """, (department,))
+    rows = c.fetchall()
+    c.execute("SELECT COUNT(*) FROM users WHERE role='Student' AND department=?", (department,))
+    total_students = c.fetchone()[0] or 0
+    conn.close()
+
+    trend, recent, cumulative = [], [], 0
+    for bucket, offers, new_students, package_total in rows:
+        recent.append(new_students)
+        if len(recent) > window:
+            recent.pop(0)
+        cumulative += new_students
+        trend.append({
+            "period": bucket,
+            "offers": offers,
+            "new_students": new_students,
+            "avg_package": round(package_total / offers, 2) if offers else 0.0,
+            "rolling_avg": round(sum(recent) / len(recent), 2),
+            "cumulative_placed": cumulative,
+            "cumulative_pct": round(cumulative / total_students * 100, 2) if total_students else 0.0,
+        })
+    return trend
+
+
+@cached_query("student_profiles", "users")
+def get_readiness_leaderboard(department=None, placed=0, limit=100):
+    """
+    Top `limit` students by persisted readiness: rows of
+    (username, department, cgpa, readiness, placed, package).
+    With a department this is an index seek on (department, placed, readiness DESC).
+    placed=None ranks placed and unplaced students together.
+    """
+    filters, params = ["readiness IS NOT NULL"], []
+    if department:
+        filters.append("department = ?")
+        params.append(department)
+    if placed is not None:
+        filters.append("placed = ?")
+        params.append(1 if placed else 0)
+
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT username, department, cgpa, readiness, placed, package
+        FROM student_profiles
+        WHERE {" AND ".join(filters)}
+        ORDER BY readiness DESC
+        LIMIT ?
+    """, params + [limit])
+    rows = c.fetchall()
+    conn.close()
+    return rows
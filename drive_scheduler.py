@@ -0,0 +1,144 @@
+# drive_scheduler.py
+# Automatic drive lifecycle: closes drives whose deadline has passed.
+# Applicants of closed drives get an email queued in the outbox; delivery is
+# email_dispatcher's job, so a CLI sweep on its own still queues them.
+# Each sweep then archives closed drives from past academic seasons
+# (archive.archive_past_seasons); the current season stays live.
+#
+# In-process:   drive_scheduler.start()            (idempotent, daemon thread)
+# As a CLI job: python drive_scheduler.py --once   (e.g. from cron)
+
+import argparse
+import threading
+import time
+from datetime import datetime
+
+import archive
+from database import (
+    close_expired_drives,
+    get_drive_applicants_usernames,
+    get_drive_summaries,
+    get_user_emails,
+    enqueue_emails,
+)
+
+DEFAULT_INTERVAL_SECONDS = 15 * 60
+
+_hooks = []
+_lock = threading.Lock()
+_thread = None
+_stop_event = threading.Event()
+
+
+# ------------------- Hooks -------------------
+def on_drives_closed(fn):
+    """
+    Register fn(closed_ids, applicants_by_drive) to run after every sweep
+    that closed at least one drive. Usable as a decorator.
+    """
+    if fn not in _hooks:
+        _hooks.append(fn)
+    return fn
+
+
+@on_drives_closed
+def _log_closed_drives(closed_ids, applicants_by_drive):
+    total = sum(len(v) for v in applicants_by_drive.values())
+    print(f"⏰ Closed {len(closed_ids)} expired drive(s) {closed_ids}; {total} applicant(s) to notify.")
+
+
+@on_drives_closed
+def _email_closed_drive_applicants(closed_ids, applicants_by_drive):
+    drives = get_drive_summaries(closed_ids)
+    emails = get_user_emails({u for users in applicants_by_drive.values() for u in users})
+    messages = []
+    for drive_id, usernames in applicants_by_drive.items():
+        company, role = drives.get(drive_id, ("a company", ""))
+        for username in usernames:
+            if username in emails:
+                messages.append((
+                    emails[username],
+                    f"Applications closed: {company} {role}".strip(),
+                    f"Hi {username},\n\nApplications for the {company} {role} drive are now closed. "
+                    "Check the Student Portal for updates on your application status.\n\n— Placement Cell",
+                    f"drive-closed:{drive_id}:{username}",
+                ))
+    if messages:
+        enqueue_emails(messages)
+
+
+# ------------------- Sweep -------------------
+def run_sweep(today=None, archive_seasons=True):
+    """
+    Close expired drives, fire the registered hooks, then move closed drives
+    of past academic seasons into the archive. Returns the closed drive ids.
+    """
+    closed_ids = close_expired_drives(today)
+    if closed_ids:
+        applicants = get_drive_applicants_usernames(closed_ids)
+        for hook in list(_hooks):
+            try:
+                hook(closed_ids, applicants)
+            except Exception as e:
+                # One failing hook must not stop the others or the scheduler
+                print(f"Drive scheduler hook {getattr(hook, '__name__', hook)} failed: {e}")
+    if archive_seasons:
+        try:
+            for year, moved in archive.archive_past_seasons().items():
+                print(f"🗄️ Archived {year}: {moved['drives']} drive(s), {moved['applications']} application(s), "
+                      f"{moved['placements']} placement(s).")
+        except Exception as e:
+            print(f"Drive scheduler archival failed: {e}")
+    return closed_ids
+
+
+def _loop(interval_seconds):
+    while not _stop_event.is_set():
+        try:
+            run_sweep()
+        except Exception as e:
+            print(f"Drive scheduler sweep failed: {e}")
+        _stop_event.wait(interval_seconds)
+
+
+def start(interval_seconds=DEFAULT_INTERVAL_SECONDS):
+    """Start the background sweeper once per process; later calls are no-ops."""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return _thread
+        _stop_event.clear()
+        _thread = threading.Thread(target=_loop, args=(interval_seconds,), name="drive-scheduler", daemon=True)
+        _thread.start()
+        return _thread
+
+
+def stop(timeout=5):
+    global _thread
+    with _lock:
+        _stop_event.set()
+        if _thread is not None:
+            _thread.join(timeout)
+        _thread = None
+
+
+# ------------------- CLI -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Close placement drives past their deadline.")
+    parser.add_argument("--once", action="store_true", help="run a single sweep and exit")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL_SECONDS, help="seconds between sweeps")
+    args = parser.parse_args()
+
+    from database import init_db
+    init_db()
+
+    if args.once:
+        closed = run_sweep()
+        print(f"{datetime.now():%Y-%m-%d %H:%M} — sweep closed {len(closed)} drive(s).")
+    else:
+        start(args.interval)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            stop()
@@ -0,0 +1,110 @@
+# eligibility.py
+# Structured drive eligibility rules.
+# A rule compiles to a parameterized SQL WHERE clause (for queries against
+# users u LEFT JOIN student_profiles sp) and to a vectorized NumPy predicate
+# (for instant counts over an in-memory student snapshot).
+
+from dataclasses import dataclass, field
+
+ALL_DEPARTMENTS = "ALL"
+
+
+@dataclass(frozen=True)
+class EligibilityRule:
+    departments: tuple = field(default_factory=tuple)   # empty => any department
+    min_cgpa: float = None
+    max_backlogs: int = None
+    grad_year: int = None
+
+    # ------------------- Construction -------------------
+    @classmethod
+    def from_drive(cls, department=None, open_for_all=0, min_cgpa=None, max_backlogs=None, grad_year=None):
+        """Build a rule from the columns stored on a `drives` row."""
+        if open_for_all or not department or department == ALL_DEPARTMENTS:
+            departments = ()
+        else:
+            departments = tuple(d.strip() for d in str(department).split(",") if d.strip())
+        return cls(
+            departments=departments,
+            min_cgpa=float(min_cgpa) if min_cgpa not in (None, "") and float(min_cgpa) > 0 else None,
+            max_backlogs=int(max_backlogs) if max_backlogs not in (None, "") and int(max_backlogs) >= 0 else None,
+            grad_year=int(grad_year) if grad_year not in (None, "") and int(grad_year) > 0 else None,
+        )
+
+    @property
+    def open_for_all(self):
+        return not self.departments
+
+    # ------------------- SQL compilation -------------------
+    def to_sql(self, user_alias="u", profile_alias="sp"):
+        """
+        Return (where_clause, params) selecting eligible students.
+        Missing profile values are treated as 'unknown' and fail any bound on them.
+        """
+        clauses = [f"{user_alias}.role = 'Student'"]
+        params = []
+        if self.departments:
+            q_marks = ",".join("?" * len(self.departments))
+            clauses.append(f"{user_alias}.department IN ({q_marks})")
+            params.extend(self.departments)
+        if self.min_cgpa is not None:
+            clauses.append(f"{profile_alias}.cgpa >= ?")
+            params.append(self.min_cgpa)
+        if self.max_backlogs is not None:
+            clauses.append(f"COALESCE({profile_alias}.backlogs, 0) <= ?")
+            params.append(self.max_backlogs)
+        if self.grad_year is not None:
+            clauses.append(f"{profile_alias}.grad_year = ?")
+            params.append(self.grad_year)
+        return " AND ".join(clauses), params
+
+    # ------------------- NumPy predicate -------------------
+    def mask(self, snapshot):
+        """
+        Vectorized predicate over a student snapshot (see database.load_student_snapshot).
+        Returns a boolean array aligned with snapshot["username"].
+        """
+        import numpy as np
+
+        n = len(snapshot["username"])
+        result = np.ones(n, dtype=bool)
+        if self.departments:
+            result &= np.isin(snapshot["department"], np.array(self.departments, dtype=object))
+        if self.min_cgpa is not None:
+            # NaN (no CGPA recorded) compares False, matching the SQL semantics
+            result &= snapshot["cgpa"] >= self.min_cgpa
+        if self.max_backlogs is not None:
+            result &= snapshot["backlogs"] <= self.max_backlogs
+        if self.grad_year is not None:
+            result &= snapshot["grad_year"] == self.grad_year
+        return result
+
+    def count(self, snapshot):
+        return int(self.mask(snapshot).sum())
+
+    # ------------------- Display -------------------
+    def describe(self):
+        parts = [", ".join(self.departments) if self.departments else "All Departments"]
+        if self.min_cgpa is not None:
+            parts.append(f"CGPA ≥ {self.min_cgpa:g}")
+        if self.max_backlogs is not None:
+            parts.append(f"Backlogs ≤ {self.max_backlogs}")
+        if self.grad_year is not None:
+            parts.append(f"Batch {self.grad_year}")
+        return " • ".join(parts)
+
+
+def drive_filter_sql(drive_alias="d"):
+    """
+    Inverse direction of EligibilityRule.to_sql: a WHERE clause over `drives`
+    selecting the active drives a single student qualifies for. Department
+    targeting is resolved by joining drive_departments, not here.
+    Params order: cgpa, backlogs, grad_year.
+    """
+    d = drive_alias
+    return (
+        f"{d}.is_active = 1"
+        f" AND ({d}.min_cgpa IS NULL OR {d}.min_cgpa <= ?)"
+        f" AND ({d}.max_backlogs IS NULL OR {d}.max_backlogs >= ?)"
+        f" AND ({d}.grad_year IS NULL OR {d}.grad_year = ?)"
+    )
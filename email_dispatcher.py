@@ -0,0 +1,115 @@
+# email_dispatcher.py
+# Background delivery of the email_outbox table.
+#
+# Portal actions only INSERT into email_outbox (database.enqueue_emails) and
+# return immediately. This worker claims due messages in batches, sends them
+# over pooled SMTP sessions (email_service.send_bulk) at a bounded rate and
+# records per-message delivery state; failures are retried with backoff.
+# Claims survive restarts: a batch left 'sending' by a dead worker is
+# released after a timeout and picked up again.
+#
+# In-process:   email_dispatcher.start()            (idempotent, daemon thread)
+# As a CLI job: python email_dispatcher.py --once   (drain the due messages and exit)
+
+import argparse
+import os
+import socket
+import threading
+import time
+
+import email_service
+from database import claim_email_batch, record_email_results
+
+DEFAULT_INTERVAL_SECONDS = 30
+BATCH_SIZE = int(os.getenv("PLACEMENT_EMAIL_BATCH", "100"))
+RATE_PER_SECOND = float(os.getenv("PLACEMENT_EMAIL_RATE", "10"))
+MAX_ATTEMPTS = 5
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_lock = threading.Lock()
+_thread = None
+_stop_event = threading.Event()
+
+
+# ------------------- Dispatch -------------------
+def dispatch_once(batch_size=BATCH_SIZE, rate_per_second=RATE_PER_SECOND, pool=None):
+    """Claim one batch, send it and record the outcome. Returns (sent, failed)."""
+    batch = claim_email_batch(WORKER_ID, batch_size)
+    if not batch:
+        return 0, 0
+    started = time.monotonic()
+    results = email_service.send_bulk([(r[1], r[2], r[3]) for r in batch], pool=pool)
+    sent = [row[0] for row, res in zip(batch, results) if res["ok"]]
+    failures = [(row[0], res["error"]) for row, res in zip(batch, results) if not res["ok"]]
+    record_email_results(WORKER_ID, sent, failures, max_attempts=MAX_ATTEMPTS)
+
+    # Rate limit: a batch of n messages takes at least n / rate seconds
+    if rate_per_second:
+        remaining = len(batch) / rate_per_second - (time.monotonic() - started)
+        if remaining > 0:
+            _stop_event.wait(remaining)
+    return len(sent), len(failures)
+
+
+def drain(batch_size=BATCH_SIZE, rate_per_second=RATE_PER_SECOND):
+    """Dispatch batches until nothing is due. Returns total (sent, failed)."""
+    total_sent = total_failed = 0
+    while not _stop_event.is_set():
+        sent, failed = dispatch_once(batch_size, rate_per_second)
+        if not sent and not failed:
+            break
+        total_sent, total_failed = total_sent + sent, total_failed + failed
+    return total_sent, total_failed
+
+
+def _loop(interval_seconds):
+    while not _stop_event.is_set():
+        try:
+            drain()
+        except Exception as e:
+            print(f"Email dispatcher round failed: {e}")
+        _stop_event.wait(interval_seconds)
+
+
+def start(interval_seconds=DEFAULT_INTERVAL_SECONDS):
+    """Start the background dispatcher once per process; later calls are no-ops."""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return _thread
+        _stop_event.clear()
+        _thread = threading.Thread(target=_loop, args=(interval_seconds,), name="email-dispatcher", daemon=True)
+        _thread.start()
+        return _thread
+
+
+def stop(timeout=5):
+    global _thread
+    with _lock:
+        _stop_event.set()
+        if _thread is not None:
+            _thread.join(timeout)
+        _thread = None
+
+
+# ------------------- CLI -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deliver queued portal emails.")
+    parser.add_argument("--once", action="store_true", help="drain the due messages and exit")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL_SECONDS, help="seconds between rounds")
+    args = parser.parse_args()
+
+    from database import init_db
+    init_db()
+
+    if args.once:
+        sent, failed = drain()
+        print(f"Sent {sent} email(s); {failed} failed and will be retried or marked failed.")
+    else:
+        start(args.interval)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            stop()
@@ -1,23 +1,223 @@
+import os
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
-SENDER_EMAIL = "youremail@gmail.com"
-SENDER_PASS = "your_app_password"  # use App Password, not your normal one
 
-def send_email(recipient, subject, body):
+# ------------------- Configuration -------------------
+@dataclass(frozen=True)
+class SMTPConfig:
+    """SMTP settings; from_env() reads the PLACEMENT_SMTP_* environment variables."""
+    host: str = "smtp.gmail.com"
+    port: int = 587
+    username: str = ""
+    password: str = ""          # use an App Password, not the account password
+    sender: str = ""
+    starttls: bool = True
+    timeout: float = 30.0
+    pool_size: int = 4
+    max_messages_per_session: int = 200     # servers often cap messages per connection
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ.get
+        username = env("PLACEMENT_SMTP_USER", "")
+        return cls(
+            host=env("PLACEMENT_SMTP_HOST", cls.host),
+            port=int(env("PLACEMENT_SMTP_PORT", cls.port)),
+            username=username,
+            password=env("PLACEMENT_SMTP_PASSWORD", ""),
+            sender=env("PLACEMENT_SMTP_SENDER", username),
+            starttls=env("PLACEMENT_SMTP_STARTTLS", "1") not in ("0", "false", "no"),
+            timeout=float(env("PLACEMENT_SMTP_TIMEOUT", cls.timeout)),
+            pool_size=int(env("PLACEMENT_SMTP_POOL_SIZE", cls.pool_size)),
+            max_messages_per_session=int(env("PLACEMENT_SMTP_MAX_PER_SESSION", cls.max_messages_per_session)),
+        )
+
+
+# ------------------- Session pool -------------------
+class _Session:
+    """One authenticated SMTP connection and the number of messages sent on it."""
+
+    def __init__(self, config):
+        self.config = config
+        self.server = None
+        self.sent = 0
+        self.last_used = 0.0
+
+    def open(self):
+        self.close()
+        server = smtplib.SMTP(self.config.host, self.config.port, timeout=self.config.timeout)
+        try:
+            server.ehlo()
+            if self.config.starttls and server.has_extn("starttls"):
+                server.starttls()
+                server.ehlo()
+            if self.config.username:
+                server.login(self.config.username, self.config.password)
+        except Exception:
+            server.close()
+            raise
+        self.server, self.sent = server, 0
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                self.server.close()
+            self.server = None
+
+    def ensure_open(self, idle_check=60.0):
+        """(Re)connect if closed, worn out by the per-session cap, or dead after sitting idle."""
+        if self.server is not None and self.sent >= self.config.max_messages_per_session:
+            self.close()
+        elif self.server is not None and time.monotonic() - self.last_used > idle_check:
+            try:
+                if self.server.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self.server is None:
+            self.open()
+
+    def send(self, msg):
+        self.server.send_message(msg)
+        self.sent += 1
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """Small pool of reusable authenticated SMTP sessions (connections are opened on demand)."""
+
+    def __init__(self, config=None):
+        self.config = config or SMTPConfig.from_env()
+        self._idle = queue.LifoQueue()
+        for _ in range(max(1, self.config.pool_size)):
+            self._idle.put(_Session(self.config))
+
+    @contextmanager
+    def session(self):
+        s = self._idle.get()
+        try:
+            yield s
+        finally:
+            self._idle.put(s)
+
+    def close(self):
+        for s in list(self._idle.queue):
+            s.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool built from the environment on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool()
+    return _pool
+
+
+# ------------------- Sending -------------------
+def _build_message(sender, recipient, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+# Login failures: every later connection would be refused the same way
+LOGIN_ERRORS = (smtplib.SMTPAuthenticationError, smtplib.SMTPNotSupportedError)
+
+
+def _send_with_retry(session, msg, retries):
+    """Send on a pooled session, reconnecting on connection-level failures."""
+    attempt = 0
+    while True:
+        try:
+            session.ensure_open()
+            session.send(msg)
+            return
+        except (smtplib.SMTPRecipientsRefused,) + LOGIN_ERRORS:
+            raise       # bad address or credentials; a new connection will not help
+        except smtplib.SMTPResponseException as e:
+            if 500 <= e.smtp_code < 600:
+                raise   # permanent rejection (message or credentials)
+            error = e
+        except (smtplib.SMTPServerDisconnected, OSError) as e:
+            error = e
+        session.close()
+        attempt += 1
+        if attempt > retries:
+            raise error
+        time.sleep(min(2 ** attempt * 0.1, 2.0))
+
+
+def send_email(recipient, subject, body, pool=None):
     try:
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = recipient
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASS)
-            server.send_message(msg)
+        pool = pool or get_pool()
+        msg = _build_message(pool.config.sender, recipient, subject, body)
+        with pool.session() as session:
+            _send_with_retry(session, msg, retries=1)
         return True
     except Exception as e:
         print(f"Email failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def send_bulk(messages, pool=None, retries=2):
+    """
+    Send many (recipient, subject, body) messages over the pooled sessions.
+    Each pool session sends its share back to back on one connection, so a
+    batch costs one TLS handshake and login per session, not per message.
+    A rejected login fails the rest of the batch at once instead of logging
+    in again for every remaining message.
+    Returns [{"recipient", "ok", "error"}] in input order.
+    """
+    pool = pool or get_pool()
+    messages = list(messages)
+    results = [None] * len(messages)
+    work = queue.Queue()
+    for i, item in enumerate(messages):
+        work.put((i, item))
+    login_failed = []
+
+    def worker():
+        with pool.session() as session:
+            while not login_failed:
+                try:
+                    i, (recipient, subject, body) = work.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    _send_with_retry(session, _build_message(pool.config.sender, recipient, subject, body), retries)
+                    results[i] = {"recipient": recipient, "ok": True, "error": None}
+                except LOGIN_ERRORS as e:
+                    login_failed.append(e)
+                    results[i] = {"recipient": recipient, "ok": False, "error": str(e)}
+                except Exception as e:
+                    results[i] = {"recipient": recipient, "ok": False, "error": str(e)}
+
+    workers = min(max(1, pool.config.pool_size), len(messages))
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+    if login_failed:
+        error = f"not sent: SMTP login failed ({login_failed[0]})"
+        for i, (recipient, _, _) in enumerate(messages):
+            if results[i] is None:
+                results[i] = {"recipient": recipient, "ok": False, "error": error}
+    return results
@@ -0,0 +1,75 @@
+# notifications.py
+# Fan-out of drive announcements to eligible students.
+#
+# When a drive is created or updated, the recipients (eligible by department
+# and criteria, not yet applied) come from one set-based query
+# (database.get_drive_recipients). Per-recipient messages are rendered from
+# string templates in fixed-size batches; each batch is written to the
+# in-portal feed and queued in the email outbox with one multi-row insert
+# apiece, so a fan-out to 10k students is a handful of transactions.
+# Delivery happens later in email_dispatcher.
+
+from string import Template
+
+from database import (
+    get_drive_recipients,
+    get_drive_summaries,
+    add_notifications,
+    enqueue_emails,
+    drive_fingerprint,
+)
+
+BATCH_SIZE = 1000
+
+TEMPLATES = {
+    "created": (
+        Template("New drive: $company — $role"),
+        Template("Hi $username,\n\n$company is hiring for $role and you are eligible ($department). "
+                 "Apply from the Student Portal before the deadline.\n\n— Placement Cell"),
+    ),
+    "updated": (
+        Template("Drive updated: $company — $role"),
+        Template("Hi $username,\n\nThe $company $role drive you are eligible for has been updated. "
+                 "Check the Student Portal for the latest deadline and details.\n\n— Placement Cell"),
+    ),
+}
+
+
+def _render_batch(kind, drive_id, event, company, role, recipients):
+    subject_t, body_t = TEMPLATES[kind]
+    feed, emails = [], []
+    for username, department, email in recipients:
+        fields = {"username": username, "department": department or "-", "company": company, "role": role}
+        subject, body = subject_t.safe_substitute(fields), body_t.safe_substitute(fields)
+        feed.append((username, drive_id, event, subject, body))
+        if email:
+            emails.append((email, subject, body, f"{event}:{username}"))
+    return feed, emails
+
+
+def notify_drive(drive_id, kind="created", revision=""):
+    """
+    Notify every eligible student who has not applied to the drive.
+    kind is "created" or "updated"; revision distinguishes successive updates
+    so each distinct change is announced once. For updates it defaults to a
+    fingerprint of the drive's current content (database.drive_fingerprint),
+    so an edit to the deadline, description or eligibility is announced and
+    a save without changes is not.
+    Returns {"recipients", "notified", "emailed"}.
+    """
+    summary = get_drive_summaries([drive_id]).get(drive_id)
+    if summary is None:
+        return {"recipients": 0, "notified": 0, "emailed": 0}
+    company, role = summary
+    if kind == "updated" and not revision:
+        revision = drive_fingerprint(drive_id)
+    event = f"drive-{kind}:{drive_id}" + (f":{revision}" if revision else "")
+
+    recipients = get_drive_recipients(drive_id)
+    notified = emailed = 0
+    for start in range(0, len(recipients), BATCH_SIZE):
+        feed, emails = _render_batch(kind, drive_id, event, company, role, recipients[start:start + BATCH_SIZE])
+        notified += add_notifications(feed)
+        if emails:
+            emailed += enqueue_emails(emails)
+    return {"recipients": len(recipients), "notified": notified, "emailed": emailed}
@@ -3,8 +3,23 @@ import pandas as pd
 import os
 import csv
 import sqlite3
+import zipfile
+from io import BytesIO
 from datetime import datetime
-from database import add_auto_user, get_all_users, export_users_to_csv
+from database import (
+    add_auto_user,
+    get_all_users,
+    export_users_to_csv,
+    get_role_counts,
+    get_readiness_leaderboard,
+    get_duplicate_resume_clusters,
+    get_outbox_counts,
+)
+import archive
+import bootstrap
+import batch_reports
+import query_cache
+import skill_index
 
 # ---------------------- PAGE CONFIG ----------------------
 st.set_page_config(page_title="Admin Portal", layout="wide", page_icon="👩‍💼")
@@ -14,6 +29,9 @@ if "logged_in" not in st.session_state or st.session_state.get("role") != "Admin
     st.error("🚫 Access Denied! Please log in as Admin.")
     st.stop()
 
+# ---------------------- INITIALIZE DATABASE ----------------------
+bootstrap.ensure_ready()
+
 # ---------------------- HEADER ----------------------
 st.title("👩‍💼 Admin Portal — Manage & Generate Accounts")
 st.markdown("""
@@ -48,15 +66,10 @@ DEPARTMENTS = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "AI&DS"]
 # ---------------------- SYSTEM SUMMARY ----------------------
 st.subheader("📊 System Summary")
 
-conn = sqlite3.connect("placement_portal.db")
-c = conn.cursor()
-c.execute("SELECT COUNT(*) FROM users WHERE role='Student'")
-student_count = c.fetchone()[0]
-c.execute("SELECT COUNT(*) FROM users WHERE role='HOD'")
-hod_count = c.fetchone()[0]
-c.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
-admin_count = c.fetchone()[0]
-conn.close()
+role_counts = get_role_counts()
+student_count = role_counts.get("Student", 0)
+hod_count = role_counts.get("HOD", 0)
+admin_count = role_counts.get("Admin", 0)
 
 col1, col2, col3 = st.columns(3)
 col1.metric("👩‍🎓 Total Students", student_count)
@@ -183,6 +196,165 @@ else:
 
 st.divider()
 
+# ---------------------- READINESS LEADERBOARD ----------------------
+st.subheader("🏆 Placement Readiness Leaderboard")
+
+lb1, lb2, lb3 = st.columns(3)
+with lb1:
+    lb_dept = st.selectbox("Department", ["All"] + DEPARTMENTS, key="admin_lb_dept")
+with lb2:
+    lb_status = st.selectbox("Status", ["Unplaced", "Placed", "All"], key="admin_lb_status")
+with lb3:
+    lb_n = st.number_input("Top N", min_value=5, max_value=500, value=100, step=5, key="admin_lb_n")
+
+leaders = get_readiness_leaderboard(
+    None if lb_dept == "All" else lb_dept,
+    {"Unplaced": 0, "Placed": 1, "All": None}[lb_status],
+    int(lb_n),
+)
+if leaders:
+    st.dataframe(pd.DataFrame(leaders, columns=["Username", "Department", "CGPA", "Readiness %", "Placed",
+                                                "Package (LPA)"]),
+                 use_container_width=True, hide_index=True)
+else:
+    st.info("No students with a readiness score yet.")
+
+st.divider()
+
+# ---------------------- STUDENT SEARCH ----------------------
+st.subheader("🔎 Student Search")
+st.caption("Filter students by skills, department, placement status and CGPA range.")
+
+index = skill_index.get_index()
+index.refresh()
+known_skills = index.skill_names()
+ss1, ss2 = st.columns(2)
+with ss1:
+    must_have = st.multiselect("Has all of these skills", known_skills, key="search_all")
+with ss2:
+    any_of = st.multiselect("Has any of these skills", known_skills, key="search_any")
+ss3, ss4, ss5 = st.columns(3)
+with ss3:
+    search_dept = st.selectbox("Department", ["All"] + DEPARTMENTS, key="search_dept")
+with ss4:
+    search_status = st.selectbox("Status", ["All", "Unplaced", "Placed"], key="search_status")
+with ss5:
+    cgpa_range = st.slider("CGPA range", 0.0, 10.0, (0.0, 10.0), 0.1, key="search_cgpa")
+
+if st.button("🔍 Search Students"):
+    filter_cgpa = cgpa_range != (0.0, 10.0)
+    total, found = skill_index.search_students(
+        must_have, any_of,
+        department=None if search_dept == "All" else search_dept,
+        placed={"All": None, "Unplaced": False, "Placed": True}[search_status],
+        cgpa_min=cgpa_range[0] if filter_cgpa else None,
+        cgpa_max=cgpa_range[1] if filter_cgpa else None,
+        limit=200,
+    )
+    if found:
+        st.write(f"**{total}** matching student(s){' — showing the first 200' if total > 200 else ''}.")
+        st.dataframe(pd.DataFrame(found, columns=["Username", "Department", "CGPA", "Placed", "Package (LPA)",
+                                                 "Readiness %"]),
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info("No students match these filters.")
+
+st.divider()
+
+# ---------------------- DUPLICATE RESUMES ----------------------
+st.subheader("🧬 Near-Duplicate Resumes")
+st.caption("Students whose latest uploaded resumes are near-identical (shared templates or one resume "
+           "used across accounts). These skew skill-gap insights and scoring.")
+
+if st.button("🔍 Find Duplicate Resumes"):
+    clusters = get_duplicate_resume_clusters()
+    if clusters:
+        st.warning(f"{len(clusters)} group(s) of near-duplicate resumes found.")
+        st.dataframe(pd.DataFrame([
+            {"Students": ", ".join(cl["usernames"]), "Count": len(cl["usernames"]),
+             "Similarity": f"{cl['similarity'] * 100:.0f}%"}
+            for cl in clusters
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ No near-duplicate resumes found.")
+
+st.divider()
+
+# ---------------------- EMAIL OUTBOX ----------------------
+st.subheader("📬 Email Outbox")
+st.caption("Notification emails are queued and delivered in the background with retries.")
+outbox = get_outbox_counts()
+ob1, ob2, ob3, ob4 = st.columns(4)
+ob1.metric("Pending", outbox.get("pending", 0))
+ob2.metric("Sending", outbox.get("sending", 0))
+ob3.metric("Sent", outbox.get("sent", 0))
+ob4.metric("Failed", outbox.get("failed", 0))
+
+st.divider()
+
+# ---------------------- MONTH-END REPORTS ----------------------
+st.subheader("🗂️ Month-End Department Reports")
+report_dir = os.path.join("reports", datetime.now().strftime("%Y-%m"))
+st.caption(f"Builds a PDF for every department plus an institute rollup in `{report_dir}`. "
+           "Departments whose data has not changed since the last run keep their existing report.")
+
+if st.button("🖨️ Generate All Department Reports"):
+    with st.spinner("Generating reports in parallel..."):
+        manifest = batch_reports.run_batch(report_dir)
+    report_rows = [
+        {"Department": d, "File": r.get("file", "-"), "Reused": r.get("cached"), "Seconds": r.get("seconds"),
+         "Error": r.get("error", "")}
+        for d, r in sorted(manifest["departments"].items())
+    ]
+    st.success(f"✅ Finished in {manifest['seconds']}s.")
+    st.dataframe(pd.DataFrame(report_rows), use_container_width=True, hide_index=True)
+
+    zip_buffer = BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in os.listdir(report_dir):
+            zf.write(os.path.join(report_dir, name), arcname=name)
+    st.download_button("⬇️ Download All Reports (ZIP)", data=zip_buffer.getvalue(),
+                       file_name=f"placement_reports_{datetime.now().strftime('%Y_%m')}.zip",
+                       mime="application/zip")
+
+st.divider()
+
+# ---------------------- SEASON ARCHIVE ----------------------
+st.subheader("🗄️ Season Archive")
+st.caption(f"Current academic season: **{archive.current_academic_year()}**. "
+           "Closed drives, their applications and placements from earlier seasons can be moved to the archive "
+           "so the live tables stay small.")
+
+if st.button("📦 Archive Past Seasons"):
+    moved = archive.archive_past_seasons()
+    if moved:
+        for year, counts in moved.items():
+            st.success(f"{year}: {counts['drives']} drive(s), {counts['applications']} application(s), "
+                       f"{counts['placements']} placement(s) archived.")
+    else:
+        st.info("Nothing to archive — all data belongs to the current season.")
+
+archived_years = archive.get_archived_years()
+if archived_years:
+    history = archive.get_placement_history()
+    hist_df = pd.DataFrame(history, columns=["Academic Year", "Username", "Department", "Company", "Package", "Placed On"])
+    summary = (hist_df.groupby("Academic Year")
+               .agg(Placements=("Username", "count"), Avg_Package=("Package", "mean"))
+               .round(2).reset_index())
+    st.write("**Placements by season (live + archive)**")
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+
+st.divider()
+
+# ---------------------- QUERY CACHE ----------------------
+with st.expander("⚡ Dashboard Query Cache"):
+    cache_report = query_cache.cache_stats()
+    if cache_report:
+        st.dataframe(pd.DataFrame.from_dict(cache_report, orient="index"), use_container_width=True)
+    if st.button("🧹 Clear Query Cache"):
+        query_cache.clear()
+        st.success("Query cache cleared.")
+
 # ---------------------- FOOTER NOTES ----------------------
 st.markdown("""
 **Notes**
@@ -3,7 +3,24 @@ import streamlit as st
 import pandas as pd
 import sqlite3
 from datetime import datetime
-from database import DB_FILE
+from database import (
+    DB_FILE,
+    APPLICATION_STATUSES,
+    load_student_snapshot,
+    add_drive,
+    close_drive,
+    delete_drive,
+    update_drive,
+    get_application_status_counts,
+    get_drive_applicants,
+    update_application_status,
+    shortlist_top_applicants,
+)
+from eligibility import EligibilityRule
+import bootstrap
+import drive_scheduler
+import notifications
+import query_cache
 
 # ---------------------- PAGE CONFIG ----------------------
 st.set_page_config(page_title="Placement Drive Management", layout="wide")
@@ -13,28 +30,15 @@ if "logged_in" not in st.session_state or st.session_state.get("role") != "Admin
     st.error("🚫 Access Denied! Only Admin/TPO can access this page.")
     st.stop()
 
-# ---------------------- INITIALIZE TABLES ----------------------
-def ensure_drive_tables():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS drives (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company TEXT,
-        role TEXT,
-        package REAL,
-        department TEXT,
-        open_for_all INTEGER DEFAULT 0,
-        date TEXT,
-        deadline TEXT,
-        description TEXT,
-        is_active INTEGER DEFAULT 1
-    )
-    """)
-    conn.commit()
-    conn.close()
-
-ensure_drive_tables()
+# ---------------------- INITIALIZE DATABASE ----------------------
+bootstrap.ensure_ready()
+
+@st.cache_resource(max_entries=2, ttl=query_cache.DEFAULT_TTL_SECONDS, show_spinner=False)
+def student_snapshot(db_file, versions):
+    # Reloaded whenever a users/student_profiles write bumps the data version
+    # (the TTL covers writes from other processes). Shared, not copied: the
+    # snapshot is only read, and eligibility counts on it are pure NumPy.
+    return load_student_snapshot()
 
 # ---------------------- HEADER ----------------------
 st.title("🚀 Placement Drive Management")
@@ -53,26 +57,35 @@ with col1:
     company = st.text_input("🏢 Company Name")
     role = st.text_input("💼 Role / Position")
     package = st.number_input("💰 Package (in LPA)", min_value=0.0, step=0.1)
-    department = st.selectbox("🎓 Target Department", ["ALL", "CSE", "ECE", "EEE", "MECH", "CIVIL", "AI&DS"])
+    departments = st.multiselect("🎓 Target Departments", ["CSE", "ECE", "EEE", "MECH", "CIVIL", "AI&DS"])
 with col2:
-    open_for_all = st.checkbox("🌐 Open for All Departments", value=(department == "ALL"))
+    open_for_all = st.checkbox("🌐 Open for All Departments", value=not departments)
     date = st.date_input("📅 Drive Date", datetime.now())
     deadline = st.date_input("⏰ Application Deadline", datetime.now())
-    description = st.text_area("📝 Short Description (eligibility, process, etc.)")
+    description = st.text_area("📝 Short Description (process, rounds, etc.)")
+
+st.markdown("##### 🎯 Eligibility Criteria")
+ec1, ec2, ec3 = st.columns(3)
+with ec1:
+    min_cgpa = st.number_input("Minimum CGPA (0 = no cutoff)", min_value=0.0, max_value=10.0, step=0.1, value=0.0)
+with ec2:
+    max_backlogs = st.number_input("Max Active Backlogs (-1 = any)", min_value=-1, max_value=50, step=1, value=-1)
+with ec3:
+    grad_year = st.number_input("Graduation Year (0 = any)", min_value=0, max_value=2100, step=1, value=0)
+
+rule = EligibilityRule.from_drive(",".join(departments), 1 if open_for_all else 0, min_cgpa, max_backlogs, grad_year)
+eligible_count = rule.count(student_snapshot(DB_FILE, query_cache.data_version("users", "student_profiles")))
+st.info(f"👥 **{eligible_count}** student(s) currently eligible — {rule.describe()}")
 
 if st.button("✅ Add Placement Drive"):
     if not company or not role or package <= 0:
         st.error("⚠️ Please fill all required fields (company, role, package).")
     else:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO drives (company, role, package, department, open_for_all, date, deadline, description, is_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
-        """, (company, role, package, department, 1 if open_for_all else 0, str(date), str(deadline), description))
-        conn.commit()
-        conn.close()
-        st.success(f"🎯 Drive for {company} added successfully!")
+        drive_id = add_drive(company, role, package, list(rule.departments), date, deadline, description,
+                             rule.min_cgpa, rule.max_backlogs, rule.grad_year)
+        sent = notifications.notify_drive(drive_id, "created")
+        st.success(f"🎯 Drive for {company} added successfully! {eligible_count} student(s) eligible, "
+                   f"{sent['notified']} notified ({sent['emailed']} by email).")
 
 st.markdown("---")
 
@@ -94,25 +107,102 @@ else:
     selected_id = st.selectbox("Select Drive ID to Edit or Close", [r[0] for r in rows])
 
     action_col1, action_col2, action_col3 = st.columns(3)
+    with action_col3:
+        if st.button("⏰ Close Expired Drives Now"):
+            closed = drive_scheduler.run_sweep()
+            st.info(f"Closed {len(closed)} drive(s) past their deadline.")
+            if closed:
+                st.rerun()
+
     with action_col1:
         if st.button("🛑 Close Drive"):
-            conn = sqlite3.connect(DB_FILE)
-            c = conn.cursor()
-            c.execute("UPDATE drives SET is_active=0 WHERE id=?", (selected_id,))
-            conn.commit()
-            conn.close()
+            close_drive(selected_id)
             st.warning(f"Drive ID {selected_id} closed successfully.")
-            st.experimental_rerun()
+            st.rerun()
 
     with action_col2:
         if st.button("🗑️ Delete Drive"):
-            conn = sqlite3.connect(DB_FILE)
-            c = conn.cursor()
-            c.execute("DELETE FROM drives WHERE id=?", (selected_id,))
-            conn.commit()
-            conn.close()
+            delete_drive(selected_id)
             st.error(f"Drive ID {selected_id} deleted permanently.")
-            st.experimental_rerun()
+            st.rerun()
+
+    with st.expander("✏️ Edit Selected Drive"):
+        current = next(r for r in rows if r[0] == selected_id)
+        try:
+            current_deadline = datetime.strptime(current[7], "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            current_deadline = datetime.now().date()
+        new_deadline = st.date_input("⏰ Application Deadline", current_deadline, key=f"edit_deadline_{selected_id}")
+        new_description = st.text_area("📝 Description", current[8] or "", key=f"edit_description_{selected_id}")
+        notify_students = st.checkbox("🔔 Notify eligible students who have not applied", value=True)
+        if st.button("💾 Save Changes"):
+            was_active = bool(current[9])
+            active = update_drive(selected_id, new_deadline, new_description)
+            status_note = " and reopened" if active and not was_active else ""
+            if notify_students and active:
+                sent = notifications.notify_drive(selected_id, "updated")
+                st.success(f"Drive ID {selected_id} updated{status_note}; {sent['notified']} student(s) notified.")
+            elif notify_students:
+                st.warning(f"Drive ID {selected_id} updated, but it is closed, so no students were notified. "
+                           "Extend the deadline to today or later to reopen it.")
+            else:
+                st.success(f"Drive ID {selected_id} updated{status_note}.")
+
+st.markdown("---")
+
+# ---------------------- APPLICANT PIPELINE ----------------------
+st.subheader("👥 Applicant Pipeline")
+
+if rows:
+    drive_labels = {r[0]: f"#{r[0]} — {r[1]} ({r[2]})" for r in rows}
+    pipeline_drive = st.selectbox("Select Drive", list(drive_labels), format_func=drive_labels.get, key="pipeline_drive")
+
+    counts = get_application_status_counts(pipeline_drive)
+    count_cols = st.columns(len(counts) + 1)
+    count_cols[0].metric("Total", sum(counts.values()))
+    for col, (status_name, n) in zip(count_cols[1:], counts.items()):
+        col.metric(status_name, n)
+
+    PAGE_SIZE = 50
+    f1, f2 = st.columns([2, 1])
+    with f1:
+        status_filter = st.selectbox("Filter by Status", ["All"] + APPLICATION_STATUSES, key="pipeline_status")
+    status_arg = None if status_filter == "All" else status_filter
+    filtered_total = sum(counts.values()) if status_arg is None else counts.get(status_arg, 0)
+    with f2:
+        last_page = max((filtered_total - 1) // PAGE_SIZE, 0)
+        page_no = st.number_input(f"Page (1–{last_page + 1})", min_value=1, max_value=last_page + 1, value=1, step=1,
+                                  key="pipeline_page")
+
+    applicants, _ = get_drive_applicants(pipeline_drive, status_arg, page=page_no - 1, page_size=PAGE_SIZE)
+    if not applicants:
+        st.info("No applicants for this drive yet.")
+    else:
+        app_df = pd.DataFrame(applicants, columns=["Application ID", "Username", "Department", "CGPA",
+                                                   "Resume Score", "Status", "Applied On"])
+        st.dataframe(app_df, use_container_width=True, hide_index=True)
+
+        b1, b2 = st.columns(2)
+        with b1:
+            st.markdown("**Bulk update selected applications**")
+            selected_apps = st.multiselect("Application IDs (this page)", app_df["Application ID"].tolist(),
+                                           key="pipeline_selected")
+            new_status = st.selectbox("New Status", APPLICATION_STATUSES, key="pipeline_new_status")
+            if st.button("🔁 Update Status") and selected_apps:
+                update_application_status(selected_apps, new_status)
+                st.success(f"{len(selected_apps)} application(s) moved to {new_status}.")
+                st.rerun()
+        with b2:
+            st.markdown("**Shortlist by resume score**")
+            top_n = st.number_input("Shortlist top N", min_value=1, max_value=max(sum(counts.values()), 1),
+                                    value=min(10, max(sum(counts.values()), 1)), step=1, key="pipeline_top_n")
+            reject_rest = st.checkbox("Reject all other pending applicants", value=True, key="pipeline_reject_rest")
+            if st.button("⭐ Apply Shortlist"):
+                shortlisted, rejected = shortlist_top_applicants(pipeline_drive, top_n, reject_rest)
+                st.success(f"Shortlisted {shortlisted}, rejected {rejected}.")
+                st.rerun()
+else:
+    st.info("Add a drive to start managing applicants.")
 
 st.markdown("---")
 
@@ -2,15 +2,25 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
-import matplotlib.pyplot as plt
-from io import BytesIO
+import threading
+import zipfile
 from datetime import datetime
 from database import (
     DB_FILE,
     get_department_stats,
     get_top_recruiters,
     get_skill_gap_insights,
+    get_department_students_page,
+    get_placement_trend,
+    get_department_drive_cutoffs,
+    get_readiness_leaderboard,
 )
+import ai_assistant
+import ai_context
+import bootstrap
+import chart_service
+import placement_engine
+import simulator
 
 # ---------------------- PAGE CONFIG ----------------------
 st.set_page_config(page_title="HOD Portal", layout="wide")
@@ -22,6 +32,9 @@ if "logged_in" not in st.session_state or st.session_state.get("role") != "HOD":
 
 hod_username = st.session_state["username"]
 
+# ---------------------- INITIALIZE DATABASE ----------------------
+bootstrap.ensure_ready()
+
 # ---------------------- GET HOD DEPARTMENT ----------------------
 def get_hod_department(username):
     conn = sqlite3.connect(DB_FILE)
@@ -58,58 +71,97 @@ st.metric("Avg CGPA (Placed)", stats["avg_cgpa_placed"])
 st.markdown("---")
 st.subheader("🎓 Student Placement Details")
 
-conn = sqlite3.connect(DB_FILE)
-c = conn.cursor()
-c.execute("""
-    SELECT u.username, sp.cgpa, sp.placed, sp.package, ra.score
-    FROM users u
-    LEFT JOIN student_profiles sp ON u.username = sp.username
-    LEFT JOIN (
-        SELECT username, MAX(id) AS last_id FROM resume_analysis GROUP BY username
-    ) t ON t.username = u.username
-    LEFT JOIN resume_analysis ra ON ra.id = t.last_id
-    WHERE u.role = 'Student' AND u.department = ?
-""", (department,))
-rows = c.fetchall()
-conn.close()
+PAGE_SIZE = 25
+SORT_OPTIONS = {"CGPA": "cgpa", "Resume Score": "score", "Package": "package", "Username": "username"}
+VIEW_OPTIONS = {"✅ Placed": True, "🚫 Unplaced": False, "All": None}
+
+
+def compact_student_frame(rows):
+    """Build the visible page as a small frame: categorical status, float32 numerics."""
+    frame = pd.DataFrame(rows, columns=["Username", "CGPA", "Placed", "Package (LPA)", "Resume Score"])
+    frame["Status"] = pd.Categorical(frame.pop("Placed").map({1: "Placed", 0: "Unplaced"}),
+                                     categories=["Placed", "Unplaced"])
+    for col in ("CGPA", "Package (LPA)", "Resume Score"):
+        frame[col] = pd.to_numeric(frame[col], errors="coerce").astype("float32")
+    return frame
+
+
+v1, v2, v3, v4 = st.columns([2, 2, 1, 1])
+with v1:
+    view = st.radio("Show", list(VIEW_OPTIONS), horizontal=True, key="hod_view")
+with v2:
+    sort_label = st.selectbox("Sort by", list(SORT_OPTIONS), key="hod_sort")
+with v3:
+    descending = st.toggle("Descending", value=True, key="hod_desc")
+
+placed_filter = VIEW_OPTIONS[view]
+view_total = {True: stats["placed_count"], False: stats["unplaced_count"], None: stats["total_students"]}[placed_filter]
+last_page = max((view_total - 1) // PAGE_SIZE, 0)
+with v4:
+    page_no = st.number_input(f"Page (1–{last_page + 1})", min_value=1, max_value=last_page + 1, value=1, step=1,
+                              key="hod_page")
+
+rows, total = get_department_students_page(department, placed_filter, SORT_OPTIONS[sort_label], descending,
+                                           page_no - 1, PAGE_SIZE)
 
 if not rows:
-    st.info("No student records yet.")
+    if placed_filter is True:
+        st.warning("No placed students yet.")
+    elif placed_filter is False and stats["total_students"] > 0:
+        st.success("🎉 All students placed!")
+    else:
+        st.info("No student records yet.")
 else:
-    df = pd.DataFrame(rows, columns=["Username", "CGPA", "Placed", "Package (LPA)", "Resume Score"])
-    placed_df = df[df["Placed"] == 1]
-    unplaced_df = df[(df["Placed"] != 1) | (df["Placed"].isnull())]
+    first = (page_no - 1) * PAGE_SIZE + 1
+    st.caption(f"Showing {first}–{first + len(rows) - 1} of {total} student(s)")
+    st.dataframe(compact_student_frame(rows), use_container_width=True, hide_index=True)
 
-    st.write("### ✅ Placed Students")
-    if not placed_df.empty:
-        st.dataframe(placed_df, use_container_width=True)
-    else:
-        st.warning("No placed students yet.")
+# ---------------------- READINESS LEADERBOARD ----------------------
+st.markdown("---")
+st.subheader("🏆 Ready but Unplaced — Readiness Leaderboard")
 
-    st.write("### 🚫 Unplaced Students")
-    if not unplaced_df.empty:
-        st.dataframe(unplaced_df, use_container_width=True)
-    else:
-        st.success("🎉 All students placed!")
+lb_n = st.select_slider("Show top", options=[10, 25, 50, 100], value=25, key="hod_leaderboard_n")
+leaders = get_readiness_leaderboard(department, placed=0, limit=lb_n)
+if leaders:
+    lb_df = pd.DataFrame(leaders, columns=["Username", "Department", "CGPA", "Readiness %", "Placed", "Package (LPA)"])
+    st.dataframe(lb_df[["Username", "CGPA", "Readiness %"]], use_container_width=True, hide_index=True)
+else:
+    st.info("No unplaced students with a resume analysis yet.")
 
 # ---------------------- VISUALIZATION ----------------------
 st.markdown("---")
 st.subheader("📈 Placement Overview")
 
 if stats["total_students"] > 0:
-    fig, ax = plt.subplots()
-    ax.pie(
+    # Rendered once per stats snapshot; reruns reuse the cached PNG bytes
+    overview_png = chart_service.pie_chart(
         [stats["placed_count"], stats["unplaced_count"]],
         labels=["Placed", "Unplaced"],
-        autopct="%1.1f%%",
-        startangle=90,
         colors=["#4CAF50", "#FFC107"]
     )
-    ax.axis("equal")
-    st.pyplot(fig)
+    st.image(overview_png, width=420)
 else:
     st.info("No student data to visualize.")
 
+# ---------------------- PLACEMENT TREND ----------------------
+st.markdown("---")
+st.subheader("📉 Placement Trend")
+
+t1, t2 = st.columns([1, 1])
+with t1:
+    granularity = st.radio("Granularity", ["weekly", "daily"], horizontal=True, key="trend_granularity")
+with t2:
+    trend_window = st.slider("Rolling window (periods)", min_value=2, max_value=12, value=4, key="trend_window")
+
+trend = get_placement_trend(department, granularity, trend_window)
+if trend:
+    trend_df = pd.DataFrame(trend).set_index("period")
+    st.line_chart(trend_df[["cumulative_pct"]].rename(columns={"cumulative_pct": "Cumulative Placement %"}))
+    st.bar_chart(trend_df[["new_students", "rolling_avg"]]
+                 .rename(columns={"new_students": "New Placements", "rolling_avg": "Rolling Avg"}))
+else:
+    st.info("No placements recorded yet to show a trend.")
+
 # ---------------------- TOP RECRUITERS ----------------------
 st.markdown("---")
 st.subheader("🏢 Top Recruiters")
@@ -131,57 +183,105 @@ if skill_insight:
 else:
     st.info("Skill gap insights not available yet.")
 
-# ---------------------- AI ASSISTANT (BUILT-IN CHAT) ----------------------
+# ---------------------- WHAT-IF SIMULATOR ----------------------
+st.markdown("---")
+st.subheader("🔮 What-If Placement Simulator")
+
+# Loaded from SQLite once per data version; every widget change below is pure NumPy
+snapshot = simulator.get_snapshot(department)
+
+if len(snapshot["placed"]) == 0:
+    st.info("No student data to simulate yet.")
+else:
+    sim_col1, sim_col2 = st.columns(2)
+
+    with sim_col1:
+        st.markdown("**Relax a company's CGPA cutoff**")
+        cutoffs = get_department_drive_cutoffs(department)
+        drive_options = {"Custom cutoff": None}
+        drive_options.update({f"{company} — {role_name}": min_cgpa for _, company, role_name, min_cgpa in cutoffs})
+        chosen = st.selectbox("Drive", list(drive_options), key="sim_drive")
+        current_cutoff = st.number_input("Current cutoff", min_value=0.0, max_value=10.0, step=0.1,
+                                         value=float(drive_options[chosen] or 7.0), key=f"sim_cur_{chosen}")
+        new_cutoff = st.slider("Relaxed cutoff", min_value=0.0, max_value=max(float(current_cutoff), 0.1),
+                               value=max(float(current_cutoff) - 0.5, 0.0), step=0.1, key="sim_new")
+        cut = simulator.simulate_cgpa_cutoff(snapshot, current_cutoff, new_cutoff)
+        st.metric("Projected Placement %", f"{cut['projected_pct']}%",
+                  delta=f"{round(cut['projected_pct'] - cut['placed_pct'], 2)} pts")
+        st.caption(f"{cut['newly_eligible']} unplaced student(s) become eligible; "
+                   f"expected conversions ≈ {cut['expected_new_placements']} "
+                   f"at a {cut['conversion_rate']:.0%} conversion rate.")
+
+    with sim_col2:
+        st.markdown("**Unplaced students gain a skill**")
+        if snapshot["skill_names"]:
+            rates = simulator.skill_placement_rates(snapshot)
+            skill = st.selectbox("Skill", sorted(rates, key=rates.get, reverse=True),
+                                 format_func=lambda s: f"{s} ({rates[s]:.0%} placed)", key="sim_skill")
+            adoption = st.slider("Share of unplaced students who gain it", 0.0, 1.0, 0.5, 0.05, key="sim_adoption")
+            gain = simulator.simulate_skill_gain(snapshot, skill, adoption)
+            st.metric("Projected Placement %", f"{gain['projected_pct']}%",
+                      delta=f"{round(gain['projected_pct'] - gain['placed_pct'], 2)} pts")
+            st.caption(f"{gain['affected']} student(s) affected; observed uplift {gain['uplift']:.0%}; "
+                       f"expected conversions ≈ {gain['expected_new_placements']}.")
+        else:
+            st.info("No resume skills analysed yet for this department.")
+
+# ---------------------- AI ASSISTANT ----------------------
 st.markdown("---")
 st.subheader("🤖 AI Placement Assistant")
 
 with st.expander("💬 Chat with AI Assistant"):
     user_input = st.text_input("Ask about placement performance, improvements, or recruiter stats:")
     if user_input:
-        # Simulated small AI assistant
-        if "placement" in user_input.lower():
-            st.write("📊 The department placement rate is improving steadily this semester.")
-        elif "recruiter" in user_input.lower():
-            st.write("🏢 Top recruiters this year are Infosys, TCS, and Wipro.")
-        elif "skill" in user_input.lower():
-            st.write("🧠 Most students should improve in 'Data Visualization' and 'SQL' skills.")
+        # A rerun abandons the previous answer's stream; make sure it stops upstream too
+        previous_stream = st.session_state.get("hod_ai_cancel")
+        if previous_stream is not None:
+            previous_stream.set()
+        st.session_state["hod_ai_cancel"] = threading.Event()
+        st.write_stream(ai_assistant.ask_ai_stream(user_input, "hod", department=department,
+                                                   cancel=st.session_state["hod_ai_cancel"]))
+        if ai_assistant.get_backend().name == "local":
+            st.caption("Answered offline from live portal analytics.")
         else:
-            st.write("🤖 I suggest focusing on technical projects and resume keywords to boost placement chances.")
+            digest = ai_context.department_context(department)
+            with st.expander(f"Department data sent with the question (~{ai_context.estimate_tokens(digest)} tokens)"):
+                st.text(digest)
 
 # ---------------------- AI SUMMARY & PDF ----------------------
 st.markdown("---")
 st.subheader("📄 Generate AI Summary Report")
 
+projection = placement_engine.project_placement_pct(department)
 ai_summary = f"""
 📊 Department: {department}
 • Total Students: {stats['total_students']}
 • Placed Students: {stats['placed_count']}
 • Unplaced Students: {stats['unplaced_count']}
 • Avg CGPA (Placed): {stats['avg_cgpa_placed']}
-• Recommendation: Focus on Data Analytics, Python, and Communication Skills.
+• Recommendation: {skill_insight['recommendation']}
 
-🧠 Department placement improving — expected to reach 90% next cycle.
+🧠 {projection or 'Not enough placement history yet for a projection.'}
 """
 
 st.info(ai_summary)
 
-try:
-    from fpdf import FPDF
-    if st.button("📥 Generate Report PDF"):
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, f"{department} Department Placement Report", ln=True, align="C")
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, ai_summary)
-        pdf.ln(10)
-        pdf.cell(0, 10, f"Generated on {datetime.now().strftime('%d %b %Y, %I:%M %p')}", ln=True, align="C")
-
-        pdf_output = BytesIO()
-        pdf_bytes = pdf.output(dest="S").encode("latin1")
-        pdf_output.write(pdf_bytes)
-        pdf_output.seek(0)
-        fname = f"{department}_Placement_Report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-        st.download_button("⬇️ Download Department Report", data=pdf_output, file_name=fname, mime="application/pdf")
-except Exception:
-    st.warning("⚠️ PDF generation not available. Run `pip install fpdf`.")
\ No newline at end of file
+if st.button("📥 Generate Report PDF"):
+    with st.spinner("Building department report..."):
+        report, err = placement_engine.generate_department_pdf(department)
+    if err:
+        st.warning(f"⚠️ PDF generation not available: {err}. Run `pip install fpdf`.")
+    else:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M')
+        # Large departments come as a ZIP of part PDFs. The parts were streamed
+        # into a spooled temp file; only the finished download is read here.
+        with report:
+            is_zip = zipfile.is_zipfile(report)
+            report.seek(0)
+            data = report.read()
+        if is_zip:
+            st.download_button("⬇️ Download Department Report (ZIP of parts)", data=data,
+                               file_name=f"{department}_Placement_Report_{stamp}.zip", mime="application/zip")
+        else:
+            st.download_button("⬇️ Download Department Report", data=data,
+                               file_name=f"{department}_Placement_Report_{stamp}.pdf", mime="application/pdf")
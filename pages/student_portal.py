@@ -2,8 +2,28 @@
 import streamlit as st
 import random
 import sqlite3
+import threading
 from datetime import datetime
-from database import save_resume_analysis, get_resume_analysis, upsert_student_profile, DB_FILE
+from database import (
+    save_resume_analysis,
+    get_resume_analysis,
+    upsert_student_profile,
+    get_student_profile,
+    get_eligible_drives,
+    add_drive,
+    set_user_department,
+    set_user_email,
+    get_application,
+    apply_to_drive,
+    get_student_applications,
+    compute_readiness,
+    get_notifications,
+    mark_notifications_read,
+    DB_FILE,
+)
+from eligibility import EligibilityRule
+import ai_assistant
+import bootstrap
 
 # ---------------------- PAGE CONFIG ----------------------
 st.set_page_config(page_title="Student Portal", layout="wide")
@@ -15,60 +35,52 @@ if "logged_in" not in st.session_state or st.session_state.get("role") != "Stude
 
 username = st.session_state["username"]
 
-# ---------------------- UTILS: ensure tables ----------------------
-def ensure_drive_tables():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    # drives: created by admin/tpo (but safe-create here)
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS drives (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company TEXT,
-        role TEXT,
-        package REAL,
-        department TEXT,        -- department the drive is targeted to (e.g., CSE) or 'ALL'
-        open_for_all INTEGER DEFAULT 0, -- 1 => any department can apply
-        date TEXT,
-        deadline TEXT,
-        description TEXT,
-        is_active INTEGER DEFAULT 1
-    )
-    """)
-    # applications: student applications to drives
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS applications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT,
-        drive_id INTEGER,
-        applied_on TEXT,
-        status TEXT DEFAULT 'Applied',  -- Applied / Shortlisted / Selected / Rejected
-        remarks TEXT
-    )
-    """)
-    conn.commit()
-    conn.close()
-
-ensure_drive_tables()
+# ---------------------- INITIALIZE DATABASE ----------------------
+bootstrap.ensure_ready()
 
 # ---------------------- HEADER ----------------------
 st.title("🎓 Student Portal — AI Career Coach")
 st.markdown(f"Welcome, **{username}** 👋  — upload resume, view active drives and check your application status.")
 
+# ---------------------- NOTIFICATIONS ----------------------
+feed = get_notifications(username)
+unread = sum(1 for n in feed if n[5] is None)
+with st.expander(f"🔔 Notifications ({unread} new)" if unread else "🔔 Notifications", expanded=bool(unread)):
+    if not feed:
+        st.info("No notifications yet.")
+    else:
+        for _, _, title, body, created_at, read_at in feed:
+            st.markdown(f"{'🆕 ' if read_at is None else ''}**{title}** — {created_at[:16]}")
+            st.caption(body)
+        if unread and st.button("✔️ Mark all as read"):
+            mark_notifications_read(username)
+            st.rerun()
+
 # ---------------------- STUDENT DETAILS FORM ----------------------
 st.markdown("## 🧾 Student Academic Details")
-col1, col2 = st.columns(2)
+DEPARTMENTS = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "AI&DS"]
+profile = get_student_profile(username) or {}
+saved_dept = profile.get("department")
+
+col1, col2, col3, col4 = st.columns(4)
 with col1:
-    department = st.selectbox("Department", ["CSE", "ECE", "EEE", "MECH", "CIVIL", "AI&DS"], index=0)
+    department = st.selectbox("Department", DEPARTMENTS,
+                              index=DEPARTMENTS.index(saved_dept) if saved_dept in DEPARTMENTS else 0)
 with col2:
-    cgpa = st.number_input("Enter your CGPA (0.0 - 10.0)", min_value=0.0, max_value=10.0, step=0.01, value=7.0)
+    cgpa = st.number_input("Enter your CGPA (0.0 - 10.0)", min_value=0.0, max_value=10.0, step=0.01,
+                           value=float(profile.get("cgpa") or 7.0))
+with col3:
+    backlogs = st.number_input("Active Backlogs", min_value=0, max_value=50, step=1,
+                               value=int(profile.get("backlogs") or 0))
+with col4:
+    grad_year = st.number_input("Graduation Year", min_value=2000, max_value=2100, step=1,
+                                value=int(profile.get("grad_year") or datetime.now().year + 1))
+email = st.text_input("Email (for drive notifications)", value=profile.get("email") or "")
 
 if st.button("💾 Save Details"):
-    upsert_student_profile(username, reg_no=None, cgpa=cgpa)
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("UPDATE users SET department=? WHERE username=?", (department, username))
-    conn.commit()
-    conn.close()
+    upsert_student_profile(username, reg_no=None, cgpa=cgpa, backlogs=backlogs, grad_year=grad_year)
+    set_user_department(username, department)
+    set_user_email(username, email)
     st.success("✅ Details saved successfully!")
 
 st.markdown("---")
@@ -101,8 +113,17 @@ if uploaded_file:
     ]
     feedback = random.choice(feedback_list)
 
+    # Extracted text feeds near-duplicate detection (PDF only; needs PyMuPDF)
+    resume_text = None
+    if uploaded_file.name.lower().endswith(".pdf"):
+        try:
+            from resume_utils import extract_text_from_pdf_bytes
+            resume_text = extract_text_from_pdf_bytes(uploaded_file.getvalue())
+        except Exception:
+            resume_text = None
+
     # Save to database
-    save_resume_analysis(username, score, feedback, detected)
+    save_resume_analysis(username, score, feedback, detected, text=resume_text)
     upsert_student_profile(username, reg_no=None, cgpa=cgpa)
 
     # Show results
@@ -110,7 +131,7 @@ if uploaded_file:
     c1, c2, c3 = st.columns(3)
     c1.metric("Resume Score", f"{score}/100")
     c2.metric("CGPA", f"{cgpa:.2f}")
-    match_percent = round((score * 0.6 + cgpa * 10 * 0.4), 2)
+    match_percent = compute_readiness(score, cgpa)
     c3.metric("Placement Readiness", f"{match_percent}%")
     st.write("**Feedback:**", feedback)
     st.write("**Skills Detected:**", ", ".join(detected))
@@ -133,36 +154,31 @@ if seed_demo:
     c.execute("SELECT COUNT(*) FROM drives")
     if c.fetchone()[0] == 0:
         demo_drives = [
-            ("Infosys", "Software Engineer", 6.5, "CSE", 0, "2025-02-10", "2025-02-28", "On-campus hiring for freshers"),
-            ("TCS", "System Engineer", 5.0, "ALL", 1, "2025-02-15", "2025-03-05", "Apply if CGPA >= 6.0"),
-            ("FinTech Pvt Ltd", "Data Analyst Intern", 4.0, "AI&DS", 0, "2025-02-20", "2025-03-01", "Internship with conversion")
+            ("Infosys", "Software Engineer", 6.5, ["CSE"], "2025-02-10", "2025-02-28", "On-campus hiring for freshers", None),
+            ("TCS", "System Engineer", 5.0, [], "2025-02-15", "2025-03-05", "Open to all departments", 6.0),
+            ("FinTech Pvt Ltd", "Data Analyst Intern", 4.0, ["AI&DS", "CSE"], "2025-02-20", "2025-03-01", "Internship with conversion", None)
         ]
-        for d in demo_drives:
-            c.execute("INSERT INTO drives (company, role, package, department, open_for_all, date, deadline, description) VALUES (?,?,?,?,?,?,?,?)", d)
-        conn.commit()
+        for company_name, role_name, pkg, depts, d_date, d_deadline, desc, min_cgpa in demo_drives:
+            add_drive(company_name, role_name, pkg, depts, d_date, d_deadline, desc, min_cgpa=min_cgpa)
         st.success("Demo drives seeded.")
     else:
         st.info("Drives already exist; demo seeding skipped.")
     conn.close()
 
-# Load active drives (department-specific or open to all)
-conn = sqlite3.connect(DB_FILE)
-c = conn.cursor()
-# drives targeted to student's department or open_for_all=1 or department='ALL'
-c.execute("""
-    SELECT id, company, role, package, department, open_for_all, date, deadline, description
-    FROM drives
-    WHERE is_active=1 AND (department=? OR open_for_all=1 OR department='ALL')
-    ORDER BY date ASC
-""", (department,))
-drives = c.fetchall()
-conn.close()
+# Load only the active drives this student is eligible for (department, CGPA, backlogs, batch).
+# Eligibility follows the saved profile, not unsaved form values; re-read it in case it was saved above.
+profile = get_student_profile(username) or {}
+drives = get_eligible_drives(profile.get("department"), profile.get("cgpa"), profile.get("backlogs") or 0,
+                             profile.get("grad_year"))
 
+if profile.get("cgpa") is None:
+    st.info("💾 Save your academic details above to see every drive you qualify for.")
 if not drives:
-    st.info("No placement drives available for your department right now.")
+    st.info("No placement drives you are eligible for right now.")
 else:
     for d in drives:
-        d_id, company, role_name, package, dept, open_for_all, date_str, deadline_str, desc = d
+        d_id, company, role_name, package, dept, open_for_all, date_str, deadline_str, desc = d[:9]
+        rule = EligibilityRule.from_drive(dept, open_for_all, *d[9:12])
         box = st.container()
         with box:
             cols = st.columns([4,2,1])
@@ -172,17 +188,13 @@ else:
 
             left.markdown(f"### 🚀 **{company}** — {role_name}")
             left.write(f"**Details:** {desc}")
-            left.write(f"**Department:** {dept if dept!='ALL' else 'All Departments'}    •    **Drive Date:** {date_str}    •    **Deadline:** {deadline_str}")
+            left.write(f"**Eligibility:** {rule.describe()}    •    **Drive Date:** {date_str}    •    **Deadline:** {deadline_str}")
 
             mid.metric("Package (LPA)", f"{package}")
             right.write("")  # spacer
 
             # check if student already applied
-            conn = sqlite3.connect(DB_FILE)
-            c = conn.cursor()
-            c.execute("SELECT id, status FROM applications WHERE username=? AND drive_id=?", (username, d_id))
-            app = c.fetchone()
-            conn.close()
+            app = get_application(username, d_id)
 
             if app:
                 app_id, app_status = app
@@ -191,14 +203,10 @@ else:
                 apply_col1, apply_col2 = st.columns([1,3])
                 with apply_col1:
                     if st.button("Apply ▶️", key=f"apply_{d_id}"):
-                        # insert application
-                        conn = sqlite3.connect(DB_FILE)
-                        c = conn.cursor()
-                        c.execute("INSERT INTO applications (username, drive_id, applied_on, status) VALUES (?,?,?,?)",
-                                  (username, d_id, datetime.utcnow().isoformat(), "Applied"))
-                        conn.commit()
-                        conn.close()
-                        st.success("✅ Application submitted. Check 'My Applications & Status' below.")
+                        if apply_to_drive(username, d_id):
+                            st.success("✅ Application submitted. Check 'My Applications & Status' below.")
+                        else:
+                            st.error("⚠️ You are not eligible for this drive (or it has closed).")
                 with apply_col2:
                     st.write("")
 
@@ -207,17 +215,7 @@ st.markdown("---")
 # ---------------------- MY APPLICATIONS & STATUS ----------------------
 st.subheader("📋 My Applications & Status")
 
-conn = sqlite3.connect(DB_FILE)
-c = conn.cursor()
-c.execute("""
-    SELECT a.id, d.company, d.role, d.package, d.date, a.applied_on, a.status, d.deadline
-    FROM applications a
-    JOIN drives d ON a.drive_id = d.id
-    WHERE a.username = ?
-    ORDER BY a.applied_on DESC
-""", (username,))
-apps = c.fetchall()
-conn.close()
+apps = get_student_applications(username)
 
 if not apps:
     st.info("You haven't applied for any drives yet.")
@@ -253,4 +251,17 @@ if previous:
     else:
         st.error("⚙️ Improvement needed.")
 else:
-    st.info("No previous analysis found. Upload your resume to get AI insights.")
\ No newline at end of file
+    st.info("No previous analysis found. Upload your resume to get AI insights.")
+st.markdown("---")
+
+# ---------------------- CAREER-AI ----------------------
+st.subheader("🤖 Ask Career-AI")
+career_question = st.text_input("Ask about drives, resume preparation or interviews:", key="career_ai_question")
+if career_question:
+    # A rerun abandons the previous answer's stream; make sure it stops upstream too
+    previous_stream = st.session_state.get("career_ai_cancel")
+    if previous_stream is not None:
+        previous_stream.set()
+    st.session_state["career_ai_cancel"] = threading.Event()
+    st.write_stream(ai_assistant.ask_ai_stream(career_question, "student", department=department,
+                                               username=username, cancel=st.session_state["career_ai_cancel"]))
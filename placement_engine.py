@@ -0,0 +1,290 @@
+# placement_engine.py
+# Department evaluation and PDF reporting used by hod_portal.py.
+# Put this file in the project root (same folder as app.py and database.py)
+
+import importlib.util
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+from itertools import islice
+
+import chart_service
+from database import (
+    get_department_stats,
+    get_top_recruiters,
+    get_skill_gap_insights,
+    get_placement_trend,
+    iter_department_students,
+)
+
+STREAM_PAGE_SIZE = 500
+# FPDF 1.7 keeps a whole document in memory until output(), so the student
+# table is split across part files of at most this many rows each
+ROWS_PER_PART = 2000
+SPOOL_MAX_BYTES = 2 * 1024 * 1024   # parts larger than this spill to disk
+
+
+def evaluate_department(department, match_threshold=0.65, mark_placements=False):
+    """
+    Read-only department evaluation: headline stats, recruiters and skill gaps.
+    Student-level rows are not materialized here; generate_department_pdf reads
+    them from the database part by part.
+    match_threshold and mark_placements are accepted for compatibility and unused.
+    """
+    stats = get_department_stats(department)
+    return {
+        "department": department,
+        "evaluated_at": datetime.utcnow().isoformat(),
+        "unplaced_count": stats["unplaced_count"],
+        "detailed": {
+            "stats": stats,
+            "top_recruiters": get_top_recruiters(department, top_n=10),
+            "skill_gaps": get_skill_gap_insights(department, top_k=8),
+        },
+    }
+
+
+# ------------------- PDF helpers -------------------
+def _latin1(text):
+    """FPDF core fonts are latin-1 only; replace anything else."""
+    return str(text).encode("latin-1", "replace").decode("latin-1")
+
+
+def _fmt(value, digits=2):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def _section(pdf, title):
+    pdf.ln(4)
+    pdf.set_font("Arial", "B", 13)
+    pdf.cell(0, 8, _latin1(title), ln=True)
+    pdf.set_font("Arial", size=10)
+
+
+def _table(pdf, headers, widths, rows):
+    """Write rows (any iterable) as a table, repeating the header after each page break."""
+    def header():
+        pdf.set_font("Arial", "B", 10)
+        pdf.set_fill_color(220, 230, 245)
+        for h, w in zip(headers, widths):
+            pdf.cell(w, 7, _latin1(h), border=1, fill=True)
+        pdf.ln()
+        pdf.set_font("Arial", size=9)
+
+    header()
+    count = 0
+    for row in rows:
+        if pdf.get_y() > pdf.page_break_trigger - 7:
+            pdf.add_page()
+            header()
+        for value, w in zip(row, widths):
+            pdf.cell(w, 6, _latin1(_fmt(value)), border=1)
+        pdf.ln()
+        count += 1
+    if count == 0:
+        pdf.cell(sum(widths), 6, "No records.", border=1, ln=True)
+    return count
+
+
+def _try_chart(render, *args, **kwargs):
+    try:
+        return render(*args, **kwargs)
+    except ImportError:
+        return None     # matplotlib not installed: report without charts
+
+
+def _chart(pdf, png_bytes, width):
+    # FPDF 1.7 embeds images from a path; the temp file lives only for the call
+    fd, path = tempfile.mkstemp(suffix=".png")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(png_bytes)
+        pdf.image(path, x=(pdf.w - width) / 2, w=width)
+    finally:
+        os.remove(path)
+
+
+STUDENT_HEADERS = ["Username", "CGPA", "Placed", "Package (LPA)", "Resume Score"]
+STUDENT_WIDTHS = [50, 30, 25, 40, 35]
+
+
+def _new_pdf():
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    return pdf
+
+
+def _finish(pdf):
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    out.write(pdf.output(dest='S').encode('latin1'))
+    out.seek(0)
+    return out
+
+
+def _summary_pages(pdf, department, detailed):
+    stats = detailed["stats"]
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, _latin1(f"{department} Department Placement Report"), ln=True, align="C")
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, f"Generated on {datetime.now().strftime('%d %b %Y, %I:%M %p')}", ln=True, align="C")
+
+    # Summary
+    _section(pdf, "Summary")
+    _table(pdf, ["Metric", "Value"], [90, 60], [
+        ("Total Students", stats["total_students"]),
+        ("Placed Students", stats["placed_count"]),
+        ("Unplaced Students", stats["unplaced_count"]),
+        ("Placement %", f"{stats['placed_percentage']}%"),
+        ("Avg CGPA (Placed)", stats["avg_cgpa_placed"]),
+    ])
+
+    if stats["total_students"] > 0:
+        pie = _try_chart(chart_service.pie_chart, [stats["placed_count"], stats["unplaced_count"]],
+                         ["Placed", "Unplaced"], ["#4CAF50", "#FFC107"])
+        if pie:
+            _chart(pdf, pie, 70)
+
+    # Recruiters
+    _section(pdf, "Top Recruiters")
+    recruiters = detailed["top_recruiters"]
+    _table(pdf, ["Company", "Students Placed", "Avg Package (LPA)"], [80, 45, 55], recruiters)
+    if recruiters:
+        bars = _try_chart(chart_service.bar_chart, [r[1] for r in recruiters], [r[0] for r in recruiters],
+                          title="Students placed by company")
+        if bars:
+            _chart(pdf, bars, 150)
+
+    # Skill gaps
+    _section(pdf, "Skill Gap Insights")
+    gaps = detailed["skill_gaps"]
+    pdf.multi_cell(0, 6, _latin1(gaps["recommendation"]))
+    pdf.ln(2)
+    placed_common = dict(gaps["placed_common"])
+    unplaced_common = dict(gaps["unplaced_common"])
+    skills = list(dict.fromkeys(list(placed_common) + list(unplaced_common)))
+    _table(pdf, ["Skill", "Placed (count)", "Unplaced (count)", "Gap"], [60, 40, 40, 30], (
+        (s, placed_common.get(s, 0), unplaced_common.get(s, 0), "yes" if s in gaps["missing_skills"] else "")
+        for s in skills
+    ))
+
+
+def _student_rows(rows):
+    return ((u, cgpa, "Yes" if placed else "No", package, score) for u, cgpa, placed, package, score in rows)
+
+
+def _report_parts(department, detailed, page_size, rows_per_part):
+    students = iter_department_students(department, page_size)
+    rows = list(islice(students, rows_per_part))
+    pdf = _new_pdf()
+    _summary_pages(pdf, department, detailed)
+    pdf.add_page()
+    _section(pdf, "Student Details")
+    _table(pdf, STUDENT_HEADERS, STUDENT_WIDTHS, _student_rows(rows))
+    yield _finish(pdf)
+
+    part, start = 1, len(rows) + 1
+    while True:
+        rows = list(islice(students, rows_per_part))
+        if not rows:
+            return
+        part += 1
+        pdf = _new_pdf()
+        pdf.set_font("Arial", "B", 14)
+        pdf.cell(0, 10, _latin1(f"{department} Department Placement Report - Part {part}"), ln=True, align="C")
+        _section(pdf, f"Student Details (continued, rows {start}-{start + len(rows) - 1})")
+        _table(pdf, STUDENT_HEADERS, STUDENT_WIDTHS, _student_rows(rows))
+        start += len(rows)
+        yield _finish(pdf)
+
+
+def iter_department_pdf_parts(department, evaluation_result=None, page_size=STREAM_PAGE_SIZE,
+                              rows_per_part=ROWS_PER_PART):
+    """
+    Full department report as a sequence of PDFs. Returns (parts, None) or
+    (None, error), where parts yields one file object (positioned at 0) per
+    PDF: part 1 holds the summary, charts, recruiters, skill gaps and the
+    first rows_per_part students, later parts continue the student table.
+    Each part is built only when requested, so memory is bounded by
+    rows_per_part rather than by department size; consume and close each
+    part before asking for the next.
+    """
+    if importlib.util.find_spec("fpdf") is None:
+        return None, "FPDF not installed"
+
+    if evaluation_result is None:
+        evaluation_result = evaluate_department(department, mark_placements=False)
+    return _report_parts(department, evaluation_result["detailed"], page_size, rows_per_part), None
+
+
+def _add_part(zf, department, number, part):
+    with part, zf.open(f"{department}_Placement_Report_part{number}.pdf", "w") as dest:
+        shutil.copyfileobj(part, dest)
+
+
+def generate_department_pdf(department, evaluation_result=None, page_size=STREAM_PAGE_SIZE,
+                            rows_per_part=ROWS_PER_PART):
+    """
+    Full department report as one download. Returns (report, None) or
+    (None, error), where report is a file object positioned at 0. Up to
+    rows_per_part students it is a single PDF; larger departments get a ZIP
+    archive of the part PDFs (see iter_department_pdf_parts) instead, and
+    zipfile.is_zipfile(report) tells the two apart. Parts are written into the archive as they are built,
+    and the archive spills to a temporary file beyond SPOOL_MAX_BYTES.
+    """
+    parts, err = iter_department_pdf_parts(department, evaluation_result, page_size, rows_per_part)
+    if err:
+        return None, err
+    first = next(parts)
+    second = next(parts, None)
+    if second is None:
+        return first, None
+
+    report = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with zipfile.ZipFile(report, "w", zipfile.ZIP_DEFLATED) as zf:
+        for number, part in enumerate([first, second], start=1):
+            _add_part(zf, department, number, part)
+        for number, part in enumerate(parts, start=3):
+            _add_part(zf, department, number, part)
+    report.seek(0)
+    return report, None
+
+
+def generate_ai_summary(department):
+    """Short data-driven summary of the department's placement position."""
+    stats = get_department_stats(department)
+    gaps = get_skill_gap_insights(department)
+    recruiters = get_top_recruiters(department, top_n=3)
+    lines = [
+        f"{department}: {stats['placed_count']} of {stats['total_students']} students placed "
+        f"({stats['placed_percentage']}%), avg CGPA of placed students {stats['avg_cgpa_placed']}.",
+    ]
+    if recruiters:
+        lines.append("Top recruiters: " + ", ".join(f"{c} ({n})" for c, n, _ in recruiters) + ".")
+    lines.append(gaps["recommendation"])
+    projection = project_placement_pct(department)
+    if projection:
+        lines.append(projection)
+    return " ".join(lines)
+
+
+def project_placement_pct(department, periods_ahead=4, window=4):
+    """One-line projection from the weekly trend's rolling average, or None without history."""
+    trend = get_placement_trend(department, "weekly", window)
+    if not trend:
+        return None
+    stats = get_department_stats(department)
+    pace = trend[-1]["rolling_avg"]
+    if stats["total_students"] == 0:
+        return None
+    projected = min(stats["placed_count"] + pace * periods_ahead, stats["total_students"])
+    projected_pct = round(projected / stats["total_students"] * 100, 1)
+    return (f"Recent pace: {pace} new placement(s)/week; at this rate placement reaches "
+            f"~{projected_pct}% in {periods_ahead} weeks.")
@@ -0,0 +1,153 @@
+# query_cache.py
+# Write-invalidated LRU cache for database.py read functions.
+#
+# Every cached read declares the tables it depends on. Write paths call
+# bump(table) which increments that table's data version; a cached result is
+# served only while the versions it was computed under are still current.
+# Versions live in process memory, so writers in other processes (CLI jobs,
+# cron sweeps) are not seen through them; every entry therefore also expires
+# after a TTL (PLACEMENT_QUERY_CACHE_TTL seconds), which bounds how stale such
+# writes can leave a result. Keys include a scope registered by database.py
+# (its DB_FILE), so switching database files never serves the other's rows.
+#
+# Writers that know which rows they touched pass them as bump(..., keys=...);
+# incremental consumers (skill_index) use changed_keys() to reload just those
+# rows instead of rescanning the table.
+
+import copy
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL_SECONDS = float(os.getenv("PLACEMENT_QUERY_CACHE_TTL", "30"))
+KEY_LOG_SIZE = 4096     # keyed writes remembered per table for changed_keys()
+
+_lock = threading.Lock()
+_versions = {}
+_caches = {}        # function name -> OrderedDict(key -> (versions, stored_at, result))
+_stats = {}         # function name -> {"hits": n, "misses": n, "evictions": n}
+_key_logs = {}      # table -> deque of (version, frozenset of keys, or None if unkeyed)
+
+
+def _no_scope():
+    return None
+
+
+_scope = _no_scope
+
+
+def set_scope(fn):
+    """Register fn() -> value that is part of every cache key (database.py passes its DB_FILE)."""
+    global _scope
+    _scope = fn
+
+
+# ------------------- Data versions -------------------
+def bump(*tables, keys=None):
+    """
+    Mark tables as changed, invalidating every cached read that depends on them.
+    keys, when given, are the keys of the changed rows (usernames for users and
+    student_profiles).
+    """
+    keys = frozenset(keys) if keys is not None else None
+    with _lock:
+        for t in tables:
+            version = _versions.get(t, 0) + 1
+            _versions[t] = version
+            _key_logs.setdefault(t, deque(maxlen=KEY_LOG_SIZE)).append((version, keys))
+
+
+def changed_keys(table, since):
+    """
+    Keys of the rows changed in `table` after data version `since`, or None when
+    that is unknown (an unkeyed write, or the log no longer reaches back that
+    far) and the caller has to rescan the table.
+    """
+    with _lock:
+        current = _versions.get(table, 0)
+        if since == current:
+            return set()
+        log = _key_logs.get(table)
+        if since > current or not log or log[0][0] > since + 1:
+            return None
+        changed = set()
+        for version, keys in log:
+            if version <= since:
+                continue
+            if keys is None:
+                return None
+            changed |= keys
+        return changed
+
+
+def data_version(*tables):
+    """Current version tuple for the given tables (usable as a cache key elsewhere)."""
+    with _lock:
+        return tuple(_versions.get(t, 0) for t in tables)
+
+
+# ------------------- Decorator -------------------
+def cached_query(*tables, maxsize=DEFAULT_MAXSIZE, ttl=None):
+    """
+    Cache a read function keyed by the scope and its arguments, validated
+    against the data version of `tables` and expired after ttl seconds
+    (DEFAULT_TTL_SECONDS unless given; 0 disables expiry).
+    Callers receive a deep copy, so mutating a result never corrupts the cache.
+    """
+    def decorator(fn):
+        name = fn.__qualname__
+        _caches[name] = OrderedDict()
+        _stats[name] = {"hits": 0, "misses": 0, "evictions": 0}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (_scope(), args, tuple(sorted(kwargs.items())))
+            versions = data_version(*tables)
+            max_age = DEFAULT_TTL_SECONDS if ttl is None else ttl
+            now = time.monotonic()
+            cache = _caches[name]
+            stats = _stats[name]
+            with _lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] == versions and (not max_age or now - entry[1] < max_age):
+                    cache.move_to_end(key)
+                    stats["hits"] += 1
+                    return copy.deepcopy(entry[2])
+                stats["misses"] += 1
+
+            result = fn(*args, **kwargs)
+
+            with _lock:
+                # Store under the versions seen *before* the read, so a write that
+                # raced with it invalidates the entry on the next call.
+                cache[key] = (versions, now, result)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+                    stats["evictions"] += 1
+            return copy.deepcopy(result)
+
+        wrapper.tables = tables
+        return wrapper
+    return decorator
+
+
+# ------------------- Introspection -------------------
+def cache_stats():
+    """Per-function hit/miss/eviction counters plus current entry counts and hit rate."""
+    with _lock:
+        report = {}
+        for name, s in _stats.items():
+            total = s["hits"] + s["misses"]
+            report[name] = dict(s, entries=len(_caches[name]),
+                                hit_rate=round(s["hits"] / total, 3) if total else 0.0)
+        return report
+
+
+def clear():
+    with _lock:
+        for cache in _caches.values():
+            cache.clear()
@@ -0,0 +1,104 @@
+# resume_dedup.py
+# MinHash signatures and LSH banding for near-duplicate resume detection.
+#
+# A resume is reduced to word 3-gram shingles, and those to a 128-value MinHash
+# signature (512 bytes, stored on resume_analysis). The signature is cut into
+# 16 bands of 8 rows; each band hashes to a bucket key stored in resume_lsh.
+# Resumes sharing any bucket are candidate duplicates, so the duplicate report
+# is a GROUP BY over bucket keys instead of pairwise comparisons. With 16x8
+# banding, pairs at Jaccard ~0.7 or above are caught with high probability.
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+DUPLICATE_THRESHOLD = 0.8   # estimated Jaccard at or above which two resumes are reported
+
+_rng = np.random.RandomState(20240601)      # fixed seed: signatures must be stable across runs
+# Full 64-bit odd multipliers; with 32-bit ones the top bits would keep the input order
+_A = (_rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64) << np.uint64(32)
+      | _rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64) | np.uint64(1))
+_B = (_rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64) << np.uint64(32)
+      | _rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64))
+_EMPTY = np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+
+
+def shingles(text):
+    """Set of crc32 hashes of lower-cased word 3-grams (single words for very short texts)."""
+    words = re.findall(r"[a-z0-9+#]+", (text or "").lower())
+    if len(words) < SHINGLE_WORDS:
+        grams = words
+    else:
+        grams = (" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+
+def minhash(text):
+    """128 x uint32 MinHash signature packed into bytes, or None for empty text."""
+    hashed = shingles(text)
+    if not hashed:
+        return None
+    h = np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+    # Multiply-shift hashing: uint64 arithmetic wraps, the top 32 bits are the permuted value
+    permuted = (_A[:, None] * h[None, :] + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype("<u4").tobytes()
+
+
+def _unpack(signature):
+    return np.frombuffer(signature, dtype="<u4") if signature else _EMPTY
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two packed signatures."""
+    if not sig_a or not sig_b:
+        return 0.0
+    return float((_unpack(sig_a) == _unpack(sig_b)).mean())
+
+
+def lsh_bands(signature):
+    """[(band, bucket_key)] for a packed signature; bucket keys fit a signed 64-bit SQLite INTEGER."""
+    if not signature:
+        return []
+    step = ROWS_PER_BAND * 4
+    return [
+        (band, int.from_bytes(hashlib.blake2b(signature[band * step:(band + 1) * step], digest_size=8).digest(),
+                              "little", signed=True))
+        for band in range(BANDS)
+    ]
+
+
+def cluster(candidate_groups, signatures, threshold=DUPLICATE_THRESHOLD):
+    """
+    Leader clustering over LSH candidate groups (lists of ids sharing a bucket).
+    Each id joins the first cluster in its group whose representative it
+    matches at threshold or above, otherwise it starts its own. Membership is
+    always checked against the representative, never a neighbour, so chains
+    of similar pairs cannot pull in resumes below threshold.
+    Returns clusters of two or more ids, representative first, largest first.
+    """
+    rep = {}        # id -> representative
+    members = {}    # representative -> ids
+
+    for group in candidate_groups:
+        for x in group:
+            if len(members.get(rep.get(x), ())) > 1:
+                continue    # already clustered
+            for r in dict.fromkeys(rep[y] for y in group if y in rep):
+                if r != x and similarity(signatures.get(r), signatures.get(x)) >= threshold:
+                    members.pop(x, None)    # x led only itself so far
+                    rep[x] = r
+                    members[r].append(x)
+                    break
+            else:
+                if x not in rep:
+                    rep[x] = x
+                    members[x] = [x]
+
+    clusters = [[r] + sorted(m for m in ids if m != r) for r, ids in members.items() if len(ids) > 1]
+    return sorted(clusters, key=len, reverse=True)
@@ -0,0 +1,212 @@
+# semantic_cache.py
+# Nearest-neighbour answer cache for paraphrased assistant questions.
+#
+# Prompts are embedded locally with hashed word and character n-grams
+# (NumPy only, no model download): filler words are dropped and a few
+# placement-domain synonyms are folded together, so "how do I crack infosys"
+# and "infosys interview tips" land close together. Each namespace (role plus
+# grounding context) keeps a bounded matrix of unit vectors; a lookup is one
+# matrix-vector product, and an answer is served when the best cosine
+# similarity reaches the threshold and the two prompts name the same specific
+# things: numbers, department codes and any word outside the generic placement
+# vocabulary (company, product or technology names). "placed in ECE" never
+# reuses the CSE answer, nor "TCS digital" the TCS one, however close the
+# vectors are.
+
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+DIMENSIONS = 2048
+DEFAULT_THRESHOLD = 0.75
+MAX_ENTRIES_PER_NAMESPACE = 500
+MAX_NAMESPACES = 32     # stale grounding contexts age out with their namespace
+DEFAULT_TTL = 24 * 3600
+WORD_WEIGHT = 2.0       # whole words count more than their character n-grams
+
+STOPWORDS = frozenset("""
+    a an the i me my we our you your to for of in on at by with and or is are am be do does did can could
+    should would will how what which when where who why some any tell give please about get got need want
+    know there this that it its as from into best good way ways make
+""".split())
+
+SYNONYMS = {
+    "crack": "interview", "clear": "interview", "pass": "interview", "interviews": "interview",
+    "tips": "prepare", "tip": "prepare", "advice": "prepare", "guide": "prepare", "guidance": "prepare",
+    "preparation": "prepare", "preparing": "prepare", "ready": "prepare", "strategy": "prepare",
+    "cv": "resume", "resumes": "resume",
+    "job": "placement", "jobs": "placement", "placements": "placement", "placed": "placement",
+    "companies": "company", "recruiters": "company", "recruiter": "company",
+    "skills": "skill", "salary": "package", "ctc": "package", "lpa": "package",
+    "better": "improve", "improvement": "improve", "improving": "improve", "enhance": "improve",
+    "coming": "visit", "visiting": "visit", "visits": "visit",
+    "statistics": "stats", "needed": "required", "requirements": "required",
+}
+
+DEPARTMENT_CODES = frozenset("cse ece eee mech civil ai&ds aids aiml csbs ise chem biotech".split())
+
+# Words that describe the kind of question rather than what it is about. Any
+# other term is treated as a name that must match exactly (see key_terms).
+GENERIC_TERMS = frozenset(set(SYNONYMS.values()) | set(SYNONYMS) | set("""
+    student students fresher freshers candidate candidates people batch
+    many much number count total average avg percentage percent rate ratio stats statistics
+    list show top highest lowest most least more less all every each overall only
+    department dept branch college campus institute
+    drive drives apply applying applied application applications eligible eligibility criteria
+    cgpa gpa marks backlog backlogs cutoff minimum min maximum max
+    round rounds process stage stages question questions asked ask expect expected
+    aptitude technical hr coding test tests exam online written group discussion gd
+    offer offers role roles hiring hire hired selected selection shortlist shortlisted rejected result results
+    status score scores readiness trend trends gap gaps profile pace
+    year years month months week weeks day days time long take takes last recent upcoming next new current
+    learn study practice practise revise write writing build create format template sample
+    project projects experience internship internships certification certifications course courses
+    topic topics important common useful required requirement requirements
+    work career field domain details detail info information help explain mean means
+    difference between vs versus start first after before during step steps plan
+    answer answers introduce introduction yourself self strength strengths weakness weaknesses
+    cover letter linkedin portfolio github one page section sections
+    increase chance chances get getting land
+""".split()))
+
+
+def _terms(text):
+    words = re.findall(r"[a-z0-9+#&]+", (text or "").lower())
+    return [SYNONYMS.get(w, w) for w in words if w not in STOPWORDS]
+
+
+def key_terms(text):
+    """Numbers, department codes and non-generic names in a prompt; paraphrase hits require an exact match."""
+    return _key_terms(_terms(text))
+
+
+def _key_terms(terms):
+    return frozenset(t for t in terms
+                     if t in DEPARTMENT_CODES or t not in GENERIC_TERMS or any(ch.isdigit() for ch in t))
+
+
+def embed(text):
+    """L2-normalized float32 vector of hashed word unigrams and character 3-grams."""
+    return _embed_terms(_terms(text))
+
+
+def _embed_terms(terms):
+    vec = np.zeros(DIMENSIONS, dtype=np.float32)
+    for term in terms:
+        features = [(f"w:{term}", WORD_WEIGHT)]
+        padded = f" {term} "
+        features += [(f"c:{padded[i:i + 3]}", 1.0) for i in range(len(padded) - 2)]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            # Signed hashing keeps collisions from only ever adding similarity
+            vec[h % DIMENSIONS] += weight if h & 0x80000000 else -weight
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class _Namespace:
+    __slots__ = ("vectors", "answers", "keys", "created", "last_used", "size")
+
+    def __init__(self):
+        self.vectors = np.zeros((16, DIMENSIONS), dtype=np.float32)
+        self.answers = []
+        self.keys = []          # key_terms of each stored prompt
+        self.created = np.zeros(16)
+        self.last_used = np.zeros(16)
+        self.size = 0
+
+    def grow(self, limit):
+        capacity = min(len(self.vectors) * 2, limit)
+        self.vectors = np.resize(self.vectors, (capacity, DIMENSIONS))
+        self.created = np.resize(self.created, capacity)
+        self.last_used = np.resize(self.last_used, capacity)
+
+
+class SemanticCache:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=MAX_ENTRIES_PER_NAMESPACE, ttl=DEFAULT_TTL,
+                 max_namespaces=MAX_NAMESPACES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._spaces = OrderedDict()    # namespace -> _Namespace, least recently used first
+        self.stats = {"hits": 0, "misses": 0, "rejected": 0, "evictions": 0}
+
+    def lookup(self, namespace, prompt):
+        """
+        (answer, similarity) of the closest live entry at or above the threshold
+        whose key terms match the prompt's, else (None, best similarity seen).
+        """
+        terms = _terms(prompt)
+        vec = _embed_terms(terms)
+        now = time.time()
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is None or space.size == 0 or not vec.any():
+                self.stats["misses"] += 1
+                return None, 0.0
+            sims = space.vectors[:space.size] @ vec
+            sims[space.created[:space.size] + self.ttl <= now] = -1.0
+            candidates = np.flatnonzero(sims >= self.threshold)
+            if not len(candidates):
+                self.stats["misses"] += 1
+                return None, float(sims.max())
+            keys = _key_terms(terms)
+            for slot in candidates[np.argsort(-sims[candidates])]:
+                if space.keys[slot] == keys:
+                    space.last_used[slot] = now
+                    self._spaces.move_to_end(namespace)
+                    self.stats["hits"] += 1
+                    return space.answers[slot], float(sims[slot])
+            # Close wording but a different department, company or number
+            self.stats["misses"] += 1
+            self.stats["rejected"] += 1
+            return None, float(sims[candidates].max())
+
+    def add(self, namespace, prompt, answer):
+        terms = _terms(prompt)
+        vec = _embed_terms(terms)
+        if not vec.any():
+            return
+        now = time.time()
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is None:
+                space = self._spaces[namespace] = _Namespace()
+                while len(self._spaces) > self.max_namespaces:
+                    _, dropped = self._spaces.popitem(last=False)
+                    self.stats["evictions"] += dropped.size
+            self._spaces.move_to_end(namespace)
+            if space.size < self.max_entries:
+                if space.size == len(space.vectors):
+                    space.grow(self.max_entries)
+                slot = space.size
+                space.size += 1
+                space.answers.append(answer)
+                space.keys.append(None)
+            else:
+                # Expired entries go first, then the least recently used
+                expired = np.flatnonzero(space.created[:space.size] + self.ttl <= now)
+                slot = int(expired[0]) if len(expired) else int(np.argmin(space.last_used[:space.size]))
+                space.answers[slot] = answer
+                self.stats["evictions"] += 1
+            space.keys[slot] = _key_terms(terms)
+            space.vectors[slot] = vec
+            space.created[slot] = now
+            space.last_used[slot] = now
+
+    def clear(self):
+        with self._lock:
+            self._spaces.clear()
+
+    def cache_stats(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats, namespaces=len(self._spaces),
+                        entries=sum(s.size for s in self._spaces.values()),
+                        hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0)
@@ -0,0 +1,127 @@
+# simulator.py
+# Vectorized what-if placement simulator for HODs.
+#
+# A department snapshot (CGPA, placed flag, resume score and a student x skill
+# matrix) is loaded from SQLite once per data version and kept in memory;
+# every what-if question is then answered with NumPy over those arrays.
+
+import threading
+
+import numpy as np
+
+from database import get_department_skill_rows
+from query_cache import data_version
+
+SNAPSHOT_TABLES = ("users", "student_profiles", "resume_analysis", "placements")
+MAX_SNAPSHOTS = 16
+
+_lock = threading.Lock()
+_snapshots = {}     # department -> (data version, snapshot)
+
+
+# ------------------- Snapshot -------------------
+def build_snapshot(rows):
+    """Arrays from get_department_skill_rows() output."""
+    skill_lists = [
+        [s.strip().lower() for s in (r[4] or "").split(",") if s.strip()]
+        for r in rows
+    ]
+    vocabulary = sorted({s for skills in skill_lists for s in skills})
+    index = {s: j for j, s in enumerate(vocabulary)}
+    skills = np.zeros((len(rows), len(vocabulary)), dtype=bool)
+    for i, student_skills in enumerate(skill_lists):
+        skills[i, [index[s] for s in student_skills]] = True
+
+    return {
+        "username": np.array([r[0] for r in rows], dtype=object),
+        "cgpa": np.array([r[1] if r[1] is not None else np.nan for r in rows], dtype=np.float32),
+        "placed": np.array([bool(r[2]) for r in rows], dtype=bool),
+        "score": np.array([r[3] if r[3] is not None else np.nan for r in rows], dtype=np.float32),
+        "skills": skills,
+        "skill_names": vocabulary,
+    }
+
+
+def get_snapshot(department):
+    """Department snapshot, reloaded from SQLite only when the underlying tables change."""
+    version = data_version(*SNAPSHOT_TABLES)
+    with _lock:
+        cached = _snapshots.get(department)
+        if cached and cached[0] == version:
+            return cached[1]
+    snapshot = build_snapshot(get_department_skill_rows(department))
+    with _lock:
+        if len(_snapshots) >= MAX_SNAPSHOTS and department not in _snapshots:
+            _snapshots.pop(next(iter(_snapshots)))
+        _snapshots[department] = (version, snapshot)
+    return snapshot
+
+
+# ------------------- Simulations -------------------
+def _pct(count, total):
+    return round(float(count) / total * 100, 2) if total else 0.0
+
+
+def baseline(snapshot):
+    total = len(snapshot["placed"])
+    placed = int(snapshot["placed"].sum())
+    return {"total": total, "placed": placed, "placed_pct": _pct(placed, total)}
+
+
+def simulate_cgpa_cutoff(snapshot, current_cutoff, new_cutoff, conversion_rate=None):
+    """
+    Effect of a company moving its CGPA cutoff from current_cutoff to new_cutoff.
+    Newly eligible unplaced students convert at conversion_rate; by default the
+    placement rate already observed among students above the current cutoff.
+    """
+    cgpa, placed = snapshot["cgpa"], snapshot["placed"]
+    base = baseline(snapshot)
+    eligible_now = cgpa >= current_cutoff
+    newly_eligible = (~placed) & (cgpa >= new_cutoff) & ~eligible_now
+    if conversion_rate is None:
+        conversion_rate = float(placed[eligible_now].mean()) if eligible_now.any() else 0.0
+    expected = float(newly_eligible.sum()) * conversion_rate
+    return {
+        **base,
+        "newly_eligible": int(newly_eligible.sum()),
+        "conversion_rate": round(conversion_rate, 3),
+        "expected_new_placements": round(expected, 1),
+        "projected_pct": _pct(min(base["placed"] + expected, base["total"]), base["total"]),
+    }
+
+
+def simulate_skill_gain(snapshot, skill, adoption=1.0):
+    """
+    Effect of a fraction `adoption` of unplaced students without `skill` gaining it.
+    Each converts with the placement-rate uplift observed for that skill
+    (rate among holders minus rate among non-holders, floored at zero).
+    """
+    placed = snapshot["placed"]
+    base = baseline(snapshot)
+    names = snapshot["skill_names"]
+    if skill not in names:
+        return {**base, "affected": 0, "uplift": 0.0, "expected_new_placements": 0.0,
+                "projected_pct": base["placed_pct"]}
+
+    has = snapshot["skills"][:, names.index(skill)]
+    rate_with = float(placed[has].mean()) if has.any() else 0.0
+    rate_without = float(placed[~has].mean()) if (~has).any() else 0.0
+    uplift = max(rate_with - rate_without, 0.0)
+    affected = float(((~placed) & ~has).sum()) * adoption
+    expected = affected * uplift
+    return {
+        **base,
+        "affected": int(round(affected)),
+        "uplift": round(uplift, 3),
+        "expected_new_placements": round(expected, 1),
+        "projected_pct": _pct(min(base["placed"] + expected, base["total"]), base["total"]),
+    }
+
+
+def skill_placement_rates(snapshot):
+    """Placement rate among holders of each skill, vectorized over the whole matrix."""
+    skills, placed = snapshot["skills"], snapshot["placed"]
+    holders = skills.sum(axis=0)
+    placed_holders = (skills & placed[:, None]).sum(axis=0)
+    rates = np.divide(placed_holders, holders, out=np.zeros(len(holders)), where=holders > 0)
+    return dict(zip(snapshot["skill_names"], rates.round(3).tolist()))
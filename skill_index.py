@@ -0,0 +1,280 @@
+# skill_index.py
+# In-memory bitmap index for recruiter / TPO student search.
+#
+# Each student gets a compact integer id; every skill, department and the
+# placed flag is a bitset over those ids. Skill AND/OR filters become bitwise
+# operations on Python ints, intersected with a CGPA range taken from SQLite.
+# The index is built once and refreshed incrementally: resume_analysis rows
+# newer than the last one seen, and only the students whose users /
+# student_profiles rows were written since the last refresh. CGPA ranges are
+# answered from an in-memory sorted array (np.searchsorted), not SQLite.
+
+import sqlite3
+import threading
+
+import numpy as np
+
+import database
+from query_cache import changed_keys, data_version
+
+STUDENT_TABLES = ("users", "student_profiles")
+ANALYSIS_TABLES = ("resume_analysis",)
+RELOAD_CHUNK = 500      # usernames per IN (...) when reloading changed students
+
+
+def _split_skills(text):
+    return {s.strip().lower() for s in (text or "").split(",") if s.strip()}
+
+
+class _Bitset:
+    """Growable bitset backed by a bytearray, with a cached int view for fast bitwise ops."""
+
+    __slots__ = ("bits", "_as_int")
+
+    def __init__(self):
+        self.bits = bytearray()
+        self._as_int = 0
+
+    def set(self, i, value=True):
+        byte, bit = divmod(i, 8)
+        if byte >= len(self.bits):
+            if not value:
+                return
+            self.bits.extend(b"\0" * (byte + 1 - len(self.bits)))
+        if value:
+            self.bits[byte] |= 1 << bit
+        else:
+            self.bits[byte] &= ~(1 << bit) & 0xFF
+        self._as_int = None
+
+    def as_int(self):
+        if self._as_int is None:
+            self._as_int = int.from_bytes(self.bits, "little")
+        return self._as_int
+
+
+def _iter_ids(mask, limit=None):
+    """Yield the positions of set bits in an int, lowest first."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    found = 0
+    for byte_no, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield byte_no * 8 + low.bit_length() - 1
+            found += 1
+            if limit is not None and found >= limit:
+                return
+            byte ^= low
+
+
+class SkillBitmapIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ids = {}               # username -> compact id
+        self.usernames = []         # compact id -> username
+        self.skills = {}            # skill -> _Bitset
+        self.departments = {}       # department -> _Bitset
+        self.placed = _Bitset()
+        self.students = _Bitset()   # ids that are currently students: the search universe
+        self.student_skills = {}    # compact id -> set of skills currently set
+        self.student_meta = {}      # compact id -> (department, placed)
+        self.cgpa = {}              # compact id -> CGPA, for students that have one
+        self._cgpa_sorted = None    # (sorted CGPAs, ids in the same order), rebuilt after CGPA changes
+        self.last_analysis_id = 0
+        self._student_version = None
+        self._analysis_version = None
+
+    # ------------------- Maintenance -------------------
+    def _id_for(self, username):
+        sid = self.ids.get(username)
+        if sid is None:
+            sid = len(self.usernames)
+            self.ids[username] = sid
+            self.usernames.append(username)
+        return sid
+
+    def _set_skills(self, sid, skills):
+        old = self.student_skills.get(sid, set())
+        for s in old - skills:
+            self.skills[s].set(sid, False)
+        for s in skills - old:
+            self.skills.setdefault(s, _Bitset()).set(sid)
+        self.student_skills[sid] = skills
+
+    def _set_meta(self, sid, department, placed):
+        old = self.student_meta.get(sid)
+        if old == (department, placed):
+            return
+        if old and old[0] in self.departments:
+            self.departments[old[0]].set(sid, False)
+        if department:
+            self.departments.setdefault(department, _Bitset()).set(sid)
+        self.placed.set(sid, bool(placed))
+        self.student_meta[sid] = (department, placed)
+
+    def _set_cgpa(self, sid, cgpa):
+        if cgpa is None:
+            if self.cgpa.pop(sid, None) is not None:
+                self._cgpa_sorted = None
+        elif self.cgpa.get(sid) != cgpa:
+            self.cgpa[sid] = cgpa
+            self._cgpa_sorted = None
+
+    def _changed_students(self, student_version):
+        """Usernames written since the last refresh, or None if a full rescan is needed."""
+        if self._student_version is None:
+            return None
+        changed = set()
+        for table, since in zip(STUDENT_TABLES, self._student_version):
+            keys = changed_keys(table, since)
+            if keys is None:
+                return None
+            changed |= keys
+        return changed
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date. Only resume analyses newer than the last
+        one seen are read; student attributes are re-read only for the
+        usernames written since the last refresh (all students on the first
+        build, or after a write that did not say which rows it touched).
+        """
+        student_version = data_version(*STUDENT_TABLES)
+        analysis_version = data_version(*ANALYSIS_TABLES)
+        with self._lock:
+            reload_students = force or student_version != self._student_version
+            reload_analyses = force or analysis_version != self._analysis_version
+            if not (reload_students or reload_analyses):
+                return
+            conn = sqlite3.connect(database.DB_FILE)
+            c = conn.cursor()
+            if reload_students:
+                changed = None if force else self._changed_students(student_version)
+                query = """
+                    SELECT u.username, u.department, COALESCE(sp.placed, 0), sp.cgpa
+                    FROM users u LEFT JOIN student_profiles sp ON sp.username = u.username
+                    WHERE u.role = 'Student'
+                """
+                if changed is None:
+                    c.execute(query)
+                    rows = c.fetchall()
+                    self.students = _Bitset()
+                else:
+                    changed, rows = sorted(changed), []
+                    for start in range(0, len(changed), RELOAD_CHUNK):
+                        chunk = changed[start:start + RELOAD_CHUNK]
+                        c.execute(query + f" AND u.username IN ({','.join('?' * len(chunk))})", chunk)
+                        rows.extend(c.fetchall())
+                    # Changed users that are not (or no longer) students leave the universe
+                    for username in set(changed) - {r[0] for r in rows}:
+                        if username in self.ids:
+                            self.students.set(self.ids[username], False)
+                for username, department, placed, cgpa in rows:
+                    sid = self._id_for(username)
+                    self.students.set(sid)
+                    self._set_meta(sid, department, placed)
+                    self._set_cgpa(sid, cgpa)
+
+            if reload_analyses:
+                # Latest analysis per student among the new rows only
+                c.execute("""
+                    SELECT id, username, skills FROM resume_analysis
+                    WHERE id > ? ORDER BY id
+                """, (self.last_analysis_id,))
+                latest = {}
+                for analysis_id, username, skills in c.fetchall():
+                    latest[username] = skills
+                    self.last_analysis_id = analysis_id
+                for username, skills in latest.items():
+                    self._set_skills(self._id_for(username), _split_skills(skills))
+            conn.close()
+            self._student_version = student_version
+            self._analysis_version = analysis_version
+
+    # ------------------- Queries -------------------
+    def skill_names(self):
+        with self._lock:
+            return sorted(s for s, b in self.skills.items() if b.as_int())
+
+    def search(self, all_skills=(), any_skills=(), department=None, placed=None,
+               cgpa_min=None, cgpa_max=None, limit=100):
+        """
+        Students having every skill in all_skills and at least one of any_skills,
+        optionally restricted by department, placed flag and CGPA range.
+        Returns (total_matches, [usernames...] up to limit).
+        """
+        self.refresh()
+        with self._lock:
+            universe = self.students.as_int()
+            mask = universe
+            for s in {x.lower() for x in all_skills}:
+                bitset = self.skills.get(s)
+                mask &= bitset.as_int() if bitset else 0
+            if any_skills:
+                union = 0
+                for s in {x.lower() for x in any_skills}:
+                    bitset = self.skills.get(s)
+                    union |= bitset.as_int() if bitset else 0
+                mask &= union
+            if department:
+                bitset = self.departments.get(department)
+                mask &= bitset.as_int() if bitset else 0
+            if placed is not None:
+                mask &= self.placed.as_int() if placed else (universe & ~self.placed.as_int())
+            if mask and (cgpa_min is not None or cgpa_max is not None):
+                mask &= self._cgpa_mask(cgpa_min, cgpa_max)
+
+        total = bin(mask).count("1")
+        with self._lock:
+            names = [self.usernames[i] for i in _iter_ids(mask, limit)]
+        return total, names
+
+    def _cgpa_mask(self, cgpa_min, cgpa_max):
+        """Bitset of students with cgpa_min <= CGPA <= cgpa_max (either bound optional); caller holds the lock."""
+        if self._cgpa_sorted is None:
+            sids = np.fromiter(self.cgpa.keys(), dtype=np.int64, count=len(self.cgpa))
+            values = np.fromiter(self.cgpa.values(), dtype=np.float64, count=len(self.cgpa))
+            order = np.argsort(values, kind="stable")
+            self._cgpa_sorted = (values[order], sids[order])
+        values, sids = self._cgpa_sorted
+        lo = 0 if cgpa_min is None else np.searchsorted(values, cgpa_min, side="left")
+        hi = len(values) if cgpa_max is None else np.searchsorted(values, cgpa_max, side="right")
+        bits = np.zeros(len(self.usernames), dtype=bool)
+        bits[sids[lo:hi]] = True
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index, built on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SkillBitmapIndex()
+    return _index
+
+
+def search_students(all_skills=(), any_skills=(), department=None, placed=None,
+                    cgpa_min=None, cgpa_max=None, limit=100):
+    """
+    Multi-criteria student search. Returns (total_matches, rows) where rows are
+    (username, department, cgpa, placed, package, readiness) for up to `limit` matches.
+    """
+    total, usernames = get_index().search(all_skills, any_skills, department, placed, cgpa_min, cgpa_max, limit)
+    if not usernames:
+        return total, []
+    conn = sqlite3.connect(database.DB_FILE)
+    c = conn.cursor()
+    q_marks = ",".join("?" * len(usernames))
+    c.execute(f"""
+        SELECT u.username, u.department, sp.cgpa, COALESCE(sp.placed, 0), sp.package, sp.readiness
+        FROM users u LEFT JOIN student_profiles sp ON sp.username = u.username
+        WHERE u.username IN ({q_marks})
+        ORDER BY sp.readiness IS NULL, sp.readiness DESC
+    """, usernames)
+    rows = c.fetchall()
+    conn.close()
+    return total, rows
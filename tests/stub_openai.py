@@ -0,0 +1,117 @@
+"""Local stand-in for an OpenAI-compatible chat endpoint, for offline tests.
+
+Each POST to /v1/chat/completions takes the next scripted Reply (or the
+default one). Streaming requests get a chunked text/event-stream response,
+one SSE event per chunk with an optional delay between them.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class Reply:
+    status: int = 200
+    chunks: list = field(default_factory=lambda: ["Hello", ", ", "world", "!"])
+    delay: float = 0.0              # seconds before each chunk
+    abort_after: int = None         # drop the connection after this many chunks
+
+
+class StubOpenAI:
+    def __init__(self):
+        self.replies = []
+        self.default = Reply()
+        self.requests = []          # parsed request bodies, in arrival order
+        self.disconnects = 0        # streams the client closed before the end
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_reply(self, body):
+        with self._lock:
+            self.requests.append(body)
+            return self.replies.pop(0) if self.replies else self.default
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, text):
+                data = text.encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                reply = stub._next_reply(body)
+                if reply.status != 200:
+                    self._send_json(reply.status, {"error": {"message": f"stub status {reply.status}",
+                                                             "type": "stub_error"}})
+                    return
+                if not body.get("stream"):
+                    self._send_json(200, {
+                        "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": "".join(reply.chunks)}}],
+                    })
+                    return
+
+                with stub._lock:
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for i, text in enumerate(reply.chunks):
+                        if reply.abort_after is not None and i >= reply.abort_after:
+                            self.close_connection = True
+                            self.connection.shutdown(2)
+                            return
+                        time.sleep(reply.delay)
+                        event = {"id": "stub", "object": "chat.completion.chunk", "created": 0,
+                                 "model": body["model"],
+                                 "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n")
+                    self._write_chunk("data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    with stub._lock:
+                        stub.disconnects += 1
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+        return Handler
@@ -0,0 +1,129 @@
+"""Local SMTP stand-in for offline tests of email_service.
+
+Speaks enough ESMTP for smtplib: EHLO/HELO, AUTH PLAIN and LOGIN, MAIL, RCPT,
+DATA, RSET, NOOP and QUIT, without STARTTLS. It records connections, login
+attempts and delivered messages, and can refuse recipients, reject the
+password or drop a connection after a number of messages.
+"""
+
+import base64
+import socketserver
+import threading
+
+
+class StubSMTP:
+    def __init__(self, username="portal", password="secret"):
+        self.username = username
+        self.password = password
+        self.refused = set()        # recipients answered with 550
+        self.drop_after = None      # close one connection after this many messages on it
+        self.connections = 0
+        self.logins = 0             # AUTH attempts, successful or not
+        self.messages = []          # (sender, [recipients], data)
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _check(self, username, password):
+        with self._lock:
+            self.logins += 1
+        return (username, password) == (self.username, self.password)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b"\r\n")
+                self.wfile.flush()
+
+            def command(self):
+                return self.rfile.readline().decode().rstrip("\r\n")
+
+            def auth(self, args):
+                mechanism, _, initial = args.partition(" ")
+                if mechanism.upper() == "PLAIN":
+                    if not initial:
+                        self.reply("334 ")
+                        initial = self.command()
+                    _, username, password = base64.b64decode(initial).decode().split("\0")
+                elif mechanism.upper() == "LOGIN":
+                    self.reply("334 " + base64.b64encode(b"Username:").decode())
+                    username = base64.b64decode(self.command()).decode()
+                    self.reply("334 " + base64.b64encode(b"Password:").decode())
+                    password = base64.b64decode(self.command()).decode()
+                else:
+                    self.reply("504 5.5.4 Unrecognized authentication type")
+                    return
+                if stub._check(username, password):
+                    self.reply("235 2.7.0 Authentication successful")
+                else:
+                    self.reply("535 5.7.8 Authentication credentials invalid")
+
+            def handle(self):
+                with stub._lock:
+                    stub.connections += 1
+                self.reply("220 stub ESMTP")
+                sender, recipients, delivered = None, [], 0
+                while True:
+                    line = self.command()
+                    if not line:
+                        return
+                    verb, _, args = line.partition(" ")
+                    verb = verb.upper()
+                    if verb == "EHLO":
+                        self.reply("250-stub")
+                        self.reply("250 AUTH PLAIN LOGIN")
+                    elif verb == "HELO":
+                        self.reply("250 stub")
+                    elif verb == "AUTH":
+                        self.auth(args)
+                    elif verb == "MAIL":
+                        sender, recipients = args.split(":", 1)[1].strip("<> "), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipient = args.split(":", 1)[1].strip("<> ")
+                        if recipient in stub.refused:
+                            self.reply("550 5.1.1 No such user")
+                        else:
+                            recipients.append(recipient)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        while True:
+                            chunk = self.command()
+                            if chunk == ".":
+                                break
+                            data.append(chunk)
+                        with stub._lock:
+                            stub.messages.append((sender, recipients, "\n".join(data)))
+                            drop = stub.drop_after is not None and delivered + 1 >= stub.drop_after
+                            if drop:
+                                stub.drop_after = None
+                        self.reply("250 OK queued")
+                        delivered += 1
+                        if drop:
+                            return
+                    elif verb in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 5.5.2 Command not recognized")
+
+        return Handler
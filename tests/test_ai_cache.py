@@ -0,0 +1,125 @@
+import time
+from types import SimpleNamespace
+
+import ai_cache
+from ai_assistant import ask_ai
+from ai_cache import ResponseCache, cache_key
+from semantic_cache import SemanticCache
+
+
+class FakeClient:
+    """Stands in for openai.OpenAI: records prompts and answers from a script."""
+
+    def __init__(self, answer="Practise aptitude daily.", error=None):
+        self.answer = answer
+        self.error = error
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **params):
+        self.prompts.append(messages[-1]["content"])
+        if self.error:
+            raise self.error
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class Clock:
+    def __init__(self, monkeypatch):
+        self.now = 1_000_000.0
+        monkeypatch.setattr(ai_cache.time, "time", lambda: self.now)
+
+
+def test_cache_key_ignores_case_spacing_and_trailing_punctuation():
+    params = {"temperature": 0.7}
+    key = cache_key("student", "How to prepare for TCS?", "m", params)
+    assert key == cache_key("student", "  how to  prepare for tcs ", "m", params)
+    assert key != cache_key("hod", "How to prepare for TCS?", "m", params)
+    assert key != cache_key("student", "How to prepare for TCS?", "m", {"temperature": 0.2})
+
+
+def test_repeated_question_is_answered_from_cache():
+    client, cache = FakeClient(), ResponseCache(path=None)
+    for _ in range(3):
+        assert ask_ai("How to prepare for TCS?", "student", client=client, cache=cache,
+                      semantic=SemanticCache()) == "Practise aptitude daily."
+    assert client.prompts == ["How to prepare for TCS?"]
+    assert cache.cache_stats()["memory_hits"] == 2
+
+
+def test_errors_are_not_cached():
+    client, cache = FakeClient(error=RuntimeError("boom")), ResponseCache(path=None)
+    semantic = SemanticCache()
+    assert ask_ai("hi", "student", client=client, cache=cache, semantic=semantic).startswith("⚠️ AI Assistant error")
+    client.error = None
+    assert ask_ai("hi", "student", client=client, cache=cache, semantic=semantic) == "Practise aptitude daily."
+    assert len(client.prompts) == 2
+
+
+def test_memory_hits_are_sub_millisecond():
+    cache = ResponseCache(path=None)
+    cache.put("k", "answer")
+    started = time.perf_counter()
+    for _ in range(1000):
+        cache.get("k")
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+def test_entries_expire_after_ttl(monkeypatch, tmp_path):
+    clock = Clock(monkeypatch)
+    cache = ResponseCache(path=str(tmp_path / "ai.db"), ttl=60)
+    cache.put("k", "answer")
+    clock.now += 59
+    assert cache.get("k") == "answer"
+    clock.now += 2
+    assert cache.get("k") is None
+    stats = cache.cache_stats()
+    assert stats["expired"] == 1 and stats["disk_entries"] == 0
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(path=None, max_memory=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.cache_stats()["memory_evictions"] == 1
+
+
+def test_disk_tier_survives_a_new_process_and_refills_memory(tmp_path):
+    path = str(tmp_path / "ai.db")
+    ResponseCache(path=path).put("k", "answer")
+
+    fresh = ResponseCache(path=path)
+    assert fresh.get("k") == "answer"
+    assert fresh.get("k") == "answer"
+    stats = fresh.cache_stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1 and stats["hit_rate"] == 1.0
+
+
+def test_disk_tier_evicts_least_recently_used(monkeypatch, tmp_path):
+    clock = Clock(monkeypatch)
+    path = str(tmp_path / "ai.db")
+    writer = ResponseCache(path=path, max_memory=1, max_disk=2)
+    for key in ("a", "b"):
+        writer.put(key, key.upper())
+        clock.now += 1
+    writer.get("a")         # memory holds only "b", so this refreshes a's disk last_access
+    clock.now += 1
+    writer.put("c", "C")
+
+    reader = ResponseCache(path=path)
+    assert reader.get("b") is None
+    assert reader.get("a") == "A" and reader.get("c") == "C"
+    assert writer.cache_stats()["disk_evictions"] == 1
+    assert writer.cache_stats()["disk_entries"] == 2
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "ai.db"))
+    cache.put("k", "answer")
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.cache_stats()["disk_entries"] == 0
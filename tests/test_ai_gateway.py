@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("openai")
+
+from ai_assistant import RemoteBackend, ask_ai_stream
+from ai_gateway import AIGateway
+from stub_openai import Reply, StubOpenAI
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture
+def stub():
+    with StubOpenAI() as server:
+        yield server
+
+
+@pytest.fixture
+def gateway(stub):
+    gw = AIGateway("stub-model", {"temperature": 0}, base_url=stub.base_url, api_key="test",
+                   base_delay=0.01, max_delay=0.05, timeout=5)
+    yield gw
+    gw.close()
+
+
+def test_complete_retries_429_and_coalesces(stub, gateway):
+    stub.replies = [Reply(status=429), Reply(status=503)]
+    assert gateway.complete("k", MESSAGES) == "Hello, world!"
+    assert gateway.stats["retries"] == 2
+
+    stub.default = Reply(chunks=["same"], delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gateway.complete("dup", MESSAGES)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["same"] * 4
+    assert gateway.stats["coalesced"] == 3
+
+
+def test_stream_retries_until_first_chunk(stub, gateway):
+    stub.replies = [Reply(status=429), Reply(status=500)]
+    assert "".join(gateway.stream(MESSAGES, "student")) == "Hello, world!"
+    assert gateway.stats["retries"] == 2
+    assert all(body["stream"] for body in stub.requests)
+    assert gateway.latency_stats()["student"]["count"] == 1
+
+
+def test_stream_error_after_first_chunk_is_not_retried(stub, gateway):
+    stub.replies = [Reply(chunks=["partial ", "answer"] * 5, abort_after=2)]
+    received = []
+    with pytest.raises(Exception):
+        for text in gateway.stream(MESSAGES):
+            received.append(text)
+    assert received == ["partial ", "answer"]
+    assert len(stub.requests) == 1
+    assert gateway.stats["failures"] == 1
+
+
+def test_stream_holds_the_semaphore_and_releases_it_on_cancel(stub):
+    gw = AIGateway("stub-model", {}, base_url=stub.base_url, api_key="test", max_concurrency=1, timeout=5)
+    try:
+        stub.default = Reply(chunks=["x"] * 50, delay=0.05)
+        cancel = threading.Event()
+        first = gw.stream(MESSAGES, cancel=cancel)
+        assert next(first) == "x"
+        cancel.set()
+        assert list(first) == []
+
+        # The cancelled stream gave its only slot back well before its 2.5 s would have run out
+        stub.default = Reply(chunks=["a", "b"])
+        started = time.monotonic()
+        assert "".join(gw.stream(MESSAGES)) == "ab"
+        assert time.monotonic() - started < 1.0
+        assert gw.stats["streams"] == 2
+    finally:
+        gw.close()
+
+
+def test_ask_ai_stream_goes_through_the_gateway(stub, gateway):
+    stub.replies = [Reply(status=429)]
+    backend = RemoteBackend(gateway=gateway)
+    parts = list(ask_ai_stream("hello", "student", backend=backend, use_cache=False))
+    assert "".join(parts) == "Hello, world!"
+    assert gateway.stats["streams"] == 1 and gateway.stats["retries"] == 1
+
+
+def test_token_bucket_limits_stream_rate(stub):
+    gw = AIGateway("stub-model", {}, base_url=stub.base_url, api_key="test", rate_per_sec=20, burst=1, timeout=5)
+    try:
+        started = time.monotonic()
+        for _ in range(3):
+            assert "".join(gw.stream(MESSAGES)) == "Hello, world!"
+        assert time.monotonic() - started >= 0.09
+    finally:
+        gw.close()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+openai = pytest.importorskip("openai")
+
+from ai_assistant import ask_ai_stream
+from ai_cache import ResponseCache
+from semantic_cache import SemanticCache
+from stub_openai import Reply, StubOpenAI
+
+
+@pytest.fixture
+def stub():
+    with StubOpenAI() as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    return openai.OpenAI(api_key="test", base_url=stub.base_url, max_retries=0, timeout=5)
+
+
+def _caches():
+    return {"cache": ResponseCache(path=None), "semantic": SemanticCache()}
+
+
+def test_first_token_arrives_before_the_stream_ends(stub, client):
+    stub.default = Reply(chunks=["one ", "two ", "three ", "four ", "five"], delay=0.2)
+    started = time.monotonic()
+    stream = ask_ai_stream("count to five", "student", client=client, use_cache=False)
+    assert next(stream) == "one "
+    first_token = time.monotonic() - started
+    assert "".join(stream) == "two three four five"
+    assert first_token < 0.6 < time.monotonic() - started
+    assert stub.requests[0]["stream"] is True
+
+
+def test_complete_answer_is_cached_and_replayed_whole(stub, client):
+    caches = _caches()
+    assert list(ask_ai_stream("hello", "student", client=client, **caches)) == ["Hello", ", ", "world", "!"]
+    assert list(ask_ai_stream("hello", "student", client=client, **caches)) == ["Hello, world!"]
+    assert len(stub.requests) == 1
+
+
+def test_cancel_closes_the_upstream_stream_and_caches_nothing(stub, client):
+    stub.default = Reply(chunks=["tick "] * 50, delay=0.05)
+    caches = _caches()
+    cancel = threading.Event()
+    received = []
+    started = time.monotonic()
+    for text in ask_ai_stream("long answer", "student", client=client, cancel=cancel, **caches):
+        received.append(text)
+        cancel.set()
+    assert received == ["tick "]
+    assert time.monotonic() - started < 1.0
+
+    deadline = time.monotonic() + 3
+    while stub.disconnects == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert stub.disconnects == 1
+    assert caches["cache"].cache_stats()["memory_entries"] == 0
+
+
+def test_http_error_is_yielded_as_the_usual_message(stub, client):
+    stub.default = Reply(status=500)
+    caches = _caches()
+    parts = list(ask_ai_stream("hello", "student", client=client, **caches))
+    assert len(parts) == 1 and parts[0].startswith("⚠️ AI Assistant error:")
+    assert caches["cache"].cache_stats()["memory_entries"] == 0
+
+
+def test_error_mid_stream_keeps_the_partial_text_and_caches_nothing(stub, client):
+    stub.default = Reply(chunks=["partial ", "answer ", "lost"], abort_after=2)
+    caches = _caches()
+    parts = list(ask_ai_stream("hello", "student", client=client, **caches))
+    assert parts[:2] == ["partial ", "answer "]
+    assert parts[-1].startswith("⚠️ AI Assistant error:")
+    assert caches["cache"].cache_stats()["memory_entries"] == 0
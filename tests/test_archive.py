@@ -0,0 +1,61 @@
+import os
+import sqlite3
+
+import pytest
+
+import archive
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+    return str(tmp_path / "archive.db")
+
+
+def test_reads_do_not_create_the_archive(db):
+    database.add_drive("Acme", "SDE", 8, ["CSE"], "2030-01-01", "2030-01-10")
+    assert archive.get_archived_years(db) == []
+    assert archive.get_placement_history(archive_file=db) == []
+    assert [r[2] for r in archive.get_drive_history(archive_file=db)] == ["Acme"]
+    assert not os.path.exists(db)
+
+
+def test_archived_seasons_are_read_back(db):
+    old = database.add_drive("Old", "SDE", 8, ["CSE"], "2022-08-01", "2022-08-10")
+    database.close_drive(old)
+    database.record_placement("s1", "Old", 8, "2022-09-01")
+    database.add_drive("New", "QA", 5, [], "2030-01-01", "2030-01-10")
+
+    assert archive.archive_academic_year("2022-23", db) == {"drives": 1, "applications": 0, "placements": 1}
+    assert archive.get_archived_years(db) == [("2022-23", 1)]
+    assert [(r[0], r[3]) for r in archive.get_placement_history(archive_file=db)] == [("2022-23", "Old")]
+    history = archive.get_drive_history(department="CSE", archive_file=db)
+    assert [(r[0], r[2]) for r in history] == [("2022-23", "Old"), ("2029-30", "New")]
+
+
+def test_live_rows_are_labelled_by_their_own_dates(db):
+    database.record_placement("s1", "Acme", 8, "2022-09-01")
+    database.add_drive("Acme", "SDE", 8, ["ECE"], "2023-03-01", "2023-03-10")
+    database.add_drive("Open", "QA", 5, [], "2024-07-01", "2024-07-10")
+
+    assert [r[0] for r in archive.get_placement_history(archive_file=db)] == ["2022-23"]
+    assert len(archive.get_placement_history(academic_years=["2022-23"], archive_file=db)) == 1
+    assert archive.get_placement_history(academic_years=["2023-24"], archive_file=db) == []
+    history = archive.get_drive_history(department="CSE", archive_file=db)
+    assert [(r[0], r[2]) for r in history] == [("2024-25", "Open")]
+    assert [r[2] for r in archive.get_drive_history(academic_years=["2022-23"], archive_file=db)] == ["Acme"]
+
+
+def test_scheduler_sweep_archives_past_seasons(db, monkeypatch):
+    import drive_scheduler
+    monkeypatch.setattr(archive, "ARCHIVE_DB_FILE", db)
+    old = database.add_drive("Old", "SDE", 8, [], "2022-08-01", "2022-08-10")
+    database.add_drive("New", "QA", 5, [], "2030-01-01", "2030-01-10")
+
+    assert drive_scheduler.run_sweep() == [old]
+    assert archive.get_archived_years() == [("2022-23", 1)]
+    conn = sqlite3.connect(database.DB_FILE)
+    assert conn.execute("SELECT company FROM drives").fetchall() == [("New",)]
+    conn.close()
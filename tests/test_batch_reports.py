@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+import batch_reports
+import database
+
+
+@pytest.fixture
+def live_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "live.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    for i in range(6):
+        dept = ("CSE", "ECE")[i % 2]
+        conn.execute("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', ?)",
+                     (f"s{i}", dept))
+        conn.execute("INSERT INTO student_profiles (username, cgpa, placed, package) VALUES (?, ?, ?, ?)",
+                     (f"s{i}", 6 + i * 0.5, i % 3 == 0, 4.0 if i % 3 == 0 else 0))
+    conn.commit()
+    conn.close()
+    return database.DB_FILE
+
+
+def test_run_batch_never_repoints_the_live_database(live_db, tmp_path):
+    seen = set()
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            seen.add(database.DB_FILE)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        manifest = batch_reports.run_batch(str(tmp_path / "reports"), workers=1)
+    finally:
+        done.set()
+        watcher.join()
+
+    assert seen == {live_db}
+    assert sorted(manifest["departments"]) == ["CSE", "ECE"]
+    assert all("error" not in r for r in manifest["departments"].values())
+    assert os.path.exists(tmp_path / "reports" / batch_reports.INSTITUTE_REPORT_NAME)
+
+    again = batch_reports.run_batch(str(tmp_path / "reports"), workers=1)
+    assert all(r["cached"] for r in again["departments"].values())
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.executemany("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', ?)",
+                     [("alice", "CSE"), ("bob", "ECE"), ("carol", "CSE")])
+    conn.commit()
+    conn.close()
+    database.upsert_student_profile("alice", reg_no=None, cgpa=8.0, backlogs=0, grad_year=2030)
+    database.upsert_student_profile("bob", reg_no=None, cgpa=9.5, backlogs=0, grad_year=2030)
+
+
+def test_apply_checks_the_saved_profile(db):
+    drive_id = database.add_drive("Acme", "SDE", 8, ["CSE"], "2030-01-01", "2030-01-10", min_cgpa=7.5)
+    strict = database.add_drive("Elite", "SDE", 20, ["CSE"], "2030-01-01", "2030-01-10", min_cgpa=9.0)
+
+    assert database.apply_to_drive("alice", drive_id) is not None
+    assert database.apply_to_drive("alice", strict) is None        # CGPA 8.0 < 9.0
+    assert database.apply_to_drive("bob", drive_id) is None         # wrong department
+    assert database.apply_to_drive("carol", drive_id) is None       # no CGPA saved
+    assert database.apply_to_drive("nobody", drive_id) is None
+
+    database.close_drive(drive_id)
+    database.upsert_student_profile("carol", reg_no=None, cgpa=9.0)
+    assert database.apply_to_drive("carol", drive_id) is None       # closed
+
+
+def test_eligible_drives_match_apply(db):
+    drive_id = database.add_drive("Acme", "SDE", 8, [], "2030-01-01", "2030-01-10", min_cgpa=9.0)
+    profile = database.get_student_profile("bob")
+    visible = database.get_eligible_drives(profile["department"], profile["cgpa"], profile["backlogs"],
+                                           profile["grad_year"])
+    assert [d[0] for d in visible] == [drive_id]
+    assert database.apply_to_drive("bob", drive_id) is not None
+
+
+def test_applying_twice_keeps_one_application(db):
+    drive_id = database.add_drive("Acme", "SDE", 8, [], "2030-01-01", "2030-01-10")
+    first = database.apply_to_drive("bob", drive_id)
+    assert first is not None
+    assert database.apply_to_drive("bob", drive_id) == first
+    conn = sqlite3.connect(database.DB_FILE)
+    assert conn.execute("SELECT COUNT(*) FROM applications WHERE username = 'bob'").fetchone()[0] == 1
+    conn.close()
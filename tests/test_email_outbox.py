@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import database
+import email_dispatcher
+import email_service
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+
+
+def outbox(*columns):
+    conn = sqlite3.connect(database.DB_FILE)
+    rows = conn.execute(f"SELECT {', '.join(columns)} FROM email_outbox ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_enqueue_skips_duplicate_keys(db):
+    assert database.enqueue_emails([("a@x.com", "S", "B", "k1"), ("b@x.com", "S", "B", "k2"), ("", "S", "B")]) == 2
+    assert database.enqueue_emails([("a@x.com", "S", "B", "k1"), ("c@x.com", "S", "B")]) == 1
+    assert database.get_outbox_counts() == {"pending": 3}
+
+
+def test_claims_do_not_overlap(db):
+    database.enqueue_emails([(f"s{i}@x.com", "S", "B") for i in range(5)])
+    first = database.claim_email_batch("w1", limit=3)
+    second = database.claim_email_batch("w2", limit=3)
+    assert len(first) == 3 and len(second) == 2
+    assert not {r[0] for r in first} & {r[0] for r in second}
+    assert database.claim_email_batch("w3") == []
+
+
+def test_stale_claims_are_released(db):
+    database.enqueue_emails([("a@x.com", "S", "B")])
+    assert len(database.claim_email_batch("dead-worker")) == 1
+    assert database.claim_email_batch("w2") == []
+
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("UPDATE email_outbox SET claimed_at = '2000-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+    assert [r[1] for r in database.claim_email_batch("w2")] == ["a@x.com"]
+    # The dead worker's late report no longer touches the message
+    database.record_email_results("dead-worker", [1], [])
+    assert outbox("status", "claimed_by") == [("sending", "w2")]
+
+
+def test_failures_back_off_then_become_terminal(db):
+    database.enqueue_emails([("a@x.com", "S", "B")])
+    (message_id, *_), = database.claim_email_batch("w1")
+    database.record_email_results("w1", [], [(message_id, "timeout")], max_attempts=2)
+    assert outbox("status", "attempts", "last_error") == [("pending", 1, "timeout")]
+    assert database.claim_email_batch("w1") == []       # not due until the backoff has passed
+
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("UPDATE email_outbox SET next_attempt_at = '2000-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+    (_, _, _, _, attempts), = database.claim_email_batch("w1")
+    assert attempts == 1
+    database.record_email_results("w1", [], [(message_id, "timeout again")], max_attempts=2)
+    assert outbox("status", "attempts") == [("failed", 2)]
+
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("UPDATE email_outbox SET next_attempt_at = '2000-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+    assert database.claim_email_batch("w1") == []
+
+
+def test_dispatch_records_each_outcome(db, monkeypatch):
+    database.enqueue_emails([("ok@x.com", "S", "B"), ("bad@x.com", "S", "B")])
+    monkeypatch.setattr(email_service, "send_bulk", lambda messages, pool=None: [
+        {"recipient": r, "ok": r != "bad@x.com", "error": None if r != "bad@x.com" else "550 no such user"}
+        for r, _, _ in messages])
+    assert email_dispatcher.dispatch_once(rate_per_second=0) == (1, 1)
+    assert outbox("recipient", "status") == [("ok@x.com", "sent"), ("bad@x.com", "pending")]
+    assert email_dispatcher.drain(rate_per_second=0) == (0, 0)     # the failure waits for its backoff
+
+
+def test_cli_sweep_queues_closed_drive_emails_without_the_dispatcher(db, tmp_path):
+    drive_id = database.add_drive("Acme", "SDE", 8, [], "2020-01-01", "2020-01-10")
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("INSERT INTO users (username, password, role, email) VALUES ('s1', 'x', 'Student', 's1@x.com')")
+    conn.execute("INSERT INTO applications (username, drive_id, status) VALUES ('s1', ?, 'Applied')", (drive_id,))
+    conn.commit()
+    conn.close()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    archive_file = str(tmp_path / "archive.db")
+    script = (
+        "import sys, archive, database; database.DB_FILE, archive.ARCHIVE_DB_FILE = sys.argv[1:]; "
+        "import drive_scheduler; drive_scheduler.run_sweep(); assert 'email_dispatcher' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", script, database.DB_FILE, archive_file], cwd=root, check=True,
+                   capture_output=True)
+    assert outbox("recipient", "subject") == [("s1@x.com", "Applications closed: Acme SDE")]
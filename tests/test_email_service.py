@@ -0,0 +1,86 @@
+import pytest
+
+import email_service
+from email_service import SMTPConfig, SMTPPool, send_bulk
+from stub_smtp import StubSMTP
+
+
+@pytest.fixture
+def smtp():
+    with StubSMTP() as server:
+        yield server
+
+
+def pool_for(smtp, password="secret", **overrides):
+    config = SMTPConfig(host="127.0.0.1", port=smtp.port, username="portal", password=password,
+                        sender="cell@college.edu", starttls=False, timeout=5, **overrides)
+    return SMTPPool(config)
+
+
+def batch(n, domain="x.com"):
+    return [(f"s{i}@{domain}", f"Subject {i}", f"Body {i}") for i in range(n)]
+
+
+def test_a_batch_reuses_one_connection_per_session(smtp):
+    pool = pool_for(smtp, pool_size=1)
+    try:
+        results = send_bulk(batch(5), pool=pool)
+    finally:
+        pool.close()
+    assert [r["ok"] for r in results] == [True] * 5
+    assert (smtp.connections, smtp.logins, len(smtp.messages)) == (1, 1, 5)
+    assert [m[1] for m in smtp.messages] == [[f"s{i}@x.com"] for i in range(5)]
+
+
+def test_sessions_reconnect_at_the_per_session_cap(smtp):
+    pool = pool_for(smtp, pool_size=1, max_messages_per_session=2)
+    try:
+        assert all(r["ok"] for r in send_bulk(batch(5), pool=pool))
+    finally:
+        pool.close()
+    assert smtp.connections == 3
+
+
+def test_a_dropped_connection_is_reopened_and_the_message_retried(smtp):
+    smtp.drop_after = 2
+    pool = pool_for(smtp, pool_size=1)
+    try:
+        results = send_bulk(batch(5), pool=pool)
+    finally:
+        pool.close()
+    assert all(r["ok"] for r in results)
+    assert smtp.connections == 2
+    assert sorted(m[1][0] for m in smtp.messages) == sorted(r[0] for r in batch(5))
+
+
+def test_refused_recipients_fail_individually(smtp):
+    smtp.refused = {"s1@x.com", "s3@x.com"}
+    pool = pool_for(smtp, pool_size=1)
+    try:
+        results = send_bulk(batch(5), pool=pool)
+    finally:
+        pool.close()
+    assert [r["ok"] for r in results] == [True, False, True, False, True]
+    assert "No such user" in results[1]["error"]
+    assert smtp.connections == 1
+
+
+def test_a_rejected_login_fails_the_batch_fast(smtp):
+    pool = pool_for(smtp, password="wrong", pool_size=2)
+    try:
+        results = send_bulk(batch(20), pool=pool)
+    finally:
+        pool.close()
+    assert not any(r["ok"] for r in results)
+    assert all("535" in r["error"] or "login failed" in r["error"] for r in results)
+    assert smtp.connections <= 2     # one login per session, not one per message
+    assert smtp.messages == []
+
+
+def test_send_email_uses_the_pool(smtp):
+    pool = pool_for(smtp)
+    try:
+        assert email_service.send_email("a@x.com", "Hi", "Body", pool=pool)
+    finally:
+        pool.close()
+    assert smtp.messages[0][:2] == ("cell@college.edu", ["a@x.com"])
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+import database
+from ai_assistant import LocalBackend
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    for username in ("alice", "bob"):
+        conn.execute("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', 'CSE')",
+                     (username,))
+    conn.commit()
+    conn.close()
+    database.upsert_student_profile("alice", cgpa=9.0)
+    database.upsert_student_profile("bob", cgpa=7.0)
+    database.save_resume_analysis("alice", 90, "", ["python"])
+    database.save_resume_analysis("bob", 60, "", ["sql"])
+
+
+def test_students_only_see_their_own_readiness(db):
+    backend = LocalBackend()
+    for prompt in ("Am I ready?", "show the readiness leaderboard", "who are the top students"):
+        answer = backend.complete(prompt, "student", "CSE", username="bob")
+        assert "alice" not in answer
+        assert "Your placement readiness is 64.0%" in answer
+    assert "alice" not in backend.complete("leaderboard", "general", "CSE")
+
+
+def test_staff_get_the_department_leaderboard(db):
+    backend = LocalBackend()
+    for role in ("hod", "admin"):
+        answer = backend.complete("readiness leaderboard", role, "CSE")
+        assert "alice (90.0%)" in answer and "bob (64.0%)" in answer
+
+
+def test_intents_match_whole_words(db):
+    backend = LocalBackend()
+    # "project", "accurate" and "already" used to hit the trend, stats and readiness intents
+    assert backend.complete("help me describe my project", "student") == backend.complete("hello", "student")
+    assert backend.complete("is this accurate? already done", "student") == backend.complete("hello", "student")
+    assert backend.complete("placement rate", "hod").startswith("📊")
+    assert backend.complete("weekly trend for CSE", "hod").startswith("📈")
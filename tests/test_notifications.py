@@ -0,0 +1,65 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+import database
+import notifications
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    for i in range(4):
+        conn.execute("INSERT INTO users (username, password, role, department, email) "
+                     "VALUES (?, 'x', 'Student', ?, ?)", (f"s{i}", ("CSE", "ECE")[i % 2], f"s{i}@x.com"))
+        conn.execute("INSERT INTO student_profiles (username, cgpa) VALUES (?, ?)", (f"s{i}", 7 + i * 0.5))
+    conn.commit()
+    conn.close()
+
+
+def test_fan_out_targets_eligible_students_who_have_not_applied(db):
+    drive_id = database.add_drive("Acme", "SDE", 8, ["CSE"], "2030-01-01", "2030-01-10", min_cgpa=7.5)
+    database.add_drive("Other", "QA", 5, [], "2030-01-01", "2030-01-10")
+    assert [r[0] for r in database.get_drive_recipients(drive_id)] == ["s2"]
+
+    result = notifications.notify_drive(drive_id, "created")
+    assert result == {"recipients": 1, "notified": 1, "emailed": 1}
+    assert notifications.notify_drive(drive_id, "created")["notified"] == 0
+    assert database.get_notifications("s2")[0][2] == "New drive: Acme — SDE"
+
+
+def test_closed_drives_notify_nobody(db):
+    drive_id = database.add_drive("Acme", "SDE", 8, [], "2030-01-01", "2030-01-10")
+    database.close_drive(drive_id)
+    assert database.get_drive_recipients(drive_id) == []
+    assert notifications.notify_drive(drive_id, "updated", revision="x")["notified"] == 0
+
+
+def test_extending_the_deadline_reopens_a_closed_drive(db):
+    today = date(2030, 1, 15)
+    drive_id = database.add_drive("Acme", "SDE", 8, [], "2030-01-01", "2030-01-10")
+    assert database.close_expired_drives(today) == [drive_id]
+
+    assert database.update_drive(drive_id, description="New rounds", today=today) is False
+    assert database.update_drive(drive_id, date(2030, 1, 14), today=today) is False     # still past
+    assert database.update_drive(drive_id, date(2030, 1, 20), today=today) is True
+    assert len(database.get_drive_recipients(drive_id)) == 4
+    assert database.update_drive(999, date(2030, 1, 20), today=today) is None
+
+
+def test_each_distinct_edit_is_announced_once(db):
+    drive_id = database.add_drive("Acme", "SDE", 8, [], "2030-01-01", "2030-01-10")
+    assert notifications.notify_drive(drive_id, "updated")["notified"] == 4
+    assert notifications.notify_drive(drive_id, "updated")["notified"] == 0     # nothing changed
+
+    database.update_drive(drive_id, description="Adds a coding round")          # same deadline
+    assert notifications.notify_drive(drive_id, "updated")["notified"] == 4
+
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("UPDATE drives SET min_cgpa = 8 WHERE id = ?", (drive_id,))
+    conn.commit()
+    conn.close()
+    assert notifications.notify_drive(drive_id, "updated")["notified"] == 2
@@ -0,0 +1,72 @@
+import sqlite3
+import tracemalloc
+import zipfile
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+import database
+import placement_engine
+
+
+@pytest.fixture
+def department_of(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+
+    def build(n):
+        conn = sqlite3.connect(database.DB_FILE)
+        conn.executemany("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', 'CSE')",
+                         [(f"s{i:05d}",) for i in range(n)])
+        conn.executemany("INSERT INTO student_profiles (username, cgpa) VALUES (?, ?)",
+                         [(f"s{i:05d}", 6 + (i % 40) / 10) for i in range(n)])
+        conn.commit()
+        conn.close()
+        return "CSE"
+    return build
+
+
+def _read_all(parts):
+    out = []
+    for report in parts:
+        with report:
+            out.append(report.read())
+    return out
+
+
+@pytest.mark.parametrize("students, expected_parts", [(0, 1), (20, 2), (25, 3)])
+def test_student_table_is_split_into_parts(department_of, students, expected_parts):
+    parts, err = placement_engine.iter_department_pdf_parts(department_of(students), rows_per_part=10)
+    assert err is None
+    pdfs = _read_all(parts)
+    assert len(pdfs) == expected_parts
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+
+
+def test_single_download_is_a_pdf_or_a_zip_of_parts(department_of):
+    department = department_of(25)
+    report, err = placement_engine.generate_department_pdf(department, rows_per_part=30)
+    with report:
+        assert err is None and report.read(4) == b"%PDF"
+
+    report, err = placement_engine.generate_department_pdf(department, rows_per_part=10)
+    with report, zipfile.ZipFile(report) as zf:
+        assert zf.namelist() == [f"CSE_Placement_Report_part{n}.pdf" for n in (1, 2, 3)]
+        assert all(zf.read(name).startswith(b"%PDF") for name in zf.namelist())
+
+
+def test_peak_memory_follows_part_size_not_department_size(department_of):
+    department = department_of(10000)
+
+    def peak(rows_per_part):
+        tracemalloc.start()
+        try:
+            report, _ = placement_engine.generate_department_pdf(department, rows_per_part=rows_per_part)
+            report.close()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    peak(500)   # warm up imports and chart caches
+    assert peak(500) < peak(10000) / 2
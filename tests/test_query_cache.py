@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+import database
+import query_cache
+
+
+def make_db(path, students):
+    database.DB_FILE = str(path)
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.executemany("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', 'CSE')",
+                     [(f"s{i}",) for i in range(students)])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture(autouse=True)
+def restore_db_file(monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", database.DB_FILE)
+
+
+def test_entries_are_keyed_per_database_file(tmp_path):
+    make_db(tmp_path / "a.db", 2)
+    assert database.get_department_stats("CSE")["total_students"] == 2
+    make_db(tmp_path / "b.db", 5)
+    assert database.get_department_stats("CSE")["total_students"] == 5
+    database.DB_FILE = str(tmp_path / "a.db")
+    assert database.get_department_stats("CSE")["total_students"] == 2
+
+
+def test_writes_from_another_process_show_up_after_the_ttl(tmp_path, monkeypatch):
+    make_db(tmp_path / "portal.db", 2)
+    clock = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: clock[0])
+    assert database.get_department_stats("CSE")["total_students"] == 2
+
+    # A CLI job writes directly, without bumping this process's versions
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("INSERT INTO users (username, password, role, department) VALUES ('cli', 'x', 'Student', 'CSE')")
+    conn.commit()
+    conn.close()
+    assert database.get_department_stats("CSE")["total_students"] == 2
+    clock[0] += query_cache.DEFAULT_TTL_SECONDS
+    assert database.get_department_stats("CSE")["total_students"] == 3
+
+
+def test_bumps_invalidate_immediately(tmp_path):
+    make_db(tmp_path / "portal.db", 2)
+    assert database.get_department_stats("CSE")["total_students"] == 2
+    database.set_user_department("s0", "ECE")
+    assert database.get_department_stats("CSE")["total_students"] == 1
@@ -0,0 +1,42 @@
+import numpy as np
+
+from resume_dedup import NUM_PERM, cluster, similarity
+
+
+def _signature(values):
+    return np.asarray(values, dtype="<u4").tobytes()
+
+
+def _chain(length, step=19):
+    """Signatures where each link differs from the previous one in `step` fresh positions."""
+    values = np.arange(NUM_PERM, dtype=np.uint32)
+    signatures = {}
+    for i in range(length):
+        signatures[i] = _signature(values)
+        values = values.copy()
+        values[i * step:(i + 1) * step] += 1000
+    return signatures
+
+
+def test_chained_pairs_do_not_pull_in_dissimilar_resumes():
+    signatures = _chain(3)
+    assert similarity(signatures[0], signatures[1]) >= 0.8
+    assert similarity(signatures[1], signatures[2]) >= 0.8
+    assert similarity(signatures[0], signatures[2]) < 0.8
+
+    assert cluster([[0, 1, 2]], signatures) == [[0, 1]]
+
+
+def test_reported_members_always_reach_the_threshold():
+    signatures = _chain(6, step=7)
+    groups = [[0, 1, 2, 3], [2, 3, 4, 5], [5, 1]]
+    clusters = cluster(groups, signatures)
+    assert clusters
+    for members in clusters:
+        assert all(similarity(signatures[members[0]], signatures[m]) >= 0.8 for m in members[1:])
+
+
+def test_singletons_can_still_join_a_later_cluster():
+    signatures = _chain(2)
+    signatures[9] = _signature(np.arange(NUM_PERM) + 5000)
+    assert cluster([[1, 9], [0, 1]], signatures) == [[1, 0]]
@@ -0,0 +1,126 @@
+import ai_assistant
+from ai_assistant import AIBackend, ask_ai
+from ai_cache import ResponseCache
+from semantic_cache import SemanticCache, key_terms
+
+SEEDS = {
+    "how to prepare for infosys interview": "infosys",
+    "how many students placed in CSE": "cse-count",
+    "average package at TCS": "tcs-package",
+    "how to improve my resume": "resume",
+    "what skills are needed for amazon": "amazon-skills",
+    "tips for aptitude round": "aptitude",
+    "placement stats 2024": "stats-2024",
+    "which companies are visiting campus this month": "visiting",
+}
+
+PARAPHRASES = [
+    ("how do I crack infosys", "infosys"),
+    ("infosys interview tips", "infosys"),
+    ("infosys interview preparation guide", "infosys"),
+    ("how many CSE students got placed", "cse-count"),
+    ("number of students placed in cse", "cse-count"),
+    ("what is the average salary at TCS", "tcs-package"),
+    ("TCS average ctc", "tcs-package"),
+    ("how can I make my resume better", "resume"),
+    ("tips to improve my cv", "resume"),
+    ("skills required for amazon", "amazon-skills"),
+    ("how to prepare for the aptitude round", "aptitude"),
+    ("placement statistics 2024", "stats-2024"),
+    ("which companies are coming to campus this month", "visiting"),
+    ("recruiters visiting the campus this month", "visiting"),
+]
+
+NEAR_MISSES = [
+    "how many students placed in ECE",
+    "how many students placed in MECH",
+    "average package at TCS digital",
+    "average package at wipro",
+    "placement stats 2025",
+    "how to prepare for wipro interview",
+    "how to prepare for infosys power programmer interview",
+    "what skills are needed for google",
+    "tips for coding round",
+    "how to improve my linkedin",
+]
+
+
+class CountingBackend(AIBackend):
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def complete(self, prompt, role="general", department=None, username=None):
+        self.calls.append(prompt)
+        return f"answer to {prompt}"
+
+
+def _seeded():
+    cache = SemanticCache()
+    for prompt, answer in SEEDS.items():
+        cache.add("student", prompt, answer)
+    return cache
+
+
+def test_paraphrase_hit_rate():
+    cache = _seeded()
+    hits = sum(cache.lookup("student", prompt)[0] == expected for prompt, expected in PARAPHRASES)
+    assert hits / len(PARAPHRASES) >= 0.85
+
+
+def test_paraphrases_never_return_another_questions_answer():
+    cache = _seeded()
+    for prompt, expected in PARAPHRASES:
+        assert cache.lookup("student", prompt)[0] in (expected, None), prompt
+
+
+def test_near_misses_are_not_served():
+    cache = _seeded()
+    for prompt in NEAR_MISSES:
+        assert cache.lookup("student", prompt)[0] is None, prompt
+
+
+def test_near_miss_rejected_even_when_vectors_are_close():
+    cache = SemanticCache(threshold=0.5)
+    cache.add("student", "how many students placed in CSE", "cse")
+    answer, score = cache.lookup("student", "how many students placed in ECE")
+    assert answer is None and score >= 0.5
+    assert cache.cache_stats()["rejected"] == 1
+
+
+def test_key_terms():
+    assert key_terms("how many students placed in ECE") == {"ece"}
+    assert key_terms("placement stats 2025") == {"2025"}
+    assert key_terms("average package at TCS digital") == {"tcs", "digital"}
+    assert key_terms("how do I crack infosys") == key_terms("infosys interview tips")
+
+
+def test_namespaces_are_isolated():
+    cache = _seeded()
+    assert cache.lookup("hod", "infosys interview tips")[0] is None
+
+
+def test_lru_eviction_bounds_entries():
+    cache = SemanticCache(max_entries=3)
+    for company in ["infosys", "wipro", "zoho", "amazon"]:
+        cache.add("student", f"{company} interview tips", company)
+    assert cache.cache_stats()["entries"] == 3
+    assert cache.cache_stats()["evictions"] == 1
+
+
+def test_ask_ai_serves_paraphrase_without_polluting_exact_cache():
+    backend = CountingBackend()
+    exact = ResponseCache(path=None)
+    semantic = SemanticCache()
+    first = ask_ai("how to prepare for infosys interview", "student", cache=exact, backend=backend, semantic=semantic)
+    assert ask_ai("infosys interview tips", "student", cache=exact, backend=backend, semantic=semantic) == first
+    assert len(backend.calls) == 1
+    # The paraphrase hit is not stored under the paraphrase's own exact key
+    assert exact.get(ai_assistant._request_key("infosys interview tips", "student", None)) is None
+
+    ece = ask_ai("how many students placed in ECE", "student", cache=exact, backend=backend, semantic=semantic)
+    ask_ai("how many students placed in CSE", "student", cache=exact, backend=backend, semantic=semantic)
+    assert ask_ai("how many students placed in ECE", "student", cache=exact, backend=backend,
+                  semantic=semantic) == ece
+    assert backend.calls[1:] == ["how many students placed in ECE", "how many students placed in CSE"]
@@ -0,0 +1,113 @@
+import sqlite3
+
+import pytest
+
+import database
+import query_cache
+import skill_index
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "portal.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    for i in range(3):
+        conn.execute("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', 'CSE')",
+                     (f"s{i}",))
+    conn.commit()
+    conn.close()
+    for i in range(3):
+        database.save_resume_analysis(f"s{i}", 70, "", ["python", "sql"][:i + 1])
+
+
+def test_refresh_reloads_only_the_students_that_changed(db, monkeypatch):
+    index = skill_index.SkillBitmapIndex()
+    assert index.search(all_skills=["python"], department="CSE")[0] == 3
+
+    database.set_user_department("s1", "ECE")
+    database.record_placement("s2", "Acme", 8)
+    assert index._changed_students(query_cache.data_version(*skill_index.STUDENT_TABLES)) == {"s1", "s2"}
+
+    queries = []
+    real_connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(queries.append)
+        return conn
+
+    monkeypatch.setattr(skill_index.sqlite3, "connect", traced_connect)
+    assert index.search(department="ECE") == (1, ["s1"])
+    assert index.search(placed=True) == (1, ["s2"])
+    assert index.search(all_skills=["sql"], department="CSE") == (1, ["s2"])
+    assert any("u.username IN ('s1','s2')" in q for q in queries)
+
+
+def test_unkeyed_writes_fall_back_to_a_full_rescan(db):
+    index = skill_index.SkillBitmapIndex()
+    index.refresh()
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("UPDATE users SET department = 'MECH' WHERE username = 's0'")
+    conn.commit()
+    conn.close()
+    query_cache.bump("users")
+    assert index._changed_students(query_cache.data_version(*skill_index.STUDENT_TABLES)) is None
+    assert index.search(department="MECH") == (1, ["s0"])
+
+
+def test_changed_keys_tracks_versions():
+    query_cache.bump("t_keys", keys=["a"])
+    since = query_cache.data_version("t_keys")[0]
+    assert query_cache.changed_keys("t_keys", since) == set()
+    query_cache.bump("t_keys", keys=["b"])
+    query_cache.bump("t_keys", keys=["c", "b"])
+    assert query_cache.changed_keys("t_keys", since) == {"b", "c"}
+    query_cache.bump("t_keys")
+    assert query_cache.changed_keys("t_keys", since) is None
+
+
+def test_cgpa_ranges_and_the_student_universe(db):
+    database.upsert_student_profile("s0", cgpa=6.5)
+    database.upsert_student_profile("s1", cgpa=8.0)
+    database.upsert_student_profile("s2", cgpa=9.2)
+    database.save_resume_analysis("admin", 50, "", ["python"])      # not a student
+    index = skill_index.SkillBitmapIndex()
+
+    assert index.search(all_skills=["python"]) == (3, ["s0", "s1", "s2"])
+    assert index.search(cgpa_min=8.0)[1] == ["s1", "s2"]
+    assert index.search(cgpa_max=8.0)[1] == ["s0", "s1"]
+    assert index.search(cgpa_min=7, cgpa_max=9)[1] == ["s1"]
+    assert index.search(placed=False)[0] == 3
+
+    database.upsert_student_profile("s0", cgpa=9.9)
+    database.set_user_department("s2", "ECE")
+    assert index.search(cgpa_min=9.5)[1] == ["s0"]
+
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.execute("UPDATE users SET role = 'Alumni' WHERE username = 's1'")
+    conn.commit()
+    conn.close()
+    query_cache.bump("users", keys=["s1"])
+    assert index.search()[1] == ["s0", "s2"]
+
+
+def test_cgpa_filter_on_100k_students_takes_milliseconds(tmp_path, monkeypatch):
+    import time
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "big.db"))
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.executemany("INSERT INTO users (username, password, role, department) VALUES (?, 'x', 'Student', 'CSE')",
+                     [(f"s{i:06d}",) for i in range(100_000)])
+    conn.executemany("INSERT INTO student_profiles (username, cgpa) VALUES (?, ?)",
+                     [(f"s{i:06d}", 5 + (i % 500) / 100) for i in range(100_000)])
+    conn.commit()
+    conn.close()
+    index = skill_index.SkillBitmapIndex()
+    assert index.search(cgpa_min=9.0, limit=1)[0] == 100 * 200
+
+    started = time.perf_counter()
+    for _ in range(10):
+        total, _ = index.search(cgpa_min=7.5, cgpa_max=8.5, limit=10)
+    assert total == 101 * 200
+    assert (time.perf_counter() - started) / 10 < 0.05